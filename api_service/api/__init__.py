@@ -1,8 +1,17 @@
+from flask import Response, current_app
 from flask_restx import Api, Resource
 
+from api_service import instrumentation
+
 from api_service.api.asset_types import api as asset_type_ns
 from api_service.api.assets import api as asset_ns
-from api_service.exceptions import APIConflict, APINotFound, APIBadRequest
+from api_service.api.changes import api as changes_ns
+from api_service.api.jobs import api as jobs_ns
+from api_service.exceptions import (
+    APIConflict, APINotFound, APIBadRequest, APIPreconditionFailed, APITooManyRequests
+)
+from api_service.services.auth_service import require_api_key
+from api_service.services.cache_service import tagged_cache
 
 authorizations = {
     "APIKeyHeader": {
@@ -24,6 +33,8 @@ api = Api(
 
 api.add_namespace(asset_type_ns, path="/api/v1/asset-types")
 api.add_namespace(asset_ns, path="/api/v1/assets")
+api.add_namespace(changes_ns, path="/api/v1/changes")
+api.add_namespace(jobs_ns, path="/api/v1/jobs")
 
 
 @api.route("/health")
@@ -32,6 +43,25 @@ class Health(Resource):
         return {"status": "ok"}, 200
 
 
+@api.route("/metrics")
+class Metrics(Resource):
+    def get(self):
+        """Request latency, SQL, cache and encoding histograms in the Prometheus text format"""
+        if not current_app.config["INSTRUMENTATION_ENABLED"]:
+            raise APINotFound("Instrumentation is disabled")
+        body, content_type = instrumentation.metrics_payload()
+        return Response(body, content_type=content_type)
+
+
+@api.route("/cache-stats")
+class CacheStats(Resource):
+    method_decorators = [require_api_key]
+
+    def get(self):
+        """Hit/miss/invalidation counters of this worker's asset cache"""
+        return tagged_cache.stats(), 200
+
+
 @api.errorhandler(APIConflict)
 def handle_conflict(error):
     return {"message": str(error)}, 409
@@ -45,3 +75,13 @@ def handle_not_found(error):
 @api.errorhandler(APIBadRequest)
 def handle_bad_request(error):
     return {"message": str(error)}, 400
+
+
+@api.errorhandler(APIPreconditionFailed)
+def handle_precondition_failed(error):
+    return {"message": str(error)}, 412
+
+
+@api.errorhandler(APITooManyRequests)
+def handle_too_many_requests(error):
+    return {"message": str(error)}, 429, {"Retry-After": str(error.retry_after)}
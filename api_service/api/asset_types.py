@@ -1,13 +1,13 @@
-from flask import request
-from flask_restx import Namespace, Resource, fields
+from flask import Response, current_app, request, stream_with_context
+from flask_restx import Namespace, Resource, fields, inputs
 
-from api_service.extensions import cache
-from api_service.services.asset_service import AssetService
+from api_service.api.assets import batch_status
+from api_service.exceptions import APIBadRequest
+from api_service.services.asset_io import FORMATS, MIMETYPES, AssetIOService
+from api_service.services.asset_service import asset_field_to_dict, asset_type_to_dict
 from api_service.services.auth_service import require_api_key
-
-ASSET_TYPE_ALL_CACHE_KEY = "asset_types:all"
-ASSET_TYPE_CACHE_KEY = lambda type_id: f"asset_types:{type_id}"
-ASSET_TYPE_FIELDS_CACHE_KEY = lambda type_id: f"asset_types:{type_id}:fields"
+from api_service.services.cache_service import CachedAssetService
+from api_service.services.serialization import json_response
 
 api = Namespace("asset-types", description="Asset Type operations")
 
@@ -27,61 +27,131 @@ field_input = api.model("AssetFieldInput", {
     "field_type": fields.String(required=True, enum=["Text", "Number"]),
 })
 
+asset_type_count_model = api.model("AssetTypeCount", {
+    "asset_type_id": fields.Integer(),
+    "name": fields.String(),
+    "asset_count": fields.Integer(),
+})
+
+group_model = api.model("AssetFieldGroup", {
+    "value": fields.Raw(description="Field value shared by the group"),
+    "count": fields.Integer(description="Number of assets in the group"),
+    "min": fields.Raw(description="Minimum of the metric field"),
+    "max": fields.Raw(description="Maximum of the metric field"),
+    "avg": fields.Float(description="Average of the metric field"),
+    "sum": fields.Raw(description="Sum of the metric field"),
+})
+
+field_stats_model = api.model("AssetFieldStats", {
+    "field_id": fields.Integer(),
+    "name": fields.String(),
+    "field_type": fields.String(enum=["Text", "Number"]),
+    "count": fields.Integer(description="Number of assets with a value for the field"),
+    "min": fields.Raw(description="Number fields only"),
+    "max": fields.Raw(description="Number fields only"),
+    "avg": fields.Float(description="Number fields only"),
+    "sum": fields.Raw(description="Number fields only"),
+    "distinct": fields.Integer(description="Text fields only: number of distinct values"),
+    "top": fields.List(fields.Nested(group_model, skip_none=True), description="Text fields only: most frequent values"),
+})
+
+type_stats_model = api.model("AssetTypeStats", {
+    "asset_type_id": fields.Integer(),
+    "asset_count": fields.Integer(),
+    "fields": fields.List(fields.Nested(field_stats_model, skip_none=True)),
+})
+
+import_error = api.model("AssetImportError", {
+    "line": fields.Integer(description="Line of the row in the file"),
+    "message": fields.String(),
+})
+
+import_result_model = api.model("AssetImportResult", {
+    "created": fields.Integer(),
+    "failed": fields.Integer(),
+    "errors": fields.List(fields.Nested(import_error), description="First row errors"),
+})
+
+export_parser = api.parser()
+export_parser.add_argument("format", choices=FORMATS, default="csv", location="args")
+
+import_parser = api.parser()
+import_parser.add_argument("format", choices=FORMATS, location="args",
+                           help="Defaults from the Content-Type: text/csv or application/x-ndjson")
+
+stats_parser = api.parser()
+stats_parser.add_argument("top", type=inputs.int_range(1, 100), default=5, location="args",
+                          help="Number of most frequent values reported per Text field")
+
+group_by_parser = api.parser()
+group_by_parser.add_argument("field_id", type=int, required=True, location="args",
+                             help="Field whose values define the groups")
+group_by_parser.add_argument("metric_field_id", type=int, location="args",
+                             help="Number field aggregated (min/max/avg/sum) within each group")
+group_by_parser.add_argument("limit", type=inputs.int_range(1, 1000), default=10, location="args",
+                             help="Maximum number of groups, largest first")
+
+
+def asset_type_etag(type_id, version):
+    return f"asset-type-{type_id}-v{version}"
+
+
+def asset_type_fields_etag(type_id, version):
+    return f"asset-type-{type_id}-fields-v{version}"
+
 
 @api.route("")
 class AssetTypes(Resource):
     method_decorators = [require_api_key]
 
     @api.expect(asset_type_model)
-    @api.marshal_with(asset_type_model, code=201)
+    @api.response(201, "Created", asset_type_model)
     def post(self):
         """Create a new asset type"""
         data = api.payload
+        return json_response(asset_type_to_dict(CachedAssetService.create_asset_type(data["name"])), 201)
 
-        cache.delete(ASSET_TYPE_ALL_CACHE_KEY)
-
-        return AssetService.create_asset_type(data["name"]), 201
-
-    @cache.cached(timeout=60, key_prefix=ASSET_TYPE_ALL_CACHE_KEY)
-    @api.marshal_list_with(asset_type_model)
+    @api.response(200, "Success", [asset_type_model])
     def get(self):
         """List all asset types"""
-        return AssetService.get_all_asset_types()
+        return json_response(CachedAssetService.get_all_asset_types())
 
 
 @api.route("/<int:type_id>")
 class AssetType(Resource):
     method_decorators = [require_api_key]
 
-    @cache.cached(timeout=60, key_prefix=lambda: ASSET_TYPE_CACHE_KEY(request.view_args["type_id"]))
-    @api.marshal_with(asset_type_model)
+    @api.response(200, "Success", asset_type_model)
+    @api.response(304, "Not modified since the ETag given in If-None-Match")
     def get(self, type_id):
         """Get asset type by ID"""
-        asset_type = AssetService.get_asset_type_by_id(type_id)
-        if not asset_type:
+        entry = CachedAssetService.get_asset_type(type_id)
+        if not entry:
             api.abort(404, "Asset type not found")
-        return asset_type
+        body, version, updated_at = entry
+        return json_response(body, etag=asset_type_etag(type_id, version), last_modified=updated_at)
 
 
 @api.route("/<int:type_id>/fields")
 class AssetFieldList(Resource):
     method_decorators = [require_api_key]
 
-    @cache.cached(timeout=60, key_prefix=lambda: ASSET_TYPE_FIELDS_CACHE_KEY(request.view_args["type_id"]))
-    @api.marshal_list_with(field_model)
+    @api.response(200, "Success", [field_model])
+    @api.response(304, "Not modified since the ETag given in If-None-Match")
     def get(self, type_id):
         """List all fields for a given asset type"""
-        fields = AssetService.get_fields_for_type(type_id)
-        if fields is None:
+        entry = CachedAssetService.get_fields_for_type(type_id)
+        if entry is None:
             api.abort(404, "Asset type not found")
-        return fields
+        body, version, updated_at = entry
+        return json_response(body, etag=asset_type_fields_etag(type_id, version), last_modified=updated_at)
 
     @api.expect(field_input)
-    @api.marshal_with(field_model, code=201)
+    @api.response(201, "Created", field_model)
     def post(self, type_id):
         """Create a new field for an asset type"""
         data = api.payload
-        field = AssetService.create_asset_field_for_type(
+        field = CachedAssetService.create_asset_field_for_type(
             asset_type_id=type_id,
             field_name=data["name"],
             field_type=data["field_type"]
@@ -89,7 +159,83 @@ class AssetFieldList(Resource):
         if field is None:
             api.abort(404, "Asset type not found")
 
-        cache.delete(ASSET_TYPE_FIELDS_CACHE_KEY(type_id))
-        cache.delete(ASSET_TYPE_ALL_CACHE_KEY)
+        return json_response(asset_field_to_dict(field), 201)
+
+
+@api.route("/stats")
+class AssetTypeCounts(Resource):
+    method_decorators = [require_api_key]
 
-        return field, 201
+    @api.marshal_list_with(asset_type_count_model)
+    def get(self):
+        """Number of assets per asset type"""
+        return CachedAssetService.get_asset_counts_by_type()
+
+
+@api.route("/<int:type_id>/stats")
+class AssetTypeStats(Resource):
+    method_decorators = [require_api_key]
+
+    @api.expect(stats_parser)
+    @api.marshal_with(type_stats_model, skip_none=True)
+    def get(self, type_id):
+        """Per-field statistics of the assets of a type"""
+        args = stats_parser.parse_args()
+        stats = CachedAssetService.get_type_stats(type_id, top=args["top"])
+        if stats is None:
+            api.abort(404, "Asset type not found")
+        return stats
+
+
+@api.route("/<int:type_id>/stats/group-by")
+class AssetTypeGroupBy(Resource):
+    method_decorators = [require_api_key]
+
+    @api.expect(group_by_parser)
+    @api.marshal_list_with(group_model, skip_none=True)
+    def get(self, type_id):
+        """Group the assets of a type by a field value, with optional aggregates of a Number field"""
+        args = group_by_parser.parse_args()
+        groups = CachedAssetService.get_type_group_by(
+            type_id, args["field_id"], metric_field_id=args["metric_field_id"], limit=args["limit"]
+        )
+        if groups is None:
+            api.abort(404, "Asset type not found")
+        return groups
+
+
+@api.route("/<int:type_id>/export")
+class AssetTypeExport(Resource):
+    method_decorators = [require_api_key]
+
+    @api.expect(export_parser)
+    @api.response(200, "One row per asset and one column per field, streamed")
+    def get(self, type_id):
+        """Export the assets of a type as CSV or NDJSON"""
+        fmt = export_parser.parse_args()["format"]
+        chunks = AssetIOService.iter_export(type_id, fmt, current_app.config["ASSET_STREAM_BATCH_SIZE"])
+        return Response(stream_with_context(chunks), mimetype=MIMETYPES[fmt], headers={
+            "Content-Disposition": f'attachment; filename="asset-type-{type_id}.{fmt}"',
+        })
+
+
+@api.route("/<int:type_id>/import")
+class AssetTypeImport(Resource):
+    method_decorators = [require_api_key]
+
+    @api.expect(import_parser)
+    @api.response(201, "Created", import_result_model)
+    @api.response(207, "Some rows failed, see 'errors'", import_result_model)
+    def post(self, type_id):
+        """Create assets of a type from a CSV or NDJSON body, in the format of the export"""
+        fmt = import_parser.parse_args()["format"]
+        if fmt is None:
+            fmt = next((f for f, mimetype in MIMETYPES.items() if mimetype == request.mimetype), None)
+            if fmt is None:
+                raise APIBadRequest("Send text/csv or application/x-ndjson, or set the 'format' parameter")
+        result = AssetIOService.import_assets(
+            type_id, request.stream, fmt,
+            batch_size=current_app.config["ASSET_BATCH_CHUNK_SIZE"],
+            max_errors=current_app.config["ASSET_IMPORT_MAX_ERRORS"],
+        )
+        return json_response(result, batch_status(result["created"], result["errors"], 201))
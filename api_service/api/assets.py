@@ -1,12 +1,16 @@
-from flask import request
-from flask_restx import Namespace, Resource, fields
-from api_service.extensions import cache
+from urllib.parse import urlencode
 
-from api_service.services.asset_service import AssetService
+from flask import Response, current_app, request, stream_with_context
+from flask_restx import Namespace, Resource, fields, inputs
+from api_service.exceptions import APIBadRequest
+
+from api_service.services.asset_query import parse_filter, parse_sort
+from api_service.services.asset_service import AssetService, asset_to_dict
 from api_service.services.auth_service import require_api_key
+from api_service.services.cache_service import CachedAssetService
+from api_service.services.serialization import dumps, json_response
 
-ASSET_CACHE_KEY = lambda asset_id: f"asset:{asset_id}"
-ASSET_ALL_CACHE_KEY = "assets:all"
+BATCH_MODES = ("atomic", "partial")
 
 api = Namespace("assets", description="Asset operations")
 
@@ -34,87 +38,224 @@ asset_response_model = api.model("AssetResponse", {
     "asset_type_id": fields.Integer(),
     "data": fields.List(fields.Nested(asset_data_output_item))
 })
+asset_batch_update_item = api.model("AssetBatchUpdateItem", {
+    "id": fields.Integer(required=True),
+    "data": fields.List(fields.Nested(asset_data_item), required=True)
+})
+
+asset_batch_create_model = api.model("AssetBatchCreate", {
+    "items": fields.List(fields.Nested(asset_input_model), required=True),
+    "mode": fields.String(enum=BATCH_MODES, default="atomic",
+                          description="'atomic' writes nothing if any item is invalid, "
+                                      "'partial' writes the valid items and reports the others")
+})
+
+asset_batch_update_model = api.model("AssetBatchUpdate", {
+    "items": fields.List(fields.Nested(asset_batch_update_item), required=True),
+    "mode": fields.String(enum=BATCH_MODES, default="atomic")
+})
+
+asset_batch_result_item = api.inherit("AssetBatchResultItem", asset_response_model, {
+    "index": fields.Integer(description="Position of the item in the request")
+})
+
+asset_batch_error = api.model("AssetBatchError", {
+    "index": fields.Integer(description="Position of the item in the request"),
+    "message": fields.String()
+})
+
+asset_batch_response_model = api.model("AssetBatchResponse", {
+    "items": fields.List(fields.Nested(asset_batch_result_item)),
+    "errors": fields.List(fields.Nested(asset_batch_error))
+})
+
+asset_list_parser = api.parser()
+asset_list_parser.add_argument("limit", type=inputs.positive, location="args",
+                               help="Maximum number of assets per page")
+asset_list_parser.add_argument("after", type=str, location="args",
+                               help="Cursor taken from the 'X-Next-Cursor' header of the previous page")
+asset_list_parser.add_argument("asset_type_id", type=int, location="args",
+                               help="Only list assets of this type")
+asset_list_parser.add_argument("filter", action="append", default=[], location="args",
+                               help="Field filter '<field_id>:<op>:<value>', op is one of "
+                                    "eq, gt, gte, lt, lte, prefix (repeatable)")
+asset_list_parser.add_argument("sort", type=str, location="args",
+                               help="Sort by a field value: '<field_id>' ascending, '-<field_id>' descending")
+asset_list_parser.add_argument("format", choices=("json", "ndjson"), default="json", location="args",
+                               help="'ndjson' streams every asset, one JSON document per line")
+
+asset_put_parser = api.parser()
+asset_put_parser.add_argument("replace", type=inputs.boolean, default=False, location="args",
+                              help="Remove the values of the fields left out of 'data'")
+
+
+def parse_batch_payload(payload):
+    if not isinstance(payload, dict):
+        raise APIBadRequest("Batch payload must be an object with 'items'")
+    items = payload.get("items")
+    if not isinstance(items, list) or not items:
+        raise APIBadRequest("Missing 'items' payload")
+
+    max_items = current_app.config["ASSET_BATCH_MAX_ITEMS"]
+    if len(items) > max_items:
+        raise APIBadRequest(f"Batch too large: {len(items)} items, maximum is {max_items}")
+
+    mode = payload.get("mode", "atomic")
+    if mode not in BATCH_MODES:
+        raise APIBadRequest(f"Invalid mode '{mode}'. Allowed modes: {', '.join(BATCH_MODES)}")
+
+    return items, mode == "atomic"
+
+
+def batch_status(results, errors, success_code):
+    if not errors:
+        return success_code
+    return 207 if results else 400
+
+
+def asset_etag(asset_id, version):
+    return f"asset-{asset_id}-v{version}"
+
+
+def if_match_versions(asset_id):
+    """Asset versions accepted by the If-Match header, ``None`` if there is none (or it is ``*``)."""
+    if_match = request.if_match
+    if not if_match or if_match.star_tag:
+        return None
+    prefix = asset_etag(asset_id, "")
+    # Compressed responses carry the ETag with a "+<encoding>" suffix
+    versions = (tag[len(prefix):].split("+", 1)[0] for tag in if_match.as_set() if tag.startswith(prefix))
+    return [int(version) for version in versions if version.isdigit()]
+
+
+def update_one(asset_id, partial, replace=False):
+    asset, version, updated_at = CachedAssetService.update_asset(
+        asset_id, api.payload["data"], expected_versions=if_match_versions(asset_id), partial=partial, replace=replace
+    )
+    return json_response(asset, etag=asset_etag(asset_id, version), last_modified=updated_at)
+
+
+def update_batch(partial, replace=False):
+    items, atomic = parse_batch_payload(api.payload)
+    updated, errors = CachedAssetService.update_assets_bulk(
+        items, atomic=atomic, chunk_size=current_app.config["ASSET_BATCH_CHUNK_SIZE"], partial=partial,
+        replace=replace
+    )
+    return json_response({"items": updated, "errors": errors}, batch_status(updated, errors, 200))
+
+
+def stream_assets_ndjson(query):
+    batch_size = current_app.config["ASSET_STREAM_BATCH_SIZE"]
+
+    def generate():
+        for batch in AssetService.iter_asset_batches(batch_size, **query):
+            yield b"".join(dumps(asset) + b"\n" for asset in batch)
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
 
 
 @api.route("")
 class AssetList(Resource):
     method_decorators = [require_api_key]
 
-    @cache.cached(timeout=60, key_prefix=ASSET_ALL_CACHE_KEY)
-    @api.marshal_list_with(asset_response_model)
+    @api.expect(asset_list_parser)
+    @api.response(200, "Success", [asset_response_model])
     def get(self):
-        """List all asset instances"""
-        assets = AssetService.get_all_assets()
-        return [
-            {
-                "id": asset.id,
-                "asset_type_id": asset.asset_type_id,
-                "data": [
-                    {"field_id": d.field_id, "value": d.value}
-                    for d in asset.data
-                ]
-            } for asset in assets
-        ]
+        """List asset instances, filtered and sorted server-side (see the 'Link' header for the next page)"""
+        args = asset_list_parser.parse_args()
+        query = {
+            "asset_type_id": args["asset_type_id"],
+            "filters": [parse_filter(expression) for expression in args["filter"]],
+            "sort": parse_sort(args["sort"]) if args["sort"] else None,
+        }
+        if args["format"] == "ndjson":
+            return stream_assets_ndjson(query)
+
+        limit = min(args["limit"] or current_app.config["ASSET_PAGE_DEFAULT_LIMIT"],
+                    current_app.config["ASSET_PAGE_MAX_LIMIT"])
+        body, next_cursor = CachedAssetService.get_assets_page(limit, args["after"], **query)
+
+        headers = {}
+        if next_cursor is not None:
+            next_args = request.args.to_dict(flat=False)
+            next_args.update(limit=[limit], after=[next_cursor])
+            headers["Link"] = f'<{request.base_url}?{urlencode(next_args, doseq=True)}>; rel="next"'
+            headers["X-Next-Cursor"] = next_cursor
+
+        return json_response(body, 200, headers)
 
     @api.expect(asset_input_model)
-    @api.marshal_with(asset_response_model, code=201)
+    @api.response(201, "Created", asset_response_model)
     def post(self):
         """Create a new asset instance"""
         data = api.payload
         asset = None
         try:
-            asset = AssetService.create_asset(data["asset_type_id"], data["data"])
+            asset = CachedAssetService.create_asset(data["asset_type_id"], data["data"])
         except ValueError as e:
             api.abort(400, str(e))
         if not asset:
             api.abort(404, "Asset type not found")
-        cache.delete(ASSET_ALL_CACHE_KEY)
-        return {
-            "id": asset.id,
-            "asset_type_id": asset.asset_type_id,
-            "data": [
-                {"field_id": d.field_id, "value": d.value}
-                for d in asset.data
-            ]
-        }, 201
+        return json_response(asset_to_dict(asset), 201)
+
+
+@api.route(":batch")
+class AssetBatch(Resource):
+    method_decorators = [require_api_key]
+
+    @api.expect(asset_batch_create_model)
+    @api.response(207, "Some items failed, see 'errors'", asset_batch_response_model)
+    @api.response(400, "Validation failed, nothing was written", asset_batch_response_model)
+    @api.response(201, "Created", asset_batch_response_model)
+    def post(self):
+        """Create many asset instances in one request"""
+        items, atomic = parse_batch_payload(api.payload)
+        created, errors = CachedAssetService.create_assets_bulk(
+            items, atomic=atomic, chunk_size=current_app.config["ASSET_BATCH_CHUNK_SIZE"]
+        )
+        return json_response({"items": created, "errors": errors}, batch_status(created, errors, 201))
+
+    @api.expect(asset_batch_update_model, asset_put_parser)
+    @api.response(207, "Some items failed, see 'errors'", asset_batch_response_model)
+    @api.response(400, "Validation failed, nothing was written", asset_batch_response_model)
+    @api.response(200, "Success", asset_batch_response_model)
+    def put(self):
+        """Update many asset instances in one request; '?replace=true' removes the fields left out"""
+        return update_batch(partial=False, replace=asset_put_parser.parse_args()["replace"])
+
+    @api.expect(asset_batch_update_model)
+    @api.response(207, "Some items failed, see 'errors'", asset_batch_response_model)
+    @api.response(400, "Validation failed, nothing was written", asset_batch_response_model)
+    @api.response(200, "Success", asset_batch_response_model)
+    def patch(self):
+        """Change some values of many asset instances in one request; null removes a value"""
+        return update_batch(partial=True)
 
 
 @api.route("/<int:asset_id>")
 class AssetDetail(Resource):
     method_decorators = [require_api_key]
 
-    @cache.cached(timeout=60, key_prefix=lambda: ASSET_CACHE_KEY(request.view_args['asset_id']))
-    @api.marshal_with(asset_response_model)
+    @api.response(200, "Success", asset_response_model, headers={"ETag": "Current version of the asset"})
+    @api.response(304, "Not modified since the ETag given in If-None-Match")
     def get(self, asset_id):
         """Get an asset instance by ID"""
-        asset = AssetService.get_asset_by_id(asset_id)
-        if not asset:
+        entry = CachedAssetService.get_asset(asset_id)
+        if not entry:
             api.abort(404, "Asset not found")
-        return {
-            "id": asset.id,
-            "asset_type_id": asset.asset_type_id,
-            "data": [
-                {"field_id": d.field_id, "value": d.value}
-                for d in asset.data
-            ]
-        }
+        body, version, updated_at = entry
+        return json_response(body, etag=asset_etag(asset_id, version), last_modified=updated_at)
 
-    @api.expect(asset_update_model)
-    @api.marshal_with(asset_response_model)
+    @api.expect(asset_update_model, asset_put_parser)
+    @api.response(200, "Success", asset_response_model, headers={"ETag": "New version of the asset"})
+    @api.response(412, "The asset no longer matches the ETag given in If-Match")
     def put(self, asset_id):
-        """Update an asset instance"""
-        asset = AssetService.update_asset(asset_id, api.payload['data'])
-        if not asset:
-            api.abort(404, "Asset not found")
+        """Update an asset instance; send If-Match with its ETag to avoid overwriting concurrent changes"""
+        return update_one(asset_id, partial=False, replace=asset_put_parser.parse_args()["replace"])
 
-        cache.delete(ASSET_ALL_CACHE_KEY)
-        cache.delete(ASSET_CACHE_KEY(asset_id))
-
-        return {
-            "id": asset.id,
-            "asset_type_id": asset.asset_type_id,
-            "data": [
-                {"field_id": d.field_id, "value": d.value}
-                for d in asset.data
-            ]
-        }
+    @api.expect(asset_update_model)
+    @api.response(200, "Success", asset_response_model, headers={"ETag": "New version of the asset"})
+    @api.response(412, "The asset no longer matches the ETag given in If-Match")
+    def patch(self, asset_id):
+        """Change some of an asset's values, null removes a value; If-Match works as for PUT"""
+        return update_one(asset_id, partial=True)
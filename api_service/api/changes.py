@@ -0,0 +1,54 @@
+from urllib.parse import urlencode
+
+from flask import current_app, request
+from flask_restx import Namespace, Resource, fields, inputs
+
+from api_service.services.auth_service import require_api_key
+from api_service.services.change_log import ChangeLogService
+from api_service.services.serialization import json_response
+
+api = Namespace("changes", description="Change feed for incremental sync")
+
+change_model = api.model("Change", {
+    "seq": fields.Integer(description="Position in the feed, strictly increasing"),
+    "entity": fields.String(enum=["asset", "asset_type", "asset_field"]),
+    "entity_id": fields.Integer(),
+    "asset_type_id": fields.Integer(description="Asset type of the changed asset"),
+    "action": fields.String(enum=["created", "updated"]),
+    "created_at": fields.DateTime(),
+})
+
+changes_parser = api.parser()
+changes_parser.add_argument("since", type=inputs.natural, default=0, location="args",
+                            help="Return changes after this seq, i.e. the 'X-Next-Cursor' of the previous call")
+changes_parser.add_argument("limit", type=inputs.positive, location="args",
+                            help="Maximum number of changes returned")
+changes_parser.add_argument("wait", type=float, default=0, location="args",
+                            help="Seconds to wait for a change when there is none yet (long-poll)")
+
+
+@api.route("")
+class Changes(Resource):
+    method_decorators = [require_api_key]
+
+    @api.expect(changes_parser)
+    @api.response(200, "Success", [change_model], headers={"X-Next-Cursor": "Value of 'since' for the next call"})
+    def get(self):
+        """List changes to assets, asset types and fields in commit order"""
+        args = changes_parser.parse_args()
+        limit = min(args["limit"] or current_app.config["CHANGES_PAGE_DEFAULT_LIMIT"],
+                    current_app.config["CHANGES_PAGE_MAX_LIMIT"])
+        wait = min(max(args["wait"], 0), current_app.config["CHANGES_MAX_WAIT"])
+
+        changes, has_more = ChangeLogService.wait_for_changes(
+            args["since"], limit, wait, current_app.config["CHANGES_POLL_INTERVAL"]
+        )
+
+        next_cursor = changes[-1]["seq"] if changes else args["since"]
+        headers = {"X-Next-Cursor": str(next_cursor)}
+        if has_more:
+            next_args = request.args.to_dict(flat=False)
+            next_args.update(limit=[limit], since=[next_cursor])
+            headers["Link"] = f'<{request.base_url}?{urlencode(next_args, doseq=True)}>; rel="next"'
+
+        return json_response(changes, 200, headers)
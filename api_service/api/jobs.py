@@ -0,0 +1,84 @@
+from flask import Response, stream_with_context, url_for
+from flask_restx import Namespace, Resource, fields
+
+from api_service.api.assets import asset_input_model
+from api_service.exceptions import APIBadRequest
+from api_service.services.auth_service import require_api_key
+from api_service.services.job_service import JOB_EXPORT, JOB_IMPORT, JOB_TYPES, JobService, job_to_dict
+from api_service.services.serialization import json_response
+
+api = Namespace("jobs", description="Background imports and exports")
+
+job_input_model = api.model("JobInput", {
+    "type": fields.String(required=True, enum=JOB_TYPES),
+    "items": fields.List(fields.Nested(asset_input_model),
+                         description="Assets to create ('import' jobs)"),
+    "asset_type_id": fields.Integer(description="Only export the assets of this type ('export' jobs)"),
+})
+
+job_error = api.model("JobError", {
+    "index": fields.Integer(description="Position of the item in the import"),
+    "message": fields.String(),
+})
+
+job_model = api.model("Job", {
+    "id": fields.Integer(),
+    "type": fields.String(enum=JOB_TYPES),
+    "status": fields.String(enum=["queued", "running", "succeeded", "failed"]),
+    "params": fields.Raw(),
+    "total": fields.Integer(description="Number of items to process, once known"),
+    "processed": fields.Integer(),
+    "succeeded": fields.Integer(),
+    "failed": fields.Integer(),
+    "errors": fields.List(fields.Nested(job_error), description="First item errors of an import"),
+    "error": fields.String(description="Why the job failed"),
+    "attempts": fields.Integer(),
+    "created_at": fields.DateTime(),
+    "started_at": fields.DateTime(),
+    "finished_at": fields.DateTime(),
+})
+
+
+def job_location(job_id):
+    return url_for("jobs_job_detail", job_id=job_id)
+
+
+@api.route("")
+class Jobs(Resource):
+    method_decorators = [require_api_key]
+
+    @api.expect(job_input_model)
+    @api.response(202, "Queued", job_model, headers={"Location": "URL of the job's status"})
+    def post(self):
+        """Queue an import or an export; `flask cli worker` processes run it"""
+        payload = api.payload or {}
+        job_type = payload.get("type")
+        if job_type == JOB_IMPORT:
+            job = JobService.submit_import(payload.get("items"))
+        elif job_type == JOB_EXPORT:
+            job = JobService.submit_export(payload.get("asset_type_id"))
+        else:
+            raise APIBadRequest(f"Invalid job type '{job_type}'. Allowed types: {', '.join(JOB_TYPES)}")
+        return json_response(job_to_dict(job), 202, {"Location": job_location(job.id)})
+
+
+@api.route("/<int:job_id>")
+class JobDetail(Resource):
+    method_decorators = [require_api_key]
+
+    @api.response(200, "Success", job_model)
+    def get(self, job_id):
+        """Status and progress of a job"""
+        return json_response(job_to_dict(JobService.get_job(job_id)))
+
+
+@api.route("/<int:job_id>/output")
+class JobOutput(Resource):
+    method_decorators = [require_api_key]
+
+    @api.response(200, "The exported assets, one JSON document per line")
+    @api.response(409, "The export has not finished")
+    def get(self, job_id):
+        """Download the result of a finished export"""
+        chunks = JobService.iter_output(job_id)
+        return Response(stream_with_context(chunks), mimetype="application/x-ndjson")
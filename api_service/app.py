@@ -1,14 +1,25 @@
 # encoding: utf-8
+import os
 
+import click
 from flask import Flask, redirect
+from sqlalchemy.engine import make_url
+from werkzeug.serving import is_running_from_reloader
 
+from api_service import instrumentation
 from api_service.api import api as restx_api
-from api_service.extensions import db, cache
-from api_service.extensions import migrate
-from api_service.manage import cli
+from api_service.extensions import db, cache, init_migrate
+from api_service.services.asset_service import UPSERT_DIALECTS
+from api_service.services.cache_warmup import warm_in_background
 
 
-def create_app(testing=False):
+def create_app(testing=False, serving=False):
+    """Build the app.
+
+    ``serving`` is the lean mode of the WSGI entry point: the CLI-only extensions (Flask-Migrate,
+    the ``cli`` commands) are left out and, unless the app is preloaded, the worker is set up
+    right away (see :func:`init_worker`). ``flask run`` sets up its serving process the same way.
+    """
     app = Flask("api_service")
     app.config.from_object("api_service.config")
 
@@ -17,26 +28,85 @@ def create_app(testing=False):
     if testing is True:
         app.config["TESTING"] = True
 
-    configure_extensions(app)
+    configure_extensions(app, cli=not serving)
+    instrumentation.init_app(app, db, cache)
     register_root_redirect(app)
     register_restx_api(app)
 
+    if (serving and not app.config["PRELOAD_APP"]) or running_dev_server():
+        init_worker(app)
+
     return app
 
 
-def configure_extensions(app):
+def init_worker(app):
+    """Per-process setup of a web worker; Gunicorn's post_fork hook runs it when the app is preloaded."""
+    with app.app_context():
+        # Never share the preloading master's connections with the workers
+        db.engine.dispose(close=False)
+    if app.config["CACHE_WARM_ON_STARTUP"]:
+        warm_in_background(app)
+
+
+def running_dev_server():
+    """Whether the app is being loaded by ``flask run`` to serve requests.
+
+    With ``--reload`` only the reloader's child serves, the watching parent is left out.
+    """
+    ctx = click.get_current_context(silent=True)
+    if ctx is None or ctx.info_name != "run":
+        return False
+    return not ctx.params.get("reload") or is_running_from_reloader()
+
+
+def configure_extensions(app, cli=True):
+    check_database_backend(app)
+    configure_engine_options(app)
     db.init_app(app)
-    migrate.init_app(app, db)
-    app.cli.add_command(cli)
+    if cli:
+        from api_service.manage import cli as cli_group
+
+        init_migrate(app, directory=os.path.join(os.path.dirname(__file__), "migrations"))
+        app.cli.add_command(cli_group)
+
+
+def check_database_backend(app):
+    """Refuse to start on a database the ON CONFLICT upserts of AssetService can't run on."""
+    uri = app.config.get("SQLALCHEMY_DATABASE_URI")
+    if not uri:
+        return  # Flask-SQLAlchemy reports the missing URL itself
+    backend = make_url(uri).get_backend_name()
+    if backend not in UPSERT_DIALECTS:
+        raise RuntimeError(
+            f"Unsupported database '{backend}': DATABASE_URL must point to one of "
+            f"{', '.join(sorted(UPSERT_DIALECTS))} (INSERT ... ON CONFLICT is required)"
+        )
+
+
+def configure_engine_options(app):
+    """Build the connection pool options from config.py; SQLite keeps Flask-SQLAlchemy's own pool."""
+    if (app.config.get("SQLALCHEMY_DATABASE_URI") or "").startswith("sqlite"):
+        return
+    app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", {
+        "pool_size": app.config["DB_POOL_SIZE"],
+        "max_overflow": app.config["DB_MAX_OVERFLOW"],
+        "pool_timeout": app.config["DB_POOL_TIMEOUT"],
+        "pool_recycle": app.config["DB_POOL_RECYCLE"],
+        "pool_pre_ping": app.config["DB_POOL_PRE_PING"],
+    })
 
 
 def register_root_redirect(app):
+    if not app.config["API_DOCS_ENABLED"]:
+        return
+
     @app.route("/", endpoint="redirect_root_to_docs")
     def root_redirect():
         return redirect("/docs", code=302)
 
 def register_restx_api(app):
-    restx_api.init_app(app)
+    # Without specs restx registers neither /docs nor /swagger.json
+    restx_api.init_app(app, add_specs=app.config["API_DOCS_ENABLED"])
 
 
 if __name__ == "__main__":
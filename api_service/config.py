@@ -4,9 +4,11 @@ Use env var to override
 """
 import os
 
-from dotenv import load_dotenv
+if os.path.exists(".flaskenv"):
+    # The flask command loads it too; this covers Gunicorn. Without the file, skip the import.
+    from dotenv import load_dotenv
 
-load_dotenv(".flaskenv")
+    load_dotenv(".flaskenv")
 
 ENV = os.getenv("FLASK_ENV")
 DEBUG = ENV == "development"
@@ -16,8 +18,94 @@ PROPAGATE_EXCEPTIONS = True
 SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL")
 SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+# Connection pool, per worker process (not applied to SQLite)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
 # Flask-Caching
 CACHE_TYPE = os.getenv("CACHE_TYPE", "SimpleCache")
 CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL")
+ASSET_CACHE_TIMEOUT = int(os.getenv("ASSET_CACHE_TIMEOUT", 60))
+# Expired entries are served for this many more seconds while one worker refreshes them
+CACHE_STALE_TTL = int(os.getenv("CACHE_STALE_TTL", 30))
+# Spread expirations: each entry lives ASSET_CACHE_TIMEOUT * (1 +/- CACHE_TTL_JITTER)
+CACHE_TTL_JITTER = float(os.getenv("CACHE_TTL_JITTER", 0.1))
+# How long a rebuild may hold its lock, and how long other workers wait on a cold key
+CACHE_LOCK_TIMEOUT = int(os.getenv("CACHE_LOCK_TIMEOUT", 10))
+# With CACHE_TYPE=api_service.services.tiered_cache.TieredCache: keys starting with one of
+# CACHE_LOCAL_PREFIXES are also kept in each worker for CACHE_LOCAL_TTL seconds, in front of
+# CACHE_REMOTE_TYPE; writes are broadcast to the other workers through Redis pub/sub
+CACHE_REMOTE_TYPE = os.getenv("CACHE_REMOTE_TYPE", "RedisCache")
+CACHE_LOCAL_PREFIXES = os.getenv("CACHE_LOCAL_PREFIXES", "asset_types:,cache:gen:asset_type")
+CACHE_LOCAL_TTL = int(os.getenv("CACHE_LOCAL_TTL", 5))
+CACHE_LOCAL_MAX_BYTES = int(os.getenv("CACHE_LOCAL_MAX_BYTES", 32 * 1024 * 1024))
+# Cache warm-up (`flask cli cache-warm`, and in the background when a web worker starts if
+# CACHE_WARM_ON_STARTUP): types with the most assets first, CACHE_WARM_CONCURRENCY threads
+CACHE_WARM_ON_STARTUP = os.getenv("CACHE_WARM_ON_STARTUP", "false").lower() == "true"
+CACHE_WARM_CONCURRENCY = int(os.getenv("CACHE_WARM_CONCURRENCY", 4))
+CACHE_WARM_MAX_TYPES = int(os.getenv("CACHE_WARM_MAX_TYPES", 50))
+CACHE_WARM_PAGES = int(os.getenv("CACHE_WARM_PAGES", 1))
+
+# Asset listing (keyset pagination and NDJSON streaming)
+ASSET_PAGE_DEFAULT_LIMIT = int(os.getenv("ASSET_PAGE_DEFAULT_LIMIT", 100))
+ASSET_PAGE_MAX_LIMIT = int(os.getenv("ASSET_PAGE_MAX_LIMIT", 1000))
+ASSET_STREAM_BATCH_SIZE = int(os.getenv("ASSET_STREAM_BATCH_SIZE", 500))
+
+# Bulk create/update (POST/PUT /api/v1/assets:batch)
+ASSET_BATCH_MAX_ITEMS = int(os.getenv("ASSET_BATCH_MAX_ITEMS", 10000))
+ASSET_BATCH_CHUNK_SIZE = int(os.getenv("ASSET_BATCH_CHUNK_SIZE", 1000))
+# Row errors listed in the response of a CSV/NDJSON import
+ASSET_IMPORT_MAX_ERRORS = int(os.getenv("ASSET_IMPORT_MAX_ERRORS", 100))
+
+# Response compression, negotiated through Accept-Encoding ("br" and "zstd" need the brotli and
+# zstandard packages). Cached responses keep a compressed copy per encoding.
+COMPRESSION_ENCODINGS = os.getenv("COMPRESSION_ENCODINGS", "br,zstd,gzip")
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 5))
+COMPRESSION_ZSTD_LEVEL = int(os.getenv("COMPRESSION_ZSTD_LEVEL", 3))
+
+# Change feed (GET /api/v1/changes)
+CHANGES_PAGE_DEFAULT_LIMIT = int(os.getenv("CHANGES_PAGE_DEFAULT_LIMIT", 500))
+CHANGES_PAGE_MAX_LIMIT = int(os.getenv("CHANGES_PAGE_MAX_LIMIT", 5000))
+# Longest long-poll a client may ask for, and how often a waiting request re-checks the log
+CHANGES_MAX_WAIT = float(os.getenv("CHANGES_MAX_WAIT", 30))
+CHANGES_POLL_INTERVAL = float(os.getenv("CHANGES_POLL_INTERVAL", 0.5))
+
+# Background jobs (POST /api/v1/jobs, run by `flask cli worker`)
+JOB_MAX_ITEMS = int(os.getenv("JOB_MAX_ITEMS", 200000))
+JOB_CHUNK_SIZE = int(os.getenv("JOB_CHUNK_SIZE", 1000))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", 1))
+# A running job whose worker has not saved progress for this long is handed to another worker
+JOB_LEASE_TIMEOUT = int(os.getenv("JOB_LEASE_TIMEOUT", 300))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+JOB_MAX_ERRORS = int(os.getenv("JOB_MAX_ERRORS", 100))
+
+# Per-request instrumentation: Server-Timing headers and Prometheus metrics at /metrics
+INSTRUMENTATION_ENABLED = os.getenv("INSTRUMENTATION_ENABLED", "true").lower() == "true"
+
+# API keys (`flask cli create-api-key`). Verified keys are remembered per worker for
+# API_KEY_CACHE_TTL seconds, which is also how long a revoked key keeps working.
+API_KEY_CACHE_SIZE = int(os.getenv("API_KEY_CACHE_SIZE", 1024))
+API_KEY_CACHE_TTL = int(os.getenv("API_KEY_CACHE_TTL", 60))
+# Also accept SECRET_KEY as an API key, as before per-client keys existed
+API_KEY_ACCEPT_SECRET_KEY = os.getenv("API_KEY_ACCEPT_SECRET_KEY", "true").lower() == "true"
+
+# Token-bucket rate limiting per API key, shared through Redis when the cache backend is Redis:
+# RATE_LIMIT_PER_SECOND requests per second on average, bursts of up to RATE_LIMIT_BURST
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_PER_SECOND = float(os.getenv("RATE_LIMIT_PER_SECOND", 50))
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", 200))
+# Requests authenticated with SECRET_KEY all share one bucket, so they are only limited on request:
+# deployments that predate per-client keys would otherwise get one global cap across clients
+RATE_LIMIT_SECRET_KEY = os.getenv("RATE_LIMIT_SECRET_KEY", "false").lower() == "true"
+
+# Swagger UI at /docs and the spec at /swagger.json (built on the first request for it)
+API_DOCS_ENABLED = os.getenv("API_DOCS_ENABLED", "true").lower() == "true"
+# Must match Gunicorn's preload_app (gunicorn.conf.py): per-worker setup then runs after the fork
+PRELOAD_APP = os.getenv("GUNICORN_PRELOAD", "false").lower() == "true"
 
 RESTPLUS_MASK_SWAGGER = os.getenv("RESTPLUS_MASK_SWAGGER", False)
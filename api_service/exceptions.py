@@ -10,3 +10,15 @@ class APINotFound(Exception):
 
 class APIBadRequest(Exception):
     """400 - Bad Request"""
+
+
+class APIPreconditionFailed(Exception):
+    """412 - Precondition Failed"""
+
+
+class APITooManyRequests(Exception):
+    """429 - Too Many Requests"""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
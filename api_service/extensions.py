@@ -1,13 +1,24 @@
 # encoding: utf-8
+from functools import lru_cache
+
 from flask_caching import Cache
 from flask_sqlalchemy import SQLAlchemy
-from passlib.context import CryptContext
-from flask_marshmallow import Marshmallow
-from flask_migrate import Migrate
 
 
 db = SQLAlchemy()
-ma = Marshmallow()
-migrate = Migrate()
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
-cache = Cache()
\ No newline at end of file
+cache = Cache()
+
+
+@lru_cache(maxsize=None)
+def pwd_context():
+    """passlib context hashing API keys, imported on first use: most workers never need it."""
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+
+
+def init_migrate(app, directory):
+    """Register Flask-Migrate, which pulls in Alembic; only the `flask db` commands use it."""
+    from flask_migrate import Migrate
+
+    Migrate(app, db, directory=directory)
@@ -0,0 +1,220 @@
+# encoding: utf-8
+"""Per-request performance instrumentation.
+
+When ``INSTRUMENTATION_ENABLED`` is set, :func:`init_app` hooks into the app:
+
+* SQLAlchemy cursor events count statements and their time,
+* the Flask-Caching backend methods are wrapped to time cache round trips, ``TaggedCache``
+  reports whether lookups were hits, stale or misses and ``TieredCache`` which tier served them,
+* :func:`timed` measures phases such as JSON encoding and compression.
+
+Each response gets a ``Server-Timing`` header and the totals feed Prometheus histograms per
+endpoint, served at ``/metrics``. When the layer is off nothing is registered and :func:`timed`
+returns a no-op context manager.
+"""
+import os
+import time
+from collections import Counter
+from contextlib import nullcontext
+from functools import lru_cache
+
+from flask import g, has_app_context, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter as PrometheusCounter, Histogram, REGISTRY,
+    generate_latest, multiprocess,
+)
+from sqlalchemy import event
+
+# Set by init_app: per-tier lookups are counted whether or not a request is being measured
+_tiers_enabled = False
+
+CACHE_METHODS = ("get", "get_many", "set", "set_many", "add", "delete", "delete_many", "inc")
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Time spent handling a request",
+    ["method", "endpoint", "status"], buckets=LATENCY_BUCKETS,
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries", "SQL statements executed per request",
+    ["endpoint"], buckets=QUERY_COUNT_BUCKETS,
+)
+REQUEST_PHASE_SECONDS = Histogram(
+    "http_request_phase_seconds", "Time spent per request in the database, cache and encoding phases",
+    ["endpoint", "phase"], buckets=LATENCY_BUCKETS,
+)
+CACHE_LOOKUPS = PrometheusCounter(
+    "cache_lookups_total", "Tagged cache lookups by result", ["result"],
+)
+CACHE_TIER_LOOKUPS = PrometheusCounter(
+    "cache_tier_lookups_total", "Key lookups of the two-tier cache backend by tier and result",
+    ["tier", "result"],
+)
+
+
+class RequestMetrics:
+    """Counters and timings collected for one request, kept on ``flask.g``."""
+
+    __slots__ = ("started", "durations", "counts", "cache_results")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations = Counter()
+        self.counts = Counter()
+        self.cache_results = Counter()
+
+    def add(self, phase, seconds):
+        self.durations[phase] += seconds
+        self.counts[phase] += 1
+
+    def server_timing(self, total):
+        entries = []
+        for phase, seconds in self.durations.items():
+            entry = f"{phase};dur={seconds * 1000:.2f}"
+            if phase == "db":
+                entry += f';desc="{self.counts[phase]} queries"'
+            elif phase == "cache":
+                results = ", ".join(f"{count} {result}" for result, count in sorted(self.cache_results.items()))
+                entry += f';desc="{self.counts[phase]} ops{", " + results if results else ""}"'
+            entries.append(entry)
+        entries.append(f"app;dur={total * 1000:.2f}")
+        return ", ".join(entries)
+
+
+def current():
+    """Metrics of the current request, or ``None`` outside requests or when the layer is off."""
+    return g.get("request_metrics") if has_app_context() else None
+
+
+class _Timer:
+    __slots__ = ("metrics", "phase", "started")
+
+    def __init__(self, metrics, phase):
+        self.metrics = metrics
+        self.phase = phase
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.metrics.add(self.phase, time.perf_counter() - self.started)
+
+
+def timed(phase):
+    """Context manager adding the time spent in its block to ``phase`` for the current request."""
+    metrics = current()
+    return _Timer(metrics, phase) if metrics is not None else nullcontext()
+
+
+def record_cache_result(result):
+    """Called by ``TaggedCache`` with ``hit``, ``stale`` or ``miss`` for every lookup."""
+    metrics = current()
+    if metrics is not None:
+        metrics.cache_results[result] += 1
+        _child(CACHE_LOOKUPS, result).inc()
+
+
+def record_tier_results(local_hits, local_misses, remote_hits, remote_misses):
+    """Called by ``TieredCache`` for every lookup; process-wide, inside requests or not."""
+    if not _tiers_enabled:
+        return
+    for tier, result, count in (("local", "hit", local_hits), ("local", "miss", local_misses),
+                                ("remote", "hit", remote_hits), ("remote", "miss", remote_misses)):
+        if count:
+            _child(CACHE_TIER_LOOKUPS, tier, result).inc(count)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._instrumentation_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    metrics = current()
+    if metrics is not None:
+        metrics.add("db", time.perf_counter() - context._instrumentation_started)
+
+
+def _timed_cache_call(method):
+    def wrapper(*args, **kwargs):
+        metrics = current()
+        if metrics is None:
+            return method(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            metrics.add("cache", time.perf_counter() - started)
+
+    return wrapper
+
+
+def _instrument_cache(backend):
+    for name in CACHE_METHODS:
+        if hasattr(backend, name):
+            setattr(backend, name, _timed_cache_call(getattr(backend, name)))
+
+
+@lru_cache(maxsize=None)
+def _child(metric, *labels):
+    # ``labels()`` takes a lock and validates its arguments; routes and phases are a small fixed set
+    return metric.labels(*labels)
+
+
+def _endpoint():
+    return request.url_rule.rule if request.url_rule is not None else "unmatched"
+
+
+def _start_request():
+    g.request_metrics = RequestMetrics()
+
+
+def _finish_request(response):
+    metrics = g.get("request_metrics")
+    if metrics is None:
+        return response
+
+    total = time.perf_counter() - metrics.started
+    endpoint = _endpoint()
+    _child(REQUEST_SECONDS, request.method, endpoint, response.status_code).observe(total)
+    _child(REQUEST_DB_QUERIES, endpoint).observe(metrics.counts["db"])
+    for phase, seconds in metrics.durations.items():
+        _child(REQUEST_PHASE_SECONDS, endpoint, phase).observe(seconds)
+
+    response.headers["Server-Timing"] = metrics.server_timing(total)
+    return response
+
+
+def _discard_request_metrics(exc):
+    # The app context, and ``g`` with it, may outlive the request (tests, CLI)
+    g.pop("request_metrics", None)
+
+
+def metrics_payload():
+    """Return ``(body, content_type)`` in the Prometheus text format.
+
+    Under Gunicorn, set ``PROMETHEUS_MULTIPROC_DIR`` so every worker's samples are aggregated.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def init_app(app, db, cache):
+    global _tiers_enabled
+    if not app.config["INSTRUMENTATION_ENABLED"]:
+        return
+    _tiers_enabled = True
+
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(db.engine, "after_cursor_execute", _after_cursor_execute)
+        _instrument_cache(cache.cache)
+
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_discard_request_metrics)
@@ -3,8 +3,6 @@
 import click
 from flask.cli import with_appcontext
 
-from api_service.models import AssetType
-
 
 @click.group()
 def cli():
@@ -16,18 +14,153 @@ def cli():
 @with_appcontext
 def init():
     """Initialize default asset types"""
-    from api_service.extensions import db
+    from api_service.exceptions import APIConflict
+    from api_service.services.asset_service import AssetService
 
     click.echo("Checking and seeding default asset types...")
 
     default_types = ["Laptop", "Monitor", "Software License"]
     for name in default_types:
-        if not AssetType.query.filter_by(name=name).first():
-            db.session.add(AssetType(name=name))
+        # Every container runs this on start; the unique name settles concurrent runs
+        try:
+            AssetService.create_asset_type(name)
+        except APIConflict:
+            pass
 
-    db.session.commit()
     click.echo("Default asset types created (if not already present).")
 
 
+@cli.command("worker")
+@click.option("--once", is_flag=True, help="Run the queued jobs and exit instead of polling for more")
+@click.option("--poll-interval", type=float, default=None,
+              help="Seconds between polls of an empty queue (default: JOB_POLL_INTERVAL)")
+@with_appcontext
+def worker(once, poll_interval):
+    """Run background imports and exports; start as many processes as needed"""
+    import signal
+    import threading
+
+    from api_service.services.job_service import JobService, default_worker_id
+
+    stop = threading.Event()
+    # Finish the current chunk, then put the job back in the queue
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+    worker_id = default_worker_id()
+    click.echo(f"Worker {worker_id} waiting for jobs...")
+    ran = JobService.work(worker_id, once=once, poll_interval=poll_interval, stop=stop)
+    click.echo(f"Worker {worker_id} stopped after {ran} job(s).")
+
+
+@cli.command("export-assets")
+@click.argument("asset_type_id", type=int)
+@click.option("--format", "fmt", type=click.Choice(["csv", "ndjson"]), default="csv", show_default=True)
+@click.option("--output", "-o", type=click.File("wb"), default="-", help="Defaults to stdout")
+@with_appcontext
+def export_assets(asset_type_id, fmt, output):
+    """Write the assets of a type as CSV or NDJSON, one column per field"""
+    from api_service.exceptions import APINotFound
+    from api_service.services.asset_io import AssetIOService
+
+    try:
+        for chunk in AssetIOService.iter_export(asset_type_id, fmt):
+            output.write(chunk)
+    except APINotFound as e:
+        raise click.ClickException(str(e))
+
+
+@cli.command("import-assets")
+@click.argument("asset_type_id", type=int)
+@click.argument("source", type=click.File("rb"))
+@click.option("--format", "fmt", type=click.Choice(["csv", "ndjson"]), default=None,
+              help="Defaults from the file extension")
+@with_appcontext
+def import_assets(asset_type_id, source, fmt):
+    """Create assets of a type from a CSV or NDJSON file in the format of export-assets"""
+    from flask import current_app
+
+    from api_service.exceptions import APIBadRequest, APINotFound
+    from api_service.services.asset_io import AssetIOService
+
+    fmt = fmt or ("ndjson" if source.name.endswith((".ndjson", ".jsonl")) else "csv")
+    try:
+        result = AssetIOService.import_assets(
+            asset_type_id, source, fmt,
+            batch_size=current_app.config["ASSET_BATCH_CHUNK_SIZE"],
+            max_errors=current_app.config["ASSET_IMPORT_MAX_ERRORS"],
+        )
+    except (APIBadRequest, APINotFound) as e:
+        raise click.ClickException(str(e))
+
+    for error in result["errors"]:
+        click.echo(f"line {error['line']}: {error['message']}", err=True)
+    click.echo(f"{result['created']} asset(s) created, {result['failed']} row(s) failed.")
+
+
+@cli.command("cache-warm")
+@click.option("--concurrency", type=int, default=None, help="Threads (default: CACHE_WARM_CONCURRENCY)")
+@click.option("--types", "max_types", type=int, default=None,
+              help="Asset types to warm, most assets first (default: CACHE_WARM_MAX_TYPES)")
+@click.option("--pages", type=int, default=None, help="Unfiltered asset pages (default: CACHE_WARM_PAGES)")
+@with_appcontext
+def cache_warm(concurrency, max_types, pages):
+    """Precompute the hottest cache entries, e.g. after a deploy"""
+    from api_service.services.cache_warmup import CacheWarmupService
+
+    report = CacheWarmupService.warm(concurrency=concurrency, max_types=max_types, pages=pages)
+    for key in report["keys"]:
+        outcome = f"error: {key['error']}" if "error" in key else f"{key['bytes']} bytes"
+        click.echo(f"{key['key']:<40} {key['seconds'] * 1000:8.1f} ms  {outcome}")
+    click.echo(f"Warmed {report['entries']} entries, {report['bytes']} bytes in {report['seconds']:.2f}s.")
+    if report["errors"]:
+        raise click.ClickException(f"{report['errors']} entries failed")
+
+
+@cli.command("create-api-key")
+@click.argument("name")
+@click.option("--rate-limit", type=float, default=None,
+              help="Requests per second (default: RATE_LIMIT_PER_SECOND)")
+@click.option("--burst", type=int, default=None, help="Bucket size (default: RATE_LIMIT_BURST)")
+@with_appcontext
+def create_api_key(name, rate_limit, burst):
+    """Create an API key for a client; it is printed once and only its hash is stored"""
+    from api_service.exceptions import APIConflict
+    from api_service.services.auth_service import ApiKeyService
+
+    try:
+        _, key = ApiKeyService.create_api_key(name, rate_limit=rate_limit, burst=burst)
+    except APIConflict as e:
+        raise click.ClickException(str(e))
+    click.echo(key)
+
+
+@cli.command("revoke-api-key")
+@click.argument("name")
+@with_appcontext
+def revoke_api_key(name):
+    """Revoke an API key (running workers may accept it for up to API_KEY_CACHE_TTL seconds)"""
+    from api_service.exceptions import APINotFound
+    from api_service.services.auth_service import ApiKeyService
+
+    try:
+        ApiKeyService.revoke_api_key(name)
+    except APINotFound as e:
+        raise click.ClickException(str(e))
+    click.echo(f"API key '{name}' revoked.")
+
+
+@cli.command("list-api-keys")
+@with_appcontext
+def list_api_keys():
+    """List API keys with their prefix and rate limits"""
+    from api_service.services.auth_service import ApiKeyService
+
+    for api_key in ApiKeyService.list_api_keys():
+        limits = f"{api_key.rate_limit or 'default'}/s, burst {api_key.burst or 'default'}"
+        status = f"revoked {api_key.revoked_at:%Y-%m-%d}" if api_key.revoked_at else "active"
+        click.echo(f"{api_key.name}\tak_{api_key.prefix}_...\t{limits}\t{status}")
+
+
 if __name__ == "__main__":
     cli()
@@ -0,0 +1,67 @@
+"""initial schema
+
+Revision ID: 4b1e6f0c2a91
+Revises: 
+Create Date: 2026-10-18 09:12:04.118305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b1e6f0c2a91'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'asset_types',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name')
+    )
+    op.create_table(
+        'asset_fields',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('field_type', sa.Enum('Text', 'Number', name='field_type'), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table(
+        'asset_type_fields',
+        sa.Column('type_id', sa.Integer(), nullable=False),
+        sa.Column('field_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['field_id'], ['asset_fields.id'], ),
+        sa.ForeignKeyConstraint(['type_id'], ['asset_types.id'], ),
+        sa.PrimaryKeyConstraint('type_id', 'field_id')
+    )
+    op.create_table(
+        'assets',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('asset_type_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['asset_type_id'], ['asset_types.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table(
+        'asset_data',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('asset_id', sa.Integer(), nullable=False),
+        sa.Column('field_id', sa.Integer(), nullable=False),
+        sa.Column('value', sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(['asset_id'], ['assets.id'], ),
+        sa.ForeignKeyConstraint(['field_id'], ['asset_fields.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('asset_data')
+    op.drop_table('assets')
+    op.drop_table('asset_type_fields')
+    op.drop_table('asset_fields')
+    op.drop_table('asset_types')
+    sa.Enum(name='field_type').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,63 @@
+"""backfill asset_data.value_number for Number fields
+
+Revision ID: 5e20b9d4a7c3
+Revises: d81f4c6e0b37
+Create Date: 2026-10-18 14:21:09.634518
+
+"""
+import math
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e20b9d4a7c3'
+down_revision = 'd81f4c6e0b37'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 10000
+
+
+def _number(value):
+    """``value_number`` of a stored Number value, or None if the write validation would reject it.
+
+    Older rows were only checked with ``float()``, so they may hold e.g. "nan" or "inf". They keep a
+    NULL ``value_number`` and are still served as the stored text. Same rules as
+    ``schema_registry._validate_number``.
+    """
+    try:
+        number = float(value)
+    except (ValueError, TypeError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def upgrade():
+    bind = op.get_bind()
+    first_id, last_id = bind.execute(sa.text("SELECT MIN(id), MAX(id) FROM asset_data")).one()
+    if first_id is None:
+        return
+
+    # Converted here rather than with CAST: Postgres fails on any invalid text and SQLite turns it
+    # into whatever number prefix it finds ('1_000' -> 1.0, 'True' -> 0.0)
+    select_batch = sa.text(
+        "SELECT id, value FROM asset_data "
+        "WHERE id >= :start AND id < :end AND value_number IS NULL "
+        "AND field_id IN (SELECT id FROM asset_fields WHERE field_type = 'Number')"
+    )
+    backfill = sa.text("UPDATE asset_data SET value_number = :value_number WHERE id = :id")
+
+    # Commit every id range on its own so a large table is never locked or rewritten in one go
+    with op.get_context().autocommit_block():
+        for start in range(first_id, last_id + 1, BATCH_SIZE):
+            rows = bind.execute(select_batch, {"start": start, "end": start + BATCH_SIZE}).all()
+            numbers = [{"id": row_id, "value_number": _number(value)} for row_id, value in rows]
+            numbers = [row for row in numbers if row["value_number"] is not None]
+            if numbers:
+                bind.execute(backfill, numbers)
+
+
+def downgrade():
+    pass
@@ -0,0 +1,37 @@
+"""per-client api keys
+
+Revision ID: 7d4c2e19b5f0
+Revises: 0b6e94d3c1a7
+Create Date: 2026-10-18 22:05:41.118342
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d4c2e19b5f0'
+down_revision = '0b6e94d3c1a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'api_keys',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('prefix', sa.String(length=16), nullable=False),
+        sa.Column('key_hash', sa.String(), nullable=False),
+        sa.Column('rate_limit', sa.Float(), nullable=True),
+        sa.Column('burst', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('revoked_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name'),
+        sa.UniqueConstraint('prefix')
+    )
+
+
+def downgrade():
+    op.drop_table('api_keys')
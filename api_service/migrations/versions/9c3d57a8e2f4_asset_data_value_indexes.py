@@ -0,0 +1,32 @@
+"""asset_data value indexes and numeric projection
+
+Revision ID: 9c3d57a8e2f4
+Revises: 4b1e6f0c2a91
+Create Date: 2026-10-18 10:47:31.502716
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c3d57a8e2f4'
+down_revision = '4b1e6f0c2a91'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('asset_data', sa.Column('value_number', sa.Float(), nullable=True))
+
+    op.create_index(
+        'ix_asset_data_field_id_value', 'asset_data', ['field_id', 'value'],
+        postgresql_ops={'value': 'text_pattern_ops'}
+    )
+    op.create_index('ix_asset_data_field_id_value_number', 'asset_data', ['field_id', 'value_number'])
+
+
+def downgrade():
+    op.drop_index('ix_asset_data_field_id_value_number', table_name='asset_data')
+    op.drop_index('ix_asset_data_field_id_value', table_name='asset_data')
+    op.drop_column('asset_data', 'value_number')
@@ -0,0 +1,31 @@
+"""version and updated_at on assets and asset types
+
+Revision ID: a3f6c2d98b14
+Revises: 5e20b9d4a7c3
+Create Date: 2026-10-18 16:02:37.418225
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3f6c2d98b14'
+down_revision = '5e20b9d4a7c3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Constant defaults and a nullable timestamp keep this a metadata-only change on large tables;
+    # existing rows get an updated_at on their next write.
+    for table in ('assets', 'asset_types'):
+        op.add_column(table, sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade():
+    for table in ('asset_types', 'assets'):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('updated_at')
+            batch_op.drop_column('version')
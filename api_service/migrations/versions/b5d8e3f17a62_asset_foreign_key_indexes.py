@@ -0,0 +1,28 @@
+"""indexes on assets.asset_type_id and asset_type_fields.field_id
+
+Revision ID: b5d8e3f17a62
+Revises: 7d4c2e19b5f0
+Create Date: 2026-10-18 23:41:09.274518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5d8e3f17a62'
+down_revision = '7d4c2e19b5f0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # asset_data.asset_id and asset_data.field_id already lead uq_asset_data_asset_id_field_id and
+    # ix_asset_data_field_id_value
+    op.create_index('ix_assets_asset_type_id_id', 'assets', ['asset_type_id', 'id'])
+    op.create_index('ix_asset_type_fields_field_id', 'asset_type_fields', ['field_id'])
+
+
+def downgrade():
+    op.drop_index('ix_asset_type_fields_field_id', table_name='asset_type_fields')
+    op.drop_index('ix_assets_asset_type_id_id', table_name='assets')
@@ -0,0 +1,41 @@
+"""change log feed
+
+Revision ID: c7e1a45f3d20
+Revises: a3f6c2d98b14
+Create Date: 2026-10-18 17:11:52.903614
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7e1a45f3d20'
+down_revision = 'a3f6c2d98b14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'change_log',
+        sa.Column('seq', sa.BigInteger(), autoincrement=False, nullable=False),
+        sa.Column('entity', sa.String(length=20), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('asset_type_id', sa.Integer(), nullable=True),
+        sa.Column('action', sa.String(length=20), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('seq')
+    )
+    change_log_sequence = op.create_table(
+        'change_log_sequence',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('last_seq', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.bulk_insert(change_log_sequence, [{'id': 1, 'last_seq': 0}])
+
+
+def downgrade():
+    op.drop_table('change_log_sequence')
+    op.drop_table('change_log')
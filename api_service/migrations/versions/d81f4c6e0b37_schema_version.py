@@ -0,0 +1,30 @@
+"""schema version counter
+
+Revision ID: d81f4c6e0b37
+Revises: 9c3d57a8e2f4
+Create Date: 2026-10-18 13:05:42.871260
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd81f4c6e0b37'
+down_revision = '9c3d57a8e2f4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    schema_version = op.create_table(
+        'schema_version',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.bulk_insert(schema_version, [{'id': 1, 'version': 0}])
+
+
+def downgrade():
+    op.drop_table('schema_version')
@@ -0,0 +1,30 @@
+"""unique (asset_id, field_id) on asset_data
+
+Revision ID: e52b8a1c9d46
+Revises: c7e1a45f3d20
+Create Date: 2026-10-18 18:21:09.614307
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e52b8a1c9d46'
+down_revision = 'c7e1a45f3d20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Payloads with a repeated field_id were rejected, but keep only the first value of any pair
+    # written some other way so the index can be built.
+    op.execute(sa.text(
+        "DELETE FROM asset_data WHERE id NOT IN "
+        "(SELECT MIN(id) FROM asset_data GROUP BY asset_id, field_id)"
+    ))
+    op.create_index('uq_asset_data_asset_id_field_id', 'asset_data', ['asset_id', 'field_id'], unique=True)
+
+
+def downgrade():
+    op.drop_index('uq_asset_data_asset_id_field_id', table_name='asset_data')
@@ -0,0 +1,48 @@
+"""unique (name, field_type) on asset_fields
+
+Revision ID: f3a9d27c6b85
+Revises: e52b8a1c9d46
+Create Date: 2026-10-18 19:34:52.208713
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a9d27c6b85'
+down_revision = 'e52b8a1c9d46'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Concurrent field creation could insert the same (name, field_type) twice. Merge every
+    # duplicate into the oldest row, moving its type links and asset values, before the index.
+    conn = op.get_bind()
+    duplicates = conn.execute(sa.text(
+        "SELECT f.id, k.keep_id FROM asset_fields f JOIN "
+        "(SELECT name, field_type, MIN(id) AS keep_id FROM asset_fields "
+        " GROUP BY name, field_type HAVING COUNT(*) > 1) k "
+        "ON f.name = k.name AND f.field_type = k.field_type WHERE f.id <> k.keep_id"
+    )).all()
+    for duplicate_id, keep_id in duplicates:
+        params = {"duplicate": duplicate_id, "keep": keep_id}
+        conn.execute(sa.text(
+            "INSERT INTO asset_type_fields (type_id, field_id) "
+            "SELECT type_id, :keep FROM asset_type_fields WHERE field_id = :duplicate "
+            "AND type_id NOT IN (SELECT type_id FROM asset_type_fields WHERE field_id = :keep)"
+        ), params)
+        conn.execute(sa.text("DELETE FROM asset_type_fields WHERE field_id = :duplicate"), params)
+        conn.execute(sa.text(
+            "DELETE FROM asset_data WHERE field_id = :duplicate "
+            "AND asset_id IN (SELECT asset_id FROM asset_data WHERE field_id = :keep)"
+        ), params)
+        conn.execute(sa.text("UPDATE asset_data SET field_id = :keep WHERE field_id = :duplicate"), params)
+        conn.execute(sa.text("DELETE FROM asset_fields WHERE id = :duplicate"), params)
+
+    op.create_index('uq_asset_fields_name_field_type', 'asset_fields', ['name', 'field_type'], unique=True)
+
+
+def downgrade():
+    op.drop_index('uq_asset_fields_name_field_type', table_name='asset_fields')
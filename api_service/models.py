@@ -1,12 +1,20 @@
 # encoding: utf-8
+from datetime import datetime, timezone
 
 from api_service.extensions import db
 
 
+def utcnow():
+    return datetime.now(timezone.utc)
+
+
 class AssetType(db.Model):
     __tablename__ = 'asset_types'
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String, unique=True, nullable=False)
+    # Bumped whenever a field is attached to the type; used as the ETag of its field list
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    updated_at = db.Column(db.DateTime(timezone=True), nullable=True, default=utcnow)
     fields = db.relationship(
         'AssetField',
         secondary='asset_type_fields',
@@ -16,6 +24,10 @@ class AssetType(db.Model):
 
 class AssetField(db.Model):
     __tablename__ = 'asset_fields'
+    __table_args__ = (
+        # Fields are shared between asset types; the conflict target of create_asset_field_for_type
+        db.Index('uq_asset_fields_name_field_type', 'name', 'field_type', unique=True),
+    )
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String, nullable=False)
     field_type = db.Column(
@@ -27,14 +39,23 @@ class AssetField(db.Model):
 asset_type_fields = db.Table(
     'asset_type_fields',
     db.Column('type_id', db.Integer, db.ForeignKey('asset_types.id'), primary_key=True),
-    db.Column('field_id', db.Integer, db.ForeignKey('asset_fields.id'), primary_key=True)
+    db.Column('field_id', db.Integer, db.ForeignKey('asset_fields.id'), primary_key=True),
+    # The primary key only serves lookups by type; this one the types of a field
+    db.Index('ix_asset_type_fields_field_id', 'field_id'),
 )
 
 
 class Asset(db.Model):
     __tablename__ = 'assets'
+    __table_args__ = (
+        # Assets of a type in id order: type-filtered keyset pages, exports, counts and statistics
+        db.Index('ix_assets_asset_type_id_id', 'asset_type_id', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     asset_type_id = db.Column(db.Integer, db.ForeignKey('asset_types.id'), nullable=False)
+    # Bumped by every update of the asset's data; used as its ETag and for If-Match checks
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    updated_at = db.Column(db.DateTime(timezone=True), nullable=True, default=utcnow)
 
     asset_type = db.relationship('AssetType', backref='assets')
     data = db.relationship('AssetData', backref='asset', cascade='all, delete-orphan')
@@ -42,9 +63,114 @@ class Asset(db.Model):
 
 class AssetData(db.Model):
     __tablename__ = 'asset_data'
+    __table_args__ = (
+        # One value per field and asset; also the conflict target of the upsert in update_asset
+        db.Index('uq_asset_data_asset_id_field_id', 'asset_id', 'field_id', unique=True),
+        # text_pattern_ops lets Postgres answer prefix (LIKE 'abc%') filters from the index too
+        db.Index('ix_asset_data_field_id_value', 'field_id', 'value',
+                 postgresql_ops={'value': 'text_pattern_ops'}),
+        db.Index('ix_asset_data_field_id_value_number', 'field_id', 'value_number'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     asset_id = db.Column(db.Integer, db.ForeignKey('assets.id'), nullable=False)
     field_id = db.Column(db.Integer, db.ForeignKey('asset_fields.id'), nullable=False)
     value = db.Column(db.String, nullable=False)
+    # Numeric projection of `value` for Number fields, so range filters and sorts can use an index
+    value_number = db.Column(db.Float, nullable=True)
 
     field = db.relationship('AssetField')
+
+
+class SchemaVersion(db.Model):
+    """Single-row counter bumped whenever asset types or their fields change."""
+    __tablename__ = 'schema_version'
+    SINGLETON_ID = 1
+
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+
+class ChangeLog(db.Model):
+    """Append-only feed of writes to assets, asset types and fields, ordered by ``seq``."""
+    __tablename__ = 'change_log'
+
+    seq = db.Column(db.BigInteger, primary_key=True, autoincrement=False)
+    entity = db.Column(db.String(20), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+    asset_type_id = db.Column(db.Integer, nullable=True)
+    action = db.Column(db.String(20), nullable=False)
+    created_at = db.Column(db.DateTime(timezone=True), nullable=False, default=utcnow)
+
+
+class ChangeLogSequence(db.Model):
+    """Single-row counter handing out ``change_log.seq``.
+
+    Writers take the next numbers right before committing; the row lock makes concurrent writers
+    commit in ``seq`` order, so a reader never sees a gap that is filled later.
+    """
+    __tablename__ = 'change_log_sequence'
+    SINGLETON_ID = 1
+
+    id = db.Column(db.Integer, primary_key=True)
+    last_seq = db.Column(db.BigInteger, nullable=False, default=0)
+
+
+class Job(db.Model):
+    """A background import or export, run by ``flask cli worker`` processes.
+
+    A worker owns a running job while it keeps ``heartbeat_at`` fresh; progress is saved after every
+    chunk, so a job whose worker died is picked up again where it stopped.
+    """
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        db.Index('ix_jobs_status_id', 'status', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_type = db.Column(db.String(20), nullable=False)
+    status = db.Column(db.String(20), nullable=False)
+    params = db.Column(db.JSON, nullable=False, default=dict)
+    total = db.Column(db.Integer, nullable=True)
+    processed = db.Column(db.Integer, nullable=False, default=0)
+    succeeded = db.Column(db.Integer, nullable=False, default=0)
+    failed = db.Column(db.Integer, nullable=False, default=0)
+    # First item errors of an import, as returned by the bulk endpoints
+    errors = db.Column(db.JSON, nullable=False, default=list)
+    error = db.Column(db.String, nullable=True)
+    # Where to resume: next input/output chunk, and the listing cursor of an export
+    next_chunk = db.Column(db.Integer, nullable=False, default=0)
+    cursor = db.Column(db.String, nullable=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    worker = db.Column(db.String, nullable=True)
+    heartbeat_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    created_at = db.Column(db.DateTime(timezone=True), nullable=False, default=utcnow)
+    started_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    finished_at = db.Column(db.DateTime(timezone=True), nullable=True)
+
+
+class JobChunk(db.Model):
+    """Input of an import or output of an export, one encoded chunk per row."""
+    __tablename__ = 'job_chunks'
+
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.id', ondelete='CASCADE'), primary_key=True)
+    stream = db.Column(db.String(10), primary_key=True)
+    seq = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    data = db.Column(db.LargeBinary, nullable=False)
+
+
+class ApiKey(db.Model):
+    """A client's API key, sent as ``X-API-KEY: ak_<prefix>_<secret>``.
+
+    Only a pbkdf2 hash of the key is stored; ``prefix`` finds the row to verify it against.
+    ``rate_limit`` (requests per second) and ``burst`` override the defaults of config.py.
+    """
+    __tablename__ = 'api_keys'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String, unique=True, nullable=False)
+    prefix = db.Column(db.String(16), unique=True, nullable=False)
+    key_hash = db.Column(db.String, nullable=False)
+    rate_limit = db.Column(db.Float, nullable=True)
+    burst = db.Column(db.Integer, nullable=True)
+    created_at = db.Column(db.DateTime(timezone=True), nullable=False, default=utcnow)
+    revoked_at = db.Column(db.DateTime(timezone=True), nullable=True)
@@ -0,0 +1,168 @@
+"""CSV and NDJSON export and import of the assets of one asset type.
+
+Files hold one row per asset: an ``id`` column, then one column per field of the type, headed by
+the field name (``name:field_type`` when the name alone is ambiguous). Exports stream from a
+server-side cursor and imports parse rows lazily and insert them in batches, so memory stays flat
+whatever the number of assets.
+"""
+import csv
+import io
+from collections import Counter
+from itertools import islice
+
+from api_service.exceptions import APIBadRequest, APINotFound
+from api_service.services.asset_service import AssetService
+from api_service.services.cache_service import CachedAssetService
+from api_service.services.schema_registry import schema_registry
+from api_service.services.serialization import dumps, loads
+
+FORMATS = ("csv", "ndjson")
+MIMETYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def column_names(asset_type):
+    """Column of each field of a ``TypeSchema``, qualified by the field type when the name is ambiguous."""
+    counts = Counter(["id"] + [field.name for field in asset_type.fields])
+    return [field.name if counts[field.name] == 1 else f"{field.name}:{field.field_type}"
+            for field in asset_type.fields]
+
+
+def batches(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _get_type(asset_type_id):
+    asset_type = schema_registry.get_type(asset_type_id)
+    if not asset_type:
+        raise APINotFound(f"AssetType with ID {asset_type_id} not found")
+    return asset_type
+
+
+class AssetIOService:
+
+    @staticmethod
+    def iter_export(asset_type_id, fmt, batch_size=1000):
+        """Yield the encoded export of a type's assets, ``batch_size`` rows per chunk.
+
+        The type is looked up right away, so an unknown type raises before anything is streamed.
+        """
+        asset_type = _get_type(asset_type_id)
+        columns = list(zip(column_names(asset_type), [field.id for field in asset_type.fields]))
+
+        def csv_rows(assets):
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(["id"] + [column for column, _ in columns])
+            for batch in batches(assets, batch_size):
+                for asset in batch:
+                    values = {d["field_id"]: d["value"] for d in asset["data"]}
+                    writer.writerow([asset["id"]] + [values.get(field_id, "") for _, field_id in columns])
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                # Only the header: the type has no assets
+                yield buffer.getvalue().encode()
+
+        def ndjson_rows(assets):
+            for batch in batches(assets, batch_size):
+                lines = []
+                for asset in batch:
+                    values = {d["field_id"]: d["value"] for d in asset["data"]}
+                    row = {"id": asset["id"]}
+                    row.update((column, values[field_id]) for column, field_id in columns if field_id in values)
+                    lines.append(dumps(row) + b"\n")
+                yield b"".join(lines)
+
+        assets = AssetService.iter_asset_dicts(batch_size, asset_type_id=asset_type_id)
+        return csv_rows(assets) if fmt == "csv" else ndjson_rows(assets)
+
+    @staticmethod
+    def import_assets(asset_type_id, stream, fmt, batch_size=1000, max_errors=100):
+        """Create one asset per row of a binary ``stream``; returns ``{created, failed, errors}``.
+
+        Rows are read lazily and written ``batch_size`` at a time, each batch in its own
+        transaction, so a failed row does not stop the import. Errors give the ``line`` of the
+        row; the ``id`` column is ignored. An unknown CSV column rejects the file before any write.
+        """
+        asset_type = _get_type(asset_type_id)
+        fields_by_column = {f"{field.name}:{field.field_type}": field for field in asset_type.fields}
+        fields_by_column.update(zip(column_names(asset_type), asset_type.fields))
+
+        read = AssetIOService._read_csv if fmt == "csv" else AssetIOService._read_ndjson
+        rows = read(stream, fields_by_column)
+
+        created, failed, errors = 0, 0, []
+
+        def fail(line, message):
+            nonlocal failed
+            failed += 1
+            if len(errors) < max_errors:
+                errors.append({"line": line, "message": message})
+
+        for batch in batches(rows, batch_size):
+            lines, items = [], []
+            for line, values in batch:
+                if isinstance(values, str):
+                    fail(line, values)
+                    continue
+                lines.append(line)
+                items.append({
+                    "asset_type_id": asset_type.id,
+                    "data": [{"field_id": field.id, "value": value} for field, value in values],
+                })
+            if not items:
+                continue
+            batch_created, batch_errors = CachedAssetService.create_assets_bulk(
+                items, atomic=False, chunk_size=len(items)
+            )
+            created += len(batch_created)
+            for error in batch_errors:
+                fail(lines[error["index"]], error["message"])
+
+        # Parse errors are found before the validation errors of the same batch
+        errors.sort(key=lambda error: error["line"])
+        return {"created": created, "failed": failed, "errors": errors}
+
+    @staticmethod
+    def _read_csv(stream, fields_by_column):
+        """Yield ``(line, [(field, value), ...])`` per row, or ``(line, error_message)``; empty cells are skipped."""
+        if not isinstance(stream, io.BufferedIOBase):
+            stream = io.BufferedReader(stream)
+        reader = csv.reader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+        header = next(reader, None)
+        if not header:
+            raise APIBadRequest("The CSV file is empty")
+        unknown = [column for column in header if column != "id" and column not in fields_by_column]
+        if unknown:
+            raise APIBadRequest(f"Unknown column(s) {unknown}, expected 'id' and {sorted(fields_by_column)}")
+
+        columns = [fields_by_column.get(column) for column in header]
+        for row in reader:
+            if len(row) != len(columns):
+                yield reader.line_num, f"Expected {len(columns)} columns, got {len(row)}"
+                continue
+            yield reader.line_num, [(field, value) for field, value in zip(columns, row) if field and value != ""]
+
+    @staticmethod
+    def _read_ndjson(stream, fields_by_column):
+        """Yield ``(line, [(field, value), ...])`` per JSON object, or ``(line, error_message)``."""
+        for line, text in enumerate(stream, 1):
+            if not text.strip():
+                continue
+            try:
+                row = loads(text)
+            except ValueError:
+                yield line, "Invalid JSON"
+                continue
+            if not isinstance(row, dict):
+                yield line, "Each line must be a JSON object"
+                continue
+            unknown = [key for key in row if key != "id" and key not in fields_by_column]
+            if unknown:
+                yield line, f"Unknown field(s) {unknown}"
+                continue
+            yield line, [(fields_by_column[key], value) for key, value in row.items()
+                         if key != "id" and value is not None]
@@ -0,0 +1,173 @@
+import base64
+import binascii
+import json
+import math
+
+from sqlalchemy import and_, exists, or_
+from sqlalchemy.orm import aliased
+
+from api_service.exceptions import APIBadRequest
+from api_service.models import Asset, AssetData
+from api_service.services.schema_registry import schema_registry
+
+FILTER_OPERATORS = ("eq", "gt", "gte", "lt", "lte", "prefix")
+
+
+def parse_filter(expression):
+    """Parse a ``<field_id>:<op>:<value>`` filter expression into a tuple."""
+    parts = expression.split(":", 2)
+    if len(parts) != 3:
+        raise APIBadRequest(f"Invalid filter '{expression}', expected '<field_id>:<op>:<value>'")
+
+    field_id, op, value = parts
+    if not field_id.isdigit():
+        raise APIBadRequest(f"Invalid filter '{expression}', field_id must be an integer")
+    if op not in FILTER_OPERATORS:
+        raise APIBadRequest(f"Invalid filter operator '{op}'. Allowed operators: {', '.join(FILTER_OPERATORS)}")
+
+    return int(field_id), op, value
+
+
+def parse_sort(expression):
+    """Parse a ``<field_id>`` or ``-<field_id>`` sort expression into ``(field_id, descending)``."""
+    descending = expression.startswith("-")
+    field_id = expression[1:] if descending else expression
+    if not field_id.isdigit():
+        raise APIBadRequest(f"Invalid sort '{expression}', expected '<field_id>' or '-<field_id>'")
+    return int(field_id), descending
+
+
+def encode_cursor(asset_id, sort_value=None, sorted_by_field=False):
+    """Plain listings use the asset id as cursor; field-sorted ones need the sort value as well."""
+    if not sorted_by_field:
+        return str(asset_id)
+    token = json.dumps([sort_value, asset_id]).encode()
+    return base64.urlsafe_b64encode(token).decode()
+
+
+def decode_cursor(cursor, sort_field=None):
+    """Inverse of :func:`encode_cursor`, returns ``(asset_id, sort_value)``.
+
+    Cursors come from clients, so a field-sorted one is checked against ``sort_field``: an integer
+    id, and a sort value typed like the field (or null).
+    """
+    if sort_field is None:
+        if not (cursor.isascii() and cursor.isdigit()):
+            raise APIBadRequest(f"Invalid cursor '{cursor}'")
+        return int(cursor), None
+
+    try:
+        sort_value, asset_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, ValueError, TypeError):
+        raise APIBadRequest(f"Invalid cursor '{cursor}'")
+
+    if sort_value is None:
+        valid_value = True
+    elif sort_field.field_type == "Number":
+        valid_value = type(sort_value) in (int, float) and math.isfinite(sort_value)
+    else:
+        valid_value = isinstance(sort_value, str)
+    if type(asset_id) is not int or not valid_value:
+        raise APIBadRequest(f"Invalid cursor '{cursor}'")
+    return asset_id, sort_value
+
+
+def _load_fields(field_ids):
+    known_fields = schema_registry.current().fields
+    missing = sorted(set(field_ids) - known_fields.keys())
+    if missing:
+        raise APIBadRequest(f"Field ID(s) {missing} do not exist")
+    return {field_id: known_fields[field_id] for field_id in field_ids}
+
+
+def _value_column(data, field):
+    return data.value_number if field.field_type == "Number" else data.value
+
+
+def _typed_value(field, value):
+    if field.field_type != "Number":
+        return value
+    # The validation of writes: "nan" or "inf" would compare meaninglessly
+    _, number = field.validate(value)
+    return number
+
+
+def _filter_condition(field, op, value):
+    """Compile one filter into an EXISTS over ``asset_data`` served by the (field_id, value*) indexes."""
+    column = _value_column(AssetData, field)
+
+    if op == "prefix":
+        if field.field_type == "Number":
+            raise APIBadRequest(f"Prefix filter is not supported on Number field '{field.name}'")
+        condition = column.startswith(value, autoescape=True)
+    else:
+        value = _typed_value(field, value)
+        condition = {
+            "eq": column == value,
+            "gt": column > value,
+            "gte": column >= value,
+            "lt": column < value,
+            "lte": column <= value,
+        }[op]
+
+    return exists().where(
+        AssetData.asset_id == Asset.id,
+        AssetData.field_id == field.id,
+        condition,
+    )
+
+
+def build_asset_query(query, asset_type_id=None, filters=(), sort=None, after=None):
+    """Apply type filter, field filters, ordering and keyset cursor to an ``Asset`` query.
+
+    Returns ``(query, sort_field)``; ``sort_field`` is the ``FieldSchema`` the rows are ordered by,
+    or ``None`` for the default ``id`` order.
+    """
+    field_ids = [field_id for field_id, _, _ in filters]
+    if sort is not None:
+        field_ids.append(sort[0])
+    fields = _load_fields(field_ids) if field_ids else {}
+
+    if asset_type_id is not None:
+        query = query.filter(Asset.asset_type_id == asset_type_id)
+
+    for field_id, op, value in filters:
+        query = query.filter(_filter_condition(fields[field_id], op, value))
+
+    if sort is None:
+        if after is not None:
+            cursor_id, _ = decode_cursor(after)
+            query = query.filter(Asset.id > cursor_id)
+        return query.order_by(Asset.id), None
+
+    sort_field, descending = fields[sort[0]], sort[1]
+    sort_data = aliased(AssetData)
+    sort_column = _value_column(sort_data, sort_field)
+    query = query.outerjoin(
+        sort_data,
+        and_(sort_data.asset_id == Asset.id, sort_data.field_id == sort_field.id)
+    )
+
+    if after is not None:
+        cursor_id, cursor_value = decode_cursor(after, sort_field)
+        if cursor_value is None:
+            # Assets without a value sort last, ordered by id
+            query = query.filter(sort_column.is_(None), Asset.id > cursor_id)
+        else:
+            beyond = sort_column < cursor_value if descending else sort_column > cursor_value
+            query = query.filter(or_(
+                beyond,
+                and_(sort_column == cursor_value, Asset.id > cursor_id),
+                sort_column.is_(None),
+            ))
+
+    ordering = sort_column.desc() if descending else sort_column.asc()
+    return query.order_by(ordering.nulls_last(), Asset.id), sort_field
+
+
+def sort_value_of(asset, sort_field):
+    """Return the value an asset dict is ordered by, typed like the sort column."""
+    for data in asset["data"]:
+        if data["field_id"] == sort_field.id:
+            return data["value"]
+    return None
@@ -1,10 +1,72 @@
 from collections import Counter
+from itertools import groupby
 
-from sqlalchemy.orm import joinedload
+from sqlalchemy import and_, delete, func, insert, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import aliased, joinedload
 
-from api_service.exceptions import APIConflict, APIBadRequest, APINotFound
+from api_service.exceptions import APIConflict, APIBadRequest, APINotFound, APIPreconditionFailed
 from api_service.extensions import db
-from api_service.models import AssetType, AssetField, Asset, AssetData
+from api_service.models import AssetType, AssetField, Asset, AssetData, asset_type_fields, utcnow
+from api_service.services.asset_query import build_asset_query, encode_cursor, sort_value_of
+from api_service.services.change_log import (
+    ACTION_CREATED, ACTION_UPDATED, ENTITY_ASSET, ENTITY_ASSET_FIELD, ENTITY_ASSET_TYPE, ChangeLogService
+)
+from api_service.services.schema_registry import schema_registry
+
+# INSERT constructs offering on_conflict_do_nothing() / on_conflict_do_update(); create_app refuses
+# to start on other databases
+UPSERT_DIALECTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def upsert_insert(target):
+    """``insert(target)`` of the session's dialect, with its ON CONFLICT clauses."""
+    return UPSERT_DIALECTS[db.session.get_bind().dialect.name](target)
+
+
+def is_integer(value):
+    """JSON integers only: ``True`` is an ``int`` to Python but not an ID."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def json_number(number):
+    if number is None:
+        return None
+    number = float(number)
+    return int(number) if number.is_integer() else number
+
+
+def typed_value(value, value_number):
+    """JSON value of a stored ``asset_data`` row: a number for Number fields, the text otherwise.
+
+    Integers are parsed from the stored text, since ``value_number`` only keeps 53 bits of them.
+    """
+    if value_number is None:
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        return json_number(value_number)
+
+
+def asset_type_to_dict(asset_type):
+    return {"id": asset_type.id, "name": asset_type.name}
+
+
+def asset_field_to_dict(field):
+    return {"id": field.id, "name": field.name, "field_type": field.field_type}
+
+
+def asset_to_dict(asset):
+    return {
+        "id": asset.id,
+        "asset_type_id": asset.asset_type_id,
+        "data": [
+            {"field_id": d.field_id, "value": typed_value(d.value, d.value_number)}
+            for d in asset.data
+        ]
+    }
 
 
 class AssetService:
@@ -13,10 +75,21 @@ class AssetService:
 
     @staticmethod
     def create_asset_type(name):
-        if AssetType.query.filter_by(name=name).first():
+        """Create an asset type, raising ``APIConflict`` if the name is taken.
+
+        The unique name decides: a single INSERT ... ON CONFLICT DO NOTHING, so concurrent
+        requests for the same name create it once and the others get a 409.
+        """
+        asset_type = db.session.scalars(
+            upsert_insert(AssetType).values(name=name)
+            .on_conflict_do_nothing(index_elements=[AssetType.name])
+            .returning(AssetType)
+        ).first()
+        if asset_type is None:
+            db.session.rollback()
             raise APIConflict(f"AssetType with name '{name}' already exists")
-        asset_type = AssetType(name=name)
-        db.session.add(asset_type)
+        schema_registry.bump_version()
+        ChangeLogService.record([(ENTITY_ASSET_TYPE, asset_type.id, ACTION_CREATED, None)])
         db.session.commit()
         return asset_type
 
@@ -32,27 +105,55 @@ class AssetService:
 
     @staticmethod
     def create_asset_field_for_type(asset_type_id, field_name, field_type):
+        """Attach the field ``(field_name, field_type)`` to an asset type, creating the field if needed.
+
+        Idempotent and safe under concurrency: the field and the link are inserted with
+        ON CONFLICT DO NOTHING against their unique keys, all in one transaction. The type's
+        version and the schema version are only bumped when the link is new.
+        """
         if not field_name or not field_name.strip():
             raise APIBadRequest("Field name must not be empty")
 
         if field_type not in ("Text", "Number"):
             raise APIBadRequest(f"Invalid field type '{field_type}'. Allowed types: 'Text', 'Number'")
 
-        asset_type = AssetService.get_asset_type_by_id(asset_type_id)
-        if not asset_type:
+        changes = []
+        field = db.session.scalars(
+            upsert_insert(AssetField).values(name=field_name, field_type=field_type)
+            .on_conflict_do_nothing(index_elements=[AssetField.name, AssetField.field_type])
+            .returning(AssetField)
+        ).first()
+        if field is not None:
+            changes.append((ENTITY_ASSET_FIELD, field.id, ACTION_CREATED, None))
+        else:
+            field = AssetField.query.filter_by(name=field_name, field_type=field_type).one()
+
+        try:
+            linked = db.session.execute(
+                upsert_insert(asset_type_fields).values(type_id=asset_type_id, field_id=field.id)
+                .on_conflict_do_nothing()
+                .returning(asset_type_fields.c.field_id)
+            ).first()
+            type_exists = True
+        except IntegrityError:  # foreign key violation
+            linked, type_exists = None, False
+        if linked is not None:
+            # Where foreign keys are not enforced (SQLite) the bump's row count tells whether the type exists
+            type_exists = db.session.execute(
+                update(AssetType)
+                .where(AssetType.id == asset_type_id)
+                .values(version=AssetType.version + 1, updated_at=utcnow())
+                .execution_options(synchronize_session=False)
+            ).rowcount == 1
+            changes.append((ENTITY_ASSET_TYPE, asset_type_id, ACTION_UPDATED, None))
+        if not type_exists:
+            db.session.rollback()
             raise APIBadRequest(f"AssetType with ID {asset_type_id} not found")
 
-        # Ensures idempotent creation and association of a field to an asset type
-        field = AssetField.query.filter_by(name=field_name, field_type=field_type).first()
-        if not field:
-            field = AssetField(name=field_name, field_type=field_type)
-            db.session.add(field)
-            db.session.commit()
-
-        if field not in asset_type.fields:
-            asset_type.fields.append(field)
-            db.session.commit()
-
+        if changes:
+            schema_registry.bump_version()
+            ChangeLogService.record(changes)
+        db.session.commit()
         return field
 
     @staticmethod
@@ -69,106 +170,611 @@ class AssetService:
 
         if not data:
             raise APIBadRequest("Missing 'data' payload")
+        if not is_integer(asset_type_id):
+            raise APIBadRequest("'asset_type_id' must be an integer")
 
-        asset_type = AssetService.get_asset_type_by_id(asset_type_id)
+        asset_type = schema_registry.get_type(asset_type_id)
 
         if not asset_type:
             raise APIBadRequest(f"AssetType with ID {asset_type_id} not found")
 
-        if not asset_type.fields:
-            raise APIBadRequest(f"AssetType {asset_type_id} has no fields defined")
-
-        # Map field_id -> AssetField
-        allowed_field_ids = {f.id: f for f in asset_type.fields}
-
-        field_id_list = [item.get("field_id") for item in data]
-        duplicates = [fid for fid, count in Counter(field_id_list).items() if count > 1]
-        if duplicates:
-            raise APIBadRequest(f"Duplicate field_id(s) found in payload: {duplicates}")
+        values = AssetService._validate_asset_data(asset_type, data)
 
         asset = Asset(asset_type_id=asset_type_id)
         db.session.add(asset)
         db.session.flush()  # get ID without a commit
 
-        for item in data:
-            field_id = item.get("field_id")
-            value = item.get("value")
-
-            if field_id not in allowed_field_ids:
-                raise APIBadRequest(f"Field ID '{field_id}' is not valid for AssetType {asset_type_id}")
-
-            field = allowed_field_ids[field_id]
-
-            if field.field_type == "Number":
-                try:
-                    float(value)
-                except (ValueError, TypeError):
-                    raise APIBadRequest(f"Invalid value for field '{field.name}', expected a number.")
-            elif field.field_type == "Text":
-                if not isinstance(value, str):
-                    raise APIBadRequest(f"Invalid value for field '{field.name}', expected text.")
-
+        for field, stored_value, value_number in values:
             asset_data = AssetData(
                 asset_id=asset.id,
-                field_id=field_id,
-                value=str(value)
+                field_id=field.id,
+                value=stored_value,
+                value_number=value_number
             )
             db.session.add(asset_data)
 
+        ChangeLogService.record([(ENTITY_ASSET, asset.id, ACTION_CREATED, asset_type_id)])
         db.session.commit()
         return asset
 
+    @staticmethod
+    def create_assets_bulk(items, atomic=True, chunk_size=1000):
+        """Validate and insert many assets, returning ``(created, errors)``.
+
+        Field definitions are loaded once per asset type and rows are written with one multi-row
+        INSERT per ``chunk_size`` assets. With ``atomic`` any invalid item aborts the whole batch;
+        otherwise valid items are written and each chunk is committed on its own.
+        """
+        asset_types = schema_registry.current().types
+
+        valid, errors = [], []
+        for index, item in enumerate(items):
+            try:
+                if not isinstance(item, dict):
+                    raise APIBadRequest("Item must be an object with 'asset_type_id' and 'data'")
+                if not item.get("data"):
+                    raise APIBadRequest("Missing 'data' payload")
+                if not is_integer(item.get("asset_type_id")):
+                    raise APIBadRequest("'asset_type_id' must be an integer")
+                asset_type = asset_types.get(item.get("asset_type_id"))
+                if not asset_type:
+                    raise APIBadRequest(f"AssetType with ID {item.get('asset_type_id')} not found")
+                valid.append((index, asset_type.id, AssetService._validate_asset_data(asset_type, item["data"])))
+            except APIBadRequest as e:
+                errors.append({"index": index, "message": str(e)})
+
+        if errors and atomic:
+            return [], errors
+
+        created = []
+        for start in range(0, len(valid), chunk_size):
+            chunk = valid[start:start + chunk_size]
+            try:
+                chunk_created = AssetService._insert_assets(chunk)
+                if not atomic:
+                    AssetService._record_changes(chunk_created, ACTION_CREATED)
+                    db.session.commit()
+                created.extend(chunk_created)
+            except SQLAlchemyError:
+                if atomic:
+                    raise
+                db.session.rollback()
+                errors.extend({"index": index, "message": "Database error while inserting asset"}
+                              for index, _, _ in chunk)
+
+        if atomic:
+            # Once for the whole batch: the change log holds its sequence row locked until the commit
+            AssetService._record_changes(created, ACTION_CREATED)
+            db.session.commit()
+        return created, sorted(errors, key=lambda e: e["index"])
+
+    @staticmethod
+    def _insert_assets(chunk):
+        """Insert ``(index, asset_type_id, values)`` tuples with two multi-row statements."""
+        asset_ids = db.session.scalars(
+            insert(Asset).returning(Asset.id, sort_by_parameter_order=True),
+            [{"asset_type_id": asset_type_id} for _, asset_type_id, _ in chunk]
+        ).all()
+
+        created, data_rows = [], []
+        for asset_id, (index, asset_type_id, values) in zip(asset_ids, chunk):
+            data = []
+            for field, stored_value, value_number in values:
+                data_rows.append({
+                    "asset_id": asset_id,
+                    "field_id": field.id,
+                    "value": stored_value,
+                    "value_number": value_number,
+                })
+                data.append({"field_id": field.id, "value": typed_value(stored_value, value_number)})
+            created.append({"index": index, "id": asset_id, "asset_type_id": asset_type_id, "data": data})
+
+        db.session.execute(insert(AssetData), data_rows)
+        return created
+
     @staticmethod
     def get_all_assets():
         return Asset.query.options(joinedload(Asset.data).joinedload(AssetData.field)).all()
 
+    @staticmethod
+    def iter_asset_dicts(batch_size=1000, asset_type_id=None):
+        """Stream every asset, or every asset of one type, as an ``asset_to_dict`` dict, read-only.
+
+        One column-projected ``select()`` joins assets to their data, ordered by asset id, and
+        consecutive rows are grouped into assets in a single pass. Rows are plain tuples fetched
+        ``batch_size`` at a time from a server-side cursor, so memory stays flat, no ORM object is
+        built and the identity map stays empty.
+        """
+        query = AssetService._asset_rows_select()
+        if asset_type_id is not None:
+            query = query.where(Asset.asset_type_id == asset_type_id)
+        rows = db.session.execute(query.execution_options(yield_per=batch_size))
+        return AssetService._group_asset_rows(rows)
+
+    @staticmethod
+    def _asset_rows_select():
+        return (
+            select(Asset.id, Asset.asset_type_id, AssetData.field_id, AssetData.value, AssetData.value_number)
+            .outerjoin(AssetData, AssetData.asset_id == Asset.id)
+            .order_by(Asset.id, AssetData.id)
+        )
+
+    @staticmethod
+    def _group_asset_rows(rows):
+        """Group rows of :meth:`_asset_rows_select`, ordered by asset id, into asset dicts."""
+        for (asset_id, asset_type_id), asset_rows in groupby(rows, key=lambda row: row[:2]):
+            yield {
+                "id": asset_id,
+                "asset_type_id": asset_type_id,
+                "data": [
+                    {"field_id": field_id, "value": typed_value(value, value_number)}
+                    for _, _, field_id, value, value_number in asset_rows
+                    if field_id is not None
+                ],
+            }
+
+    @staticmethod
+    def get_assets_page(limit, after=None, asset_type_id=None, filters=(), sort=None):
+        """Return up to ``limit`` asset dicts following the ``after`` cursor, and the cursor of the next page.
+
+        ``filters`` is a sequence of ``(field_id, op, value)`` tuples and ``sort`` an optional
+        ``(field_id, descending)`` tuple, see :mod:`api_service.services.asset_query`.
+        The returned cursor is ``None`` when there are no more rows.
+        """
+        query, sort_field = build_asset_query(
+            db.session.query(Asset.id, Asset.asset_type_id),
+            asset_type_id=asset_type_id,
+            filters=filters,
+            sort=sort,
+            after=after,
+        )
+
+        # Fetch one extra row to know whether another page exists
+        rows = query.limit(limit + 1).all()
+        assets = AssetService._load_asset_dicts(rows[:limit])
+        if len(rows) <= limit:
+            return assets, None
+
+        last = assets[-1]
+        if sort_field is None:
+            return assets, encode_cursor(last["id"])
+        return assets, encode_cursor(last["id"], sort_value_of(last, sort_field), sorted_by_field=True)
+
+    @staticmethod
+    def _load_asset_dicts(asset_rows):
+        """Turn ``(id, asset_type_id)`` rows into asset dicts, in order, with one projected query on their data."""
+        assets = {
+            asset_id: {"id": asset_id, "asset_type_id": asset_type_id, "data": []}
+            for asset_id, asset_type_id in asset_rows
+        }
+        if assets:
+            rows = db.session.execute(
+                select(AssetData.asset_id, AssetData.field_id, AssetData.value, AssetData.value_number)
+                .where(AssetData.asset_id.in_(list(assets)))
+                .order_by(AssetData.asset_id, AssetData.id)
+            )
+            for asset_id, field_id, value, value_number in rows:
+                assets[asset_id]["data"].append({"field_id": field_id, "value": typed_value(value, value_number)})
+        return list(assets.values())
+
+    @staticmethod
+    def iter_asset_batches(batch_size, **query):
+        """Yield every asset dict matching ``query`` (see :meth:`get_assets_page`), ``batch_size`` at a time."""
+        after = None
+        while True:
+            assets, after = AssetService.get_assets_page(batch_size, after, **query)
+            if assets:
+                yield assets
+            if after is None:
+                return
+
     @staticmethod
     def get_asset_by_id(asset_id):
         return Asset.query.options(joinedload(Asset.data).joinedload(AssetData.field)).filter_by(id=asset_id).first()
 
     @staticmethod
-    def update_asset(asset_id, updated_data):
-        asset = Asset.query.options(joinedload(Asset.data).joinedload(AssetData.field)).filter_by(id=asset_id).first()
-        if not asset:
+    def get_asset_dict(asset_id):
+        """Read-only variant of :meth:`get_asset_by_id` returning the asset dict, or ``None``."""
+        rows = db.session.execute(AssetService._asset_rows_select().where(Asset.id == asset_id))
+        return next(AssetService._group_asset_rows(rows), None)
+
+    @staticmethod
+    def get_asset_version(asset_id):
+        """Return ``(version, updated_at)`` of an asset, or ``None`` if it does not exist."""
+        return db.session.execute(
+            select(Asset.version, Asset.updated_at).where(Asset.id == asset_id)
+        ).first()
+
+    @staticmethod
+    def update_asset(asset_id, updated_data, expected_versions=None, partial=False, replace=False):
+        """Set an asset's values and bump its version; returns ``(asset_dict, version, updated_at)``.
+
+        By default (PUT) only the listed fields change and the others keep their values. With
+        ``partial`` (PATCH) a ``null`` value removes one. With ``replace`` (PUT ``?replace=true``)
+        ``updated_data`` is the asset's complete set of values and fields left out are removed.
+        Values are written with one INSERT ... ON CONFLICT, whatever the payload size.
+
+        With ``expected_versions`` (the versions named by an If-Match header) the update only
+        happens if the asset is still at one of them. The check and the bump are one UPDATE, so of
+        two concurrent writers holding the same version only the first one succeeds.
+        """
+        bump = (
+            update(Asset)
+            .where(Asset.id == asset_id)
+            .values(version=Asset.version + 1, updated_at=utcnow())
+            .returning(Asset.asset_type_id, Asset.version, Asset.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        if expected_versions is not None:
+            bump = bump.where(Asset.version.in_(expected_versions))
+        bumped = db.session.execute(bump).first()
+        if bumped is None:
+            exists = db.session.query(Asset.id).filter_by(id=asset_id).first()
+            db.session.rollback()
+            if exists:
+                raise APIPreconditionFailed(f"Asset with ID {asset_id} was modified since it was read")
             raise APINotFound(f"Asset with ID {asset_id} not found")
 
-        asset_type = asset.asset_type
+        asset_type_id, version, updated_at = bumped
+        try:
+            values, removed = AssetService._validate_update(
+                asset_id, schema_registry.get_type(asset_type_id), updated_data, partial, replace
+            )
+        except APIBadRequest:
+            db.session.rollback()
+            raise
+        AssetService._write_asset_data(
+            [(asset_id, field, value, value_number) for field, value, value_number in values],
+            [(asset_id, field_id) for field_id in removed],
+        )
+
+        ChangeLogService.record([(ENTITY_ASSET, asset_id, ACTION_UPDATED, asset_type_id)])
+        asset = AssetService._load_asset_dicts([(asset_id, asset_type_id)])[0]
+        db.session.commit()
+        return asset, version, updated_at
+
+    @staticmethod
+    def update_assets_bulk(items, atomic=True, chunk_size=1000, partial=False, replace=False):
+        """Validate and apply many asset updates, returning ``(updated, errors)``.
+
+        ``partial`` and ``replace`` have the meaning of :meth:`update_asset`. Each chunk of ``chunk_size`` items
+        costs a fixed number of statements: one to read the asset types, one upsert and one
+        DELETE for the values, one version bump and one read of the results. With ``atomic`` the
+        whole batch is rolled back if any item is invalid; otherwise valid items are written and
+        each chunk is committed on its own.
+        """
+        asset_types = schema_registry.current().types
+
+        updated, errors, seen = [], [], set()
+        for start in range(0, len(items), chunk_size):
+            chunk = list(enumerate(items[start:start + chunk_size], start))
+            chunk_ids = [item.get("id") for _, item in chunk if isinstance(item, dict) and is_integer(item.get("id"))]
+            type_ids = dict(db.session.execute(
+                select(Asset.id, Asset.asset_type_id).where(Asset.id.in_(chunk_ids))
+            ).all())
+
+            upserts, removals, chunk_assets = [], [], []
+            for index, item in chunk:
+                try:
+                    if not isinstance(item, dict):
+                        raise APIBadRequest("Item must be an object with 'id' and 'data'")
+                    asset_id = item.get("id")
+                    if not is_integer(asset_id):
+                        raise APIBadRequest("'id' must be an integer")
+                    if asset_id not in type_ids:
+                        raise APINotFound(f"Asset with ID {asset_id} not found")
+                    if asset_id in seen:
+                        raise APIBadRequest(f"Duplicate asset ID {asset_id} in batch")
+                    seen.add(asset_id)
+                    values, removed = AssetService._validate_update(
+                        asset_id, asset_types.get(type_ids[asset_id]), item.get("data"), partial, replace
+                    )
+                except (APIBadRequest, APINotFound) as e:
+                    errors.append({"index": index, "message": str(e)})
+                    continue
+
+                upserts.extend((asset_id, field, value, value_number) for field, value, value_number in values)
+                removals.extend((asset_id, field_id) for field_id in removed)
+                chunk_assets.append((index, asset_id, type_ids[asset_id]))
+
+            if not chunk_assets:
+                continue
+            try:
+                AssetService._write_asset_data(upserts, removals)
+                db.session.execute(
+                    update(Asset)
+                    .where(Asset.id.in_([asset_id for _, asset_id, _ in chunk_assets]))
+                    .values(version=Asset.version + 1, updated_at=utcnow())
+                    .execution_options(synchronize_session=False)
+                )
+                chunk_updated = [
+                    dict(asset, index=index) for (index, _, _), asset in zip(
+                        chunk_assets,
+                        AssetService._load_asset_dicts([(asset_id, type_id) for _, asset_id, type_id in chunk_assets])
+                    )
+                ]
+                if not atomic:
+                    AssetService._record_changes(chunk_updated, ACTION_UPDATED)
+                    db.session.commit()
+                updated.extend(chunk_updated)
+            except SQLAlchemyError:
+                if atomic:
+                    raise
+                db.session.rollback()
+                errors.extend({"index": index, "message": "Database error while updating asset"}
+                              for index, _, _ in chunk_assets)
+
+        if atomic:
+            if errors:
+                db.session.rollback()
+                return [], errors
+            AssetService._record_changes(updated, ACTION_UPDATED)
+            db.session.commit()
+        return updated, sorted(errors, key=lambda e: e["index"])
+
+    @staticmethod
+    def _record_changes(assets, action):
+        ChangeLogService.record([(ENTITY_ASSET, a["id"], action, a["asset_type_id"]) for a in assets])
+
+    @staticmethod
+    def _write_asset_data(upserts, removals):
+        """Apply ``(asset_id, field, value, value_number)`` upserts and ``(asset_id, field_id)`` removals.
+
+        Rows are written with INSERT ... ON CONFLICT (asset_id, field_id) DO UPDATE, so values of
+        fields the asset did not have yet are inserted and the others updated in the same statement.
+        """
+        if upserts:
+            # On the Table, not the mapped class: the ORM would split the rows into one statement per
+            # run of rows with the same non-NULL columns (value_number alternates between fields)
+            statement = upsert_insert(AssetData.__table__)
+            statement = statement.on_conflict_do_update(
+                index_elements=[AssetData.asset_id, AssetData.field_id],
+                set_={"value": statement.excluded.value, "value_number": statement.excluded.value_number},
+            )
+            db.session.execute(statement, [
+                {"asset_id": asset_id, "field_id": field.id, "value": value, "value_number": value_number}
+                for asset_id, field, value, value_number in upserts
+            ])
+        if removals:
+            db.session.execute(
+                delete(AssetData)
+                .where(tuple_(AssetData.asset_id, AssetData.field_id).in_(removals))
+                .execution_options(synchronize_session=False)
+            )
+
+    # === Validation helpers ===
+
+    @staticmethod
+    def _check_data_items(data):
+        """Reject payloads that are not a list of ``{"field_id": <int>, "value": ...}`` objects."""
+        if not isinstance(data, list) or not all(isinstance(item, dict) for item in data):
+            raise APIBadRequest("'data' must be a list of objects with 'field_id' and 'value'")
+        for item in data:
+            if not is_integer(item.get("field_id")):
+                raise APIBadRequest(f"Field ID '{item.get('field_id')}' must be an integer")
+
+    @staticmethod
+    def _check_duplicates(data):
+        AssetService._check_data_items(data)
+        field_id_list = [item.get("field_id") for item in data]
+        duplicates = [fid for fid, count in Counter(field_id_list).items() if count > 1]
+        if duplicates:
+            raise APIBadRequest(f"Duplicate field_id(s) found in payload: {duplicates}")
+
+    @staticmethod
+    def _validate_asset_data(asset_type, data):
+        """Validate a create payload against a ``TypeSchema``.
+
+        Returns ``[(field, value, value_number), ...]`` ready to be stored.
+        """
+        if not asset_type.fields:
+            raise APIBadRequest(f"AssetType {asset_type.id} has no fields defined")
+
+        allowed_field_ids = asset_type.fields_by_id
+
+        AssetService._check_duplicates(data)
+
+        values = []
+        for item in data:
+            field_id = item.get("field_id")
+            value = item.get("value")
+
+            if field_id not in allowed_field_ids:
+                raise APIBadRequest(f"Field ID '{field_id}' is not valid for AssetType {asset_type.id}")
+
+            field = allowed_field_ids[field_id]
+            values.append((field, *field.validate(value)))
+        return values
+
+    @staticmethod
+    def _validate_update(asset_id, asset_type, updated_data, partial=False, replace=False):
+        """Validate an update payload against a ``TypeSchema``.
+
+        Returns ``([(field, value, value_number), ...], removed_field_ids)``: the values to upsert
+        and the fields whose values are removed, i.e. the fields set to ``null`` in a partial
+        update or left out of a replacing one.
+        """
         if not asset_type or not asset_type.fields:
             raise APIBadRequest(f"AssetType for asset {asset_id} has no fields defined")
 
         if not updated_data:
             raise APIBadRequest("Missing 'data' payload")
 
-        allowed_field_ids = {f.id: f for f in asset_type.fields}
+        allowed_field_ids = asset_type.fields_by_id
 
-        field_id_list = [item.get("field_id") for item in updated_data]
-        duplicates = [fid for fid, count in Counter(field_id_list).items() if count > 1]
-        if duplicates:
-            raise APIBadRequest(f"Duplicate field_id(s) found in payload: {duplicates}")
+        AssetService._check_duplicates(updated_data)
 
-        update_map = {item["field_id"]: item["value"] for item in updated_data}
+        values, removed = [], []
+        for item in updated_data:
+            field_id = item.get("field_id")
+            value = item.get("value")
 
-        for field_id in update_map:
             if field_id not in allowed_field_ids:
                 raise APIBadRequest(f"Field ID '{field_id}' is not valid for AssetType {asset_type.id}")
 
-        for data in asset.data:
-            field = data.field
-            if data.field_id not in update_map:
-                continue
+            if partial and value is None:
+                removed.append(field_id)
+            else:
+                values.append((allowed_field_ids[field_id], *allowed_field_ids[field_id].validate(value)))
 
-            new_value = update_map[data.field_id]
+        if replace:
+            listed = {item.get("field_id") for item in updated_data}
+            removed = [field.id for field in asset_type.fields if field.id not in listed]
+        return values, removed
 
+    # === Statistics ===
+
+    @staticmethod
+    def get_asset_counts_by_type():
+        rows = db.session.execute(
+            select(AssetType.id, AssetType.name, func.count(Asset.id))
+            .outerjoin(Asset, Asset.asset_type_id == AssetType.id)
+            .group_by(AssetType.id, AssetType.name)
+            .order_by(AssetType.id)
+        )
+        return [{"asset_type_id": type_id, "name": name, "asset_count": count} for type_id, name, count in rows]
+
+    @staticmethod
+    def get_type_stats(asset_type_id, top=5):
+        """Per-field statistics of the assets of a type, computed in SQL.
+
+        Number fields get count/min/max/avg/sum of ``value_number``; Text fields get their count,
+        number of distinct values and the ``top`` most frequent values. Four queries whatever the
+        number of fields. Returns ``None`` when the asset type does not exist.
+        """
+        asset_type = schema_registry.get_type(asset_type_id)
+        if not asset_type:
+            return None
+
+        asset_count = db.session.execute(
+            select(func.count(Asset.id)).where(Asset.asset_type_id == asset_type_id)
+        ).scalar()
+
+        of_type = (
+            select(AssetData.field_id)
+            .join(Asset, Asset.id == AssetData.asset_id)
+            .where(Asset.asset_type_id == asset_type_id)
+            .group_by(AssetData.field_id)
+        )
+        numeric = {
+            row.field_id: row for row in db.session.execute(of_type.add_columns(
+                func.count(AssetData.value_number).label("count"),
+                func.min(AssetData.value_number).label("min"),
+                func.max(AssetData.value_number).label("max"),
+                func.avg(AssetData.value_number).label("avg"),
+                func.sum(AssetData.value_number).label("sum"),
+            ).where(AssetData.field_id.in_([f.id for f in asset_type.fields if f.field_type == "Number"])))
+        }
+        text_field_ids = [f.id for f in asset_type.fields if f.field_type == "Text"]
+        text = {
+            row.field_id: row for row in db.session.execute(of_type.add_columns(
+                func.count(AssetData.value).label("count"),
+                func.count(AssetData.value.distinct()).label("distinct"),
+            ).where(AssetData.field_id.in_(text_field_ids)))
+        }
+        top_values = AssetService._top_values(asset_type_id, [f for f in text_field_ids if f in text], top)
+
+        fields = []
+        for field in asset_type.fields:
+            stats = {"field_id": field.id, "name": field.name, "field_type": field.field_type}
             if field.field_type == "Number":
-                try:
-                    float(new_value)
-                except (ValueError, TypeError):
-                    raise APIBadRequest(f"Invalid value for field '{field.name}', expected a number.")
-            elif field.field_type == "Text":
-                if not isinstance(new_value, str):
-                    raise APIBadRequest(f"Invalid value for field '{field.name}', expected text.")
+                row = numeric.get(field.id)
+                stats.update(
+                    count=row.count if row else 0,
+                    min=json_number(row.min) if row else None,
+                    max=json_number(row.max) if row else None,
+                    avg=float(row.avg) if row and row.avg is not None else None,
+                    sum=json_number(row.sum) if row else None,
+                )
+            else:
+                row = text.get(field.id)
+                stats.update(
+                    count=row.count if row else 0,
+                    distinct=row.distinct if row else 0,
+                    top=top_values.get(field.id, []),
+                )
+            fields.append(stats)
+
+        return {"asset_type_id": asset_type_id, "asset_count": asset_count, "fields": fields}
 
-            data.value = str(new_value)
+    @staticmethod
+    def _top_values(asset_type_id, field_ids, top):
+        """``{field_id: [{value, count}, ...]}``: the ``top`` most frequent values of each Text field, in one query."""
+        if not field_ids:
+            return {}
+        count = func.count().label("count")
+        groups = (
+            select(
+                AssetData.field_id, AssetData.value, count,
+                func.row_number().over(
+                    partition_by=AssetData.field_id, order_by=(func.count().desc(), AssetData.value)
+                ).label("rank"),
+            )
+            .join(Asset, Asset.id == AssetData.asset_id)
+            .where(Asset.asset_type_id == asset_type_id, AssetData.field_id.in_(field_ids))
+            .group_by(AssetData.field_id, AssetData.value)
+            .subquery()
+        )
+        top_values = {}
+        for field_id, value, count in db.session.execute(
+            select(groups.c.field_id, groups.c.value, groups.c.count)
+            .where(groups.c.rank <= top)
+            .order_by(groups.c.field_id, groups.c.rank)
+        ):
+            top_values.setdefault(field_id, []).append({"value": value, "count": count})
+        return top_values
 
-        db.session.commit()
-        return asset
+    @staticmethod
+    def get_type_group_by(asset_type_id, field_id, metric_field_id=None, limit=10):
+        """Group the assets of a type by the value of ``field_id``, most frequent values first.
+
+        With ``metric_field_id`` (a Number field) each group also carries min/max/avg/sum of it.
+        Returns ``None`` when the asset type does not exist.
+        """
+        asset_type = schema_registry.get_type(asset_type_id)
+        if not asset_type:
+            return None
+
+        field = asset_type.fields_by_id.get(field_id)
+        if not field:
+            raise APIBadRequest(f"Field ID '{field_id}' is not valid for AssetType {asset_type_id}")
+        group_column = AssetData.value_number if field.field_type == "Number" else AssetData.value
+
+        query = (
+            select(group_column.label("value"), func.count().label("count"))
+            .join(Asset, Asset.id == AssetData.asset_id)
+            .where(Asset.asset_type_id == asset_type_id, AssetData.field_id == field_id)
+            .group_by(group_column)
+            .order_by(func.count().desc(), group_column)
+            .limit(limit)
+        )
+
+        if metric_field_id is not None:
+            metric_field = asset_type.fields_by_id.get(metric_field_id)
+            if not metric_field or metric_field.field_type != "Number":
+                raise APIBadRequest(f"Metric field ID '{metric_field_id}' must be a Number field of AssetType {asset_type_id}")
+            metric = aliased(AssetData)
+            query = query.outerjoin(
+                metric, and_(metric.asset_id == AssetData.asset_id, metric.field_id == metric_field_id)
+            ).add_columns(
+                func.min(metric.value_number).label("min"),
+                func.max(metric.value_number).label("max"),
+                func.avg(metric.value_number).label("avg"),
+                func.sum(metric.value_number).label("sum"),
+            )
+
+        groups = []
+        for row in db.session.execute(query):
+            group = {
+                "value": json_number(row.value) if field.field_type == "Number" else row.value,
+                "count": row.count,
+            }
+            if metric_field_id is not None:
+                group.update(
+                    min=json_number(row.min),
+                    max=json_number(row.max),
+                    avg=float(row.avg) if row.avg is not None else None,
+                    sum=json_number(row.sum),
+                )
+            groups.append(group)
+        return groups
@@ -1,18 +1,165 @@
-import logging
+"""API key authentication.
+
+Clients send ``X-API-KEY: ak_<prefix>_<secret>``. Keys are stored as pbkdf2 hashes, which take
+milliseconds to check on purpose, so each worker remembers the outcome of a verification for
+``API_KEY_CACHE_TTL`` seconds in an LRU keyed by the SHA-256 of the key: repeated requests cost a
+hash and a dict lookup. Authenticated requests then take a token from the key's rate-limit bucket.
+"""
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from collections import OrderedDict, namedtuple
 from functools import wraps
 
-from flask import request, abort
+from flask import abort, current_app, g, request
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+
+from api_service.exceptions import APIConflict, APINotFound
+from api_service.extensions import db, pwd_context
+from api_service.instrumentation import timed
+from api_service.models import ApiKey, utcnow
+from api_service.services.rate_limit import rate_limiter
+
+KEY_SCHEME = "ak"
+
+# Who a request is authenticated as; ``id`` is None for SECRET_KEY
+Principal = namedtuple("Principal", "id name rate_limit burst")
+
+SECRET_KEY_PRINCIPAL = Principal(None, "SECRET_KEY", None, None)
+
+
+class VerifiedKeyCache:
+    """Thread-safe LRU of ``digest -> Principal`` with a TTL."""
+
+    _MISSING = object()
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, digest):
+        """Return the cached outcome, or ``VerifiedKeyCache._MISSING``."""
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return self._MISSING
+            principal, expires = entry
+            if time.monotonic() >= expires:
+                del self._entries[digest]
+                return self._MISSING
+            self._entries.move_to_end(digest)
+            return principal
+
+    def put(self, digest, principal, ttl, max_size):
+        with self._lock:
+            self._entries[digest] = (principal, time.monotonic() + ttl)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
 
-from api_service.config import SECRET_KEY
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
 
-logger = logging.getLogger(__name__)
+
+verified_keys = VerifiedKeyCache()
+
+
+class ApiKeyService:
+
+    @staticmethod
+    def create_api_key(name, rate_limit=None, burst=None):
+        """Store a new key; returns ``(ApiKey, key)``. The key itself is not kept, show it once."""
+        prefix = secrets.token_hex(4)
+        key = f"{KEY_SCHEME}_{prefix}_{secrets.token_urlsafe(32)}"
+        api_key = ApiKey(name=name, prefix=prefix, key_hash=pwd_context().hash(key),
+                         rate_limit=rate_limit, burst=burst)
+        db.session.add(api_key)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            raise APIConflict(f"API key '{name}' already exists")
+        return api_key, key
+
+    @staticmethod
+    def revoke_api_key(name):
+        """Revoke a key; workers that verified it recently accept it until their cache entry expires."""
+        revoked = db.session.execute(
+            update(ApiKey)
+            .where(ApiKey.name == name, ApiKey.revoked_at.is_(None))
+            .values(revoked_at=utcnow())
+        ).rowcount
+        db.session.commit()
+        if not revoked:
+            raise APINotFound(f"No active API key named '{name}'")
+        verified_keys.clear()
+
+    @staticmethod
+    def list_api_keys():
+        return db.session.scalars(select(ApiKey).order_by(ApiKey.id)).all()
+
+    @staticmethod
+    def authenticate(key):
+        """Return the ``Principal`` of a presented key, or ``None`` if it is not valid."""
+        if not key:
+            return None
+        digest = hashlib.sha256(key.encode()).digest()
+        principal = verified_keys.get(digest)
+        if principal is not VerifiedKeyCache._MISSING:
+            return principal
+
+        principal, verified = ApiKeyService._verify(key)
+        if verified and principal is not None:
+            # Only valid keys are remembered: any stranger could fill the LRU with rejected ones and
+            # evict them
+            config = current_app.config
+            verified_keys.put(digest, principal, config["API_KEY_CACHE_TTL"], config["API_KEY_CACHE_SIZE"])
+        return principal
+
+    @staticmethod
+    def _verify(key):
+        """Return ``(principal or None, whether the pbkdf2 hash was checked)``."""
+        secret_key = current_app.config["SECRET_KEY"]
+        if current_app.config["API_KEY_ACCEPT_SECRET_KEY"] and secret_key:
+            if hmac.compare_digest(key.encode(), secret_key.encode()):
+                return SECRET_KEY_PRINCIPAL, False
+
+        scheme, _, rest = key.partition("_")
+        prefix, _, _ = rest.partition("_")
+        if scheme != KEY_SCHEME or not prefix:
+            return None, False
+        row = db.session.execute(
+            select(ApiKey.id, ApiKey.name, ApiKey.key_hash, ApiKey.rate_limit, ApiKey.burst)
+            .where(ApiKey.prefix == prefix, ApiKey.revoked_at.is_(None))
+        ).first()
+        if row is None:
+            return None, False
+        if not pwd_context().verify(key, row.key_hash):
+            return None, True
+        return Principal(row.id, row.name, row.rate_limit, row.burst), True
 
 
 def require_api_key(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
-        if request.headers.get('X-API-KEY') != SECRET_KEY:
-            abort(401, description='Invalid or missing API key')
+        with timed("auth"):
+            principal = ApiKeyService.authenticate(request.headers.get('X-API-KEY'))
+            if principal is None:
+                abort(401, description='Invalid or missing API key')
+            g.api_key = principal
+
+            config = current_app.config
+            limited = principal.id is not None or config["RATE_LIMIT_SECRET_KEY"]
+            if config["RATE_LIMIT_ENABLED"] and limited:
+                rate_limiter.check(
+                    principal.id if principal.id is not None else "secret",
+                    principal.rate_limit or config["RATE_LIMIT_PER_SECOND"],
+                    principal.burst or config["RATE_LIMIT_BURST"],
+                )
         return func(*args, **kwargs)
 
     return wrapper
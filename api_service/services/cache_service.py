@@ -0,0 +1,443 @@
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import Counter
+
+from flask import current_app
+from flask_caching.backends import NullCache, SimpleCache
+
+from api_service import instrumentation
+from api_service.extensions import cache
+from api_service.services.asset_service import (
+    AssetService, asset_field_to_dict, asset_type_to_dict
+)
+from api_service.services.serialization import encode_cached
+
+# Unfiltered listings are tagged with the blocks of asset ids they cover, so writing one asset
+# only invalidates the pages around it.
+ASSET_ID_BLOCK_SIZE = 1000
+
+ASSET_TYPES_TAG = "asset_types"
+ASSETS_TAIL_TAG = "assets:tail"
+ASSETS_QUERY_TAG = "assets:query"
+
+
+# Delete a rebuild lock only while it still holds the caller's token: a holder that outlived the
+# lock's TTL must not release the lock another worker has taken since
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def asset_tag(asset_id):
+    return f"asset:{asset_id}"
+
+
+def asset_block_tag(asset_id):
+    return f"assets:block:{asset_id // ASSET_ID_BLOCK_SIZE}"
+
+
+def asset_type_tag(type_id):
+    return f"asset_type:{type_id}"
+
+
+def asset_type_fields_tag(type_id):
+    return f"asset_type:{type_id}:fields"
+
+
+def asset_type_assets_tag(type_id):
+    return f"asset_type:{type_id}:assets"
+
+
+class TaggedCache:
+    """Tag-based invalidation on top of any Flask-Caching backend.
+
+    Every tag has a generation counter stored in the cache itself. Entries remember the
+    generations of their tags when they were built and are treated as misses once any of them
+    moved on, so invalidating a tag is a single ``inc`` that works the same on SimpleCache and
+    RedisCache, whatever the number of entries it covers.
+
+    Rebuilds are single-flight: only the worker holding the key's lock (``add`` of a random token
+    in Redis, released only by its owner; a local lock for in-process backends) recomputes it.
+    Entries outlive their (jittered) TTL by ``CACHE_STALE_TTL`` seconds, during which other workers
+    keep getting the expired value instead of piling onto the database. Invalidated entries are
+    never served.
+    """
+
+    _MISSING = object()
+    _FRESH, _STALE = "fresh", "stale"
+    _LOCAL_LOCK_STRIPES = 64
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.counters = Counter()
+        self._local_locks = [threading.Lock() for _ in range(self._LOCAL_LOCK_STRIPES)]
+        self._release_script = None
+
+    @staticmethod
+    def _generation_key(tag):
+        return f"cache:gen:{tag}"
+
+    @staticmethod
+    def _lock_key(key):
+        return f"cache:lock:{key}"
+
+    def _generations(self, tags):
+        tags = sorted(set(tags))
+        if not tags:
+            return {}
+        keys = [self._generation_key(tag) for tag in tags]
+        generations = dict(zip(tags, self.cache.get_many(*keys)))
+        for tag, generation in generations.items():
+            if generation is None:
+                # Start from the clock rather than 0 so an evicted counter can't resurrect old entries
+                self.cache.add(self._generation_key(tag), time.time_ns() // 1000, timeout=0)
+                generations[tag] = self.cache.get(self._generation_key(tag))
+        return generations
+
+    def _lookup(self, key):
+        """Return ``(state, value)``, ``state`` being fresh, stale or ``None`` for a miss."""
+        entry = self.cache.get(key)
+        if entry is None:
+            return None, None
+
+        generations, value, fresh_until = entry
+        if self._generations(generations.keys()) != generations:
+            self.counters["invalidated"] += 1
+            return None, None
+        return (self._FRESH if time.time() < fresh_until else self._STALE), value
+
+    def backend(self):
+        """The shared backend, behind the local tier of a ``TieredCache``."""
+        return getattr(self.cache.cache, "remote", self.cache.cache)
+
+    def _uses_local_lock(self):
+        return isinstance(self.backend(), (SimpleCache, NullCache))
+
+    def _acquire(self, key, blocking=False):
+        """Take the rebuild lock of ``key``; returns the token to release it with, or ``None``."""
+        if self._uses_local_lock():
+            lock = self._local_locks[hash(key) % self._LOCAL_LOCK_STRIPES]
+            timeout = current_app.config["CACHE_LOCK_TIMEOUT"] if blocking else -1
+            return True if lock.acquire(blocking, timeout) else None
+
+        # An int is stored as plain digits by the Redis backends, so the release script can compare it
+        token = random.getrandbits(62) | 1
+        deadline = time.monotonic() + (current_app.config["CACHE_LOCK_TIMEOUT"] if blocking else 0)
+        while not self.cache.add(self._lock_key(key), token, timeout=current_app.config["CACHE_LOCK_TIMEOUT"]):
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(0.05)
+        return token
+
+    def _release(self, key, token):
+        if self._uses_local_lock():
+            self._local_locks[hash(key) % self._LOCAL_LOCK_STRIPES].release()
+            return
+
+        backend = self.backend()
+        client = getattr(backend, "_write_client", None)
+        if client is not None:
+            if self._release_script is None:
+                self._release_script = client.register_script(RELEASE_LOCK_SCRIPT)
+            self._release_script(keys=[f"{backend._get_prefix()}{self._lock_key(key)}"], args=[token])
+        elif self.cache.get(self._lock_key(key)) == token:
+            # Backends without a compare-and-delete: only the window between the two calls is left
+            self.cache.delete(self._lock_key(key))
+
+    def set(self, key, value, generations, timeout=None):
+        timeout = timeout if timeout is not None else current_app.config.get("CACHE_DEFAULT_TIMEOUT", 300)
+        jitter = current_app.config["CACHE_TTL_JITTER"]
+        fresh_for = timeout * random.uniform(1 - jitter, 1 + jitter)
+        self.cache.set(
+            key,
+            (generations, value, time.time() + fresh_for),
+            timeout=int(fresh_for) + current_app.config["CACHE_STALE_TTL"] + 1,
+        )
+
+    def cached(self, key, build, tags, timeout=None, watch=()):
+        """Return the value stored under ``key``, building and storing it on a miss.
+
+        ``tags`` is a list, or a callable returning the tags of a freshly built value. Generations of
+        a static list are read before building, so a write that lands meanwhile is not masked.
+        Those of a callable can only be read after it, so give it ``watch``: tags invalidated by
+        every write that could affect the value (before the value's own tags, see
+        :meth:`invalidate`). If one of them moves during the build the value is returned but not
+        stored. ``None`` results are returned but not stored either.
+        """
+        state, value = self._lookup(key)
+        if state == self._FRESH:
+            self.counters["hits"] += 1
+            instrumentation.record_cache_result("hit")
+            return value
+
+        if state == self._STALE:
+            instrumentation.record_cache_result("stale")
+            token = self._acquire(key)
+            if token is None:
+                # Someone else is refreshing it
+                self.counters["stale"] += 1
+                return value
+        else:
+            self.counters["misses"] += 1
+            instrumentation.record_cache_result("miss")
+            token = self._acquire(key)
+            if token is None:
+                # Wait for the worker already building it rather than running the same query
+                self.counters["waits"] += 1
+                token = self._acquire(key, blocking=True)
+                if token is None:
+                    # The builder is taking too long, compute it ourselves without the lock
+                    return self._build(key, build, tags, timeout, watch)
+                state, value = self._lookup(key)
+                if state is not None:
+                    self._release(key, token)
+                    return value
+
+        try:
+            return self._build(key, build, tags, timeout, watch)
+        finally:
+            self._release(key, token)
+
+    def _build(self, key, build, tags, timeout, watch=()):
+        generations = {} if callable(tags) else self._generations(tags)
+        watched = self._generations(watch)
+        value = build()
+        if value is None:
+            return None
+        if callable(tags):
+            generations = self._generations(tags(value))
+        if watched and self._generations(watch) != watched:
+            # A write landed during the build; the generations just read may already include it
+            self.counters["discarded"] += 1
+            return value
+
+        self.set(key, value, generations, timeout=timeout)
+        return value
+
+    def invalidate(self, *tags):
+        """Move the generations of ``tags`` on, in the given order."""
+        for tag in dict.fromkeys(tags):
+            # Flask-Caching does not proxy inc(), go to the backend (atomic INCR on Redis)
+            self.cache.cache.inc(self._generation_key(tag))
+            self.counters["invalidations"] += 1
+
+    def stats(self):
+        lookups = self.counters["hits"] + self.counters["stale"] + self.counters["misses"]
+        return {
+            "hits": self.counters["hits"],
+            "stale": self.counters["stale"],
+            "misses": self.counters["misses"],
+            "waits": self.counters["waits"],
+            "invalidated": self.counters["invalidated"],
+            "invalidations": self.counters["invalidations"],
+            "discarded": self.counters["discarded"],
+            "hit_rate": round((self.counters["hits"] + self.counters["stale"]) / lookups, 4) if lookups else None,
+            **({"tiers": self.cache.cache.stats()} if hasattr(self.cache.cache, "stats") else {}),
+        }
+
+
+tagged_cache = TaggedCache(cache)
+
+
+def _timeout():
+    return current_app.config["ASSET_CACHE_TIMEOUT"]
+
+
+def _page_key(limit, after, asset_type_id, filters, sort):
+    # A digest of a canonical JSON dump: filter values are free text, so no separator is safe
+    query = json.dumps(
+        [asset_type_id, sorted([list(f) for f in filters], key=repr), list(sort) if sort else None, after, limit],
+        separators=(",", ":"),
+    )
+    return f"assets:page:{hashlib.sha256(query.encode()).hexdigest()}.json"
+
+
+def _page_tags(asset_type_id, filters, sort):
+    if asset_type_id is not None:
+        return [asset_type_assets_tag(asset_type_id)]
+    if filters or sort:
+        return [ASSETS_QUERY_TAG]
+
+    def id_range_tags(page):
+        _, next_cursor, id_range = page
+        tags = []
+        if id_range:
+            first_id, last_id = id_range
+            block_start = first_id - first_id % ASSET_ID_BLOCK_SIZE
+            tags += [asset_block_tag(asset_id) for asset_id in range(block_start, last_id + 1, ASSET_ID_BLOCK_SIZE)]
+        if next_cursor is None:
+            # The last page grows when assets are created
+            tags.append(ASSETS_TAIL_TAG)
+        return tags
+
+    return id_range_tags
+
+
+class CachedAssetService:
+    """Read-through cache around :class:`AssetService`.
+
+    Reads return JSON bodies encoded and pre-compressed once (see ``serialization.encode_cached``),
+    so hits skip the database, the encoding and the compression. Writes go through here so they
+    invalidate only the entries tagged with the assets and asset types they touch.
+    """
+
+    # === Asset Types ===
+
+    @staticmethod
+    def get_all_asset_types():
+        return tagged_cache.cached(
+            "asset_types:all.json",
+            lambda: encode_cached([asset_type_to_dict(t) for t in AssetService.get_all_asset_types()]),
+            tags=[ASSET_TYPES_TAG],
+            timeout=_timeout(),
+        )
+
+    @staticmethod
+    def get_asset_type(type_id):
+        """Return ``(body, version, updated_at)`` of an asset type, or ``None``."""
+        def build():
+            asset_type = AssetService.get_asset_type_by_id(type_id)
+            if not asset_type:
+                return None
+            return encode_cached(asset_type_to_dict(asset_type)), asset_type.version, asset_type.updated_at
+
+        return tagged_cache.cached(f"asset_types:{type_id}:versioned.json", build,
+                                   tags=[asset_type_tag(type_id), asset_type_fields_tag(type_id)],
+                                   timeout=_timeout())
+
+    @staticmethod
+    def get_fields_for_type(type_id):
+        """Return ``(body, version, updated_at)`` of an asset type's field list, or ``None``."""
+        def build():
+            asset_type = AssetService.get_asset_type_by_id(type_id)
+            if not asset_type:
+                return None
+            fields = [asset_field_to_dict(f) for f in asset_type.fields]
+            return encode_cached(fields), asset_type.version, asset_type.updated_at
+
+        return tagged_cache.cached(f"asset_types:{type_id}:fields:versioned.json", build,
+                                   tags=[asset_type_fields_tag(type_id)], timeout=_timeout())
+
+    @staticmethod
+    def create_asset_type(name):
+        asset_type = AssetService.create_asset_type(name)
+        tagged_cache.invalidate(ASSET_TYPES_TAG)
+        return asset_type
+
+    @staticmethod
+    def create_asset_field_for_type(asset_type_id, field_name, field_type):
+        field = AssetService.create_asset_field_for_type(asset_type_id, field_name, field_type)
+        tagged_cache.invalidate(asset_type_fields_tag(asset_type_id))
+        return field
+
+    # === Assets ===
+
+    @staticmethod
+    def get_assets_page(limit, after=None, asset_type_id=None, filters=(), sort=None):
+        """Return ``(body, next_cursor)`` for one page of assets."""
+        def build():
+            assets, next_cursor = AssetService.get_assets_page(
+                limit, after, asset_type_id=asset_type_id, filters=filters, sort=sort
+            )
+            id_range = (assets[0]["id"], assets[-1]["id"]) if assets else None
+            return encode_cached(assets), next_cursor, id_range
+
+        tags = _page_tags(asset_type_id, filters, sort)
+        body, next_cursor, _ = tagged_cache.cached(
+            _page_key(limit, after, asset_type_id, filters, sort),
+            build,
+            tags=tags,
+            timeout=_timeout(),
+            # The id blocks of a page are only known once it is built
+            watch=[ASSETS_QUERY_TAG] if callable(tags) else (),
+        )
+        return body, next_cursor
+
+    @staticmethod
+    def get_asset(asset_id):
+        """Return ``(body, version, updated_at)`` of an asset, or ``None``."""
+        def build():
+            # Version first: a concurrent update can then only pair an old ETag with a newer body
+            state = AssetService.get_asset_version(asset_id)
+            asset = AssetService.get_asset_dict(asset_id) if state else None
+            if not asset:
+                return None
+            return encode_cached(asset), state.version, state.updated_at
+
+        return tagged_cache.cached(f"asset:{asset_id}:versioned.json", build,
+                                   tags=[asset_tag(asset_id)], timeout=_timeout())
+
+    @staticmethod
+    def create_asset(asset_type_id, data):
+        asset = AssetService.create_asset(asset_type_id, data)
+        CachedAssetService._invalidate_assets([(asset.id, asset.asset_type_id)], created=True)
+        return asset
+
+    @staticmethod
+    def update_asset(asset_id, updated_data, expected_versions=None, partial=False, replace=False):
+        asset, version, updated_at = AssetService.update_asset(
+            asset_id, updated_data, expected_versions=expected_versions, partial=partial, replace=replace
+        )
+        CachedAssetService._invalidate_assets([(asset["id"], asset["asset_type_id"])])
+        return asset, version, updated_at
+
+    @staticmethod
+    def create_assets_bulk(items, atomic=True, chunk_size=1000):
+        created, errors = AssetService.create_assets_bulk(items, atomic=atomic, chunk_size=chunk_size)
+        CachedAssetService._invalidate_assets([(a["id"], a["asset_type_id"]) for a in created], created=True)
+        return created, errors
+
+    @staticmethod
+    def update_assets_bulk(items, atomic=True, chunk_size=1000, partial=False, replace=False):
+        updated, errors = AssetService.update_assets_bulk(items, atomic=atomic, chunk_size=chunk_size,
+                                                          partial=partial, replace=replace)
+        CachedAssetService._invalidate_assets([(a["id"], a["asset_type_id"]) for a in updated])
+        return updated, errors
+
+    # === Statistics ===
+
+    @staticmethod
+    def get_asset_counts_by_type():
+        return tagged_cache.cached(
+            "stats:asset_types",
+            AssetService.get_asset_counts_by_type,
+            tags=lambda counts: [ASSET_TYPES_TAG] + [asset_type_assets_tag(c["asset_type_id"]) for c in counts],
+            timeout=_timeout(),
+            watch=[ASSET_TYPES_TAG, ASSETS_QUERY_TAG],
+        )
+
+    @staticmethod
+    def get_type_stats(type_id, top=5):
+        return tagged_cache.cached(
+            f"stats:asset_type:{type_id}:{top}",
+            lambda: AssetService.get_type_stats(type_id, top=top),
+            tags=[asset_type_assets_tag(type_id), asset_type_fields_tag(type_id)],
+            timeout=_timeout(),
+        )
+
+    @staticmethod
+    def get_type_group_by(type_id, field_id, metric_field_id=None, limit=10):
+        return tagged_cache.cached(
+            f"stats:asset_type:{type_id}:group_by:{field_id}:{metric_field_id or ''}:{limit}",
+            lambda: AssetService.get_type_group_by(type_id, field_id, metric_field_id=metric_field_id, limit=limit),
+            tags=[asset_type_assets_tag(type_id), asset_type_fields_tag(type_id)],
+            timeout=_timeout(),
+        )
+
+    @staticmethod
+    def _invalidate_assets(assets, created=False):
+        if not assets:
+            return
+        # ASSETS_QUERY_TAG first: builds watching it must see it move before any other tag
+        tags = [ASSETS_QUERY_TAG]
+        if created:
+            tags.append(ASSETS_TAIL_TAG)
+        for asset_id, asset_type_id in assets:
+            tags.extend((asset_tag(asset_id), asset_block_tag(asset_id), asset_type_assets_tag(asset_type_id)))
+        tagged_cache.invalidate(*tags)
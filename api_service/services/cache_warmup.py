@@ -0,0 +1,119 @@
+"""Cache warm-up: precompute the entries hit first after a deploy.
+
+Fills the asset type list, the asset counts per type and, for the ``CACHE_WARM_MAX_TYPES`` types
+with the most assets, the type, its field list and the first page of its assets, plus the first
+``CACHE_WARM_PAGES`` unfiltered pages. Entries are built through ``CachedAssetService`` on at most
+``CACHE_WARM_CONCURRENCY`` threads, so they go through the usual single-flight rebuilds and entries
+that are already cached are only read.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+from api_service.services.cache_service import CachedAssetService
+from api_service.services.compression import PrecompressedBody
+from api_service.services.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+
+def body_size(value):
+    """Bytes of the JSON body of a cached value, ``(body, ...)`` tuples included."""
+    if isinstance(value, tuple):
+        value = value[0]
+    if value is None:
+        return 0
+    if isinstance(value, PrecompressedBody):
+        return len(value.identity)
+    return len(dumps(value))
+
+
+class CacheWarmupService:
+
+    @staticmethod
+    def warm(concurrency=None, max_types=None, pages=None):
+        """Build the hottest entries; returns ``{entries, bytes, seconds, errors, keys: [...]}``."""
+        config = current_app.config
+        concurrency = concurrency or config["CACHE_WARM_CONCURRENCY"]
+        max_types = config["CACHE_WARM_MAX_TYPES"] if max_types is None else max_types
+        pages = config["CACHE_WARM_PAGES"] if pages is None else pages
+        limit = config["ASSET_PAGE_DEFAULT_LIMIT"]
+        app = current_app._get_current_object()
+        started = time.perf_counter()
+
+        counts = []
+
+        def asset_counts():
+            counts.extend(CachedAssetService.get_asset_counts_by_type())
+            return body_size(counts)
+
+        # The counts pick the types to warm, so they come first
+        keys = [CacheWarmupService._build(app, "stats:asset_types", asset_counts)]
+        hottest = sorted(counts, key=lambda c: -c["asset_count"])[:max_types]
+
+        tasks = [
+            ("asset_types:all", lambda: body_size(CachedAssetService.get_all_asset_types())),
+            ("assets:pages", lambda: CacheWarmupService._first_pages(limit, pages)),
+        ]
+        for type_id in (c["asset_type_id"] for c in hottest):
+            tasks += [
+                (f"asset_types:{type_id}", lambda t=type_id: body_size(CachedAssetService.get_asset_type(t))),
+                (f"asset_types:{type_id}:fields",
+                 lambda t=type_id: body_size(CachedAssetService.get_fields_for_type(t))),
+                (f"assets:pages:type:{type_id}",
+                 lambda t=type_id: CacheWarmupService._first_pages(limit, 1, asset_type_id=t)),
+            ]
+
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="cache-warm") as pool:
+            keys += pool.map(lambda task: CacheWarmupService._build(app, *task), tasks)
+
+        return {
+            "entries": len(keys),
+            "bytes": sum(k["bytes"] for k in keys),
+            "seconds": round(time.perf_counter() - started, 4),
+            "errors": sum(1 for k in keys if "error" in k),
+            "keys": keys,
+        }
+
+    @staticmethod
+    def _build(app, name, build):
+        """Run ``build`` (returning a size in bytes) in its own app context, and so its own session."""
+        with app.app_context():
+            started = time.perf_counter()
+            try:
+                size = build()
+            except Exception as e:
+                logger.exception("Warming %s failed", name)
+                return {"key": name, "seconds": round(time.perf_counter() - started, 4), "bytes": 0,
+                        "error": str(e)}
+            return {"key": name, "seconds": round(time.perf_counter() - started, 4), "bytes": size}
+
+    @staticmethod
+    def _first_pages(limit, pages, asset_type_id=None):
+        size, after = 0, None
+        for _ in range(pages):
+            body, after = CachedAssetService.get_assets_page(limit, after, asset_type_id=asset_type_id)
+            size += body_size(body)
+            if after is None:
+                break
+        return size
+
+
+def warm_in_background(app):
+    """Start warming the cache from a daemon thread, so the app serves requests meanwhile."""
+    def run():
+        with app.app_context():
+            try:
+                report = CacheWarmupService.warm()
+            except Exception:
+                logger.exception("Cache warm-up failed")
+                return
+        logger.info("Cache warmed: %d entries, %d bytes in %.2fs (%d errors)",
+                    report["entries"], report["bytes"], report["seconds"], report["errors"])
+
+    thread = threading.Thread(target=run, name="cache-warmup", daemon=True)
+    thread.start()
+    return thread
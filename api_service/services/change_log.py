@@ -0,0 +1,94 @@
+import time
+from datetime import timezone
+
+from sqlalchemy import insert, select, update
+
+from api_service.extensions import db
+from api_service.models import ChangeLog, ChangeLogSequence, utcnow
+
+ENTITY_ASSET = "asset"
+ENTITY_ASSET_TYPE = "asset_type"
+ENTITY_ASSET_FIELD = "asset_field"
+
+ACTION_CREATED = "created"
+ACTION_UPDATED = "updated"
+
+
+def change_to_dict(change):
+    created_at = change.created_at
+    if created_at.tzinfo is None:
+        # SQLite hands timestamps back without their UTC offset
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return {
+        "seq": change.seq,
+        "entity": change.entity,
+        "entity_id": change.entity_id,
+        "asset_type_id": change.asset_type_id,
+        "action": change.action,
+        "created_at": created_at.isoformat(),
+    }
+
+
+class ChangeLogService:
+    """Append-only change log, written in the same transaction as the change it records."""
+
+    @staticmethod
+    def record(changes):
+        """Append ``(entity, entity_id, action, asset_type_id)`` tuples to the current transaction.
+
+        Call it last, right before committing: it locks the sequence row until the commit.
+        """
+        if not changes:
+            return
+
+        last_seq = db.session.execute(
+            update(ChangeLogSequence)
+            .where(ChangeLogSequence.id == ChangeLogSequence.SINGLETON_ID)
+            .values(last_seq=ChangeLogSequence.last_seq + len(changes))
+            .returning(ChangeLogSequence.last_seq)
+        ).scalar()
+        if last_seq is None:
+            last_seq = len(changes)
+            db.session.add(ChangeLogSequence(id=ChangeLogSequence.SINGLETON_ID, last_seq=last_seq))
+
+        now = utcnow()
+        first_seq = last_seq - len(changes) + 1
+        db.session.execute(insert(ChangeLog), [
+            {
+                "seq": seq,
+                "entity": entity,
+                "entity_id": entity_id,
+                "action": action,
+                "asset_type_id": asset_type_id,
+                "created_at": now,
+            }
+            for seq, (entity, entity_id, action, asset_type_id) in enumerate(changes, first_seq)
+        ])
+
+    @staticmethod
+    def get_changes(since, limit):
+        """Return up to ``limit`` changes after ``since`` and whether more are waiting."""
+        rows = db.session.execute(
+            select(ChangeLog.seq, ChangeLog.entity, ChangeLog.entity_id, ChangeLog.asset_type_id,
+                   ChangeLog.action, ChangeLog.created_at)
+            .where(ChangeLog.seq > since)
+            .order_by(ChangeLog.seq)
+            .limit(limit + 1)
+        ).all()
+        return [change_to_dict(row) for row in rows[:limit]], len(rows) > limit
+
+    @staticmethod
+    def wait_for_changes(since, limit, wait, poll_interval):
+        """Like :meth:`get_changes`, but wait up to ``wait`` seconds for a change to arrive.
+
+        The session is released between polls so a waiting request does not hold a pooled
+        connection.
+        """
+        deadline = time.monotonic() + wait
+        while True:
+            changes, has_more = ChangeLogService.get_changes(since, limit)
+            remaining = deadline - time.monotonic()
+            if changes or remaining <= 0:
+                return changes, has_more
+            db.session.remove()
+            time.sleep(min(poll_interval, remaining))
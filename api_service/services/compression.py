@@ -0,0 +1,84 @@
+"""Response compression negotiated through ``Accept-Encoding``.
+
+gzip is always available; brotli (``br``) and zstd are used when the ``brotli`` / ``zstandard``
+packages are installed. Bodies smaller than ``COMPRESSION_MIN_SIZE`` are sent as they are.
+"""
+import gzip
+
+from flask import current_app, request
+
+from api_service.instrumentation import timed
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional speed-up
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional speed-up
+    zstandard = None
+
+
+def _gzip(body, config):
+    return gzip.compress(body, compresslevel=config["COMPRESSION_GZIP_LEVEL"], mtime=0)
+
+
+def _brotli(body, config):
+    return brotli.compress(body, quality=config["COMPRESSION_BROTLI_QUALITY"])
+
+
+def _zstd(body, config):
+    return zstandard.ZstdCompressor(level=config["COMPRESSION_ZSTD_LEVEL"]).compress(body)
+
+
+COMPRESSORS = {"gzip": _gzip}
+if brotli is not None:
+    COMPRESSORS["br"] = _brotli
+if zstandard is not None:
+    COMPRESSORS["zstd"] = _zstd
+
+
+def enabled_encodings():
+    """Encodings both configured in ``COMPRESSION_ENCODINGS`` and installed, in preference order."""
+    configured = current_app.config["COMPRESSION_ENCODINGS"]
+    return [name for name in configured.replace(" ", "").split(",") if name in COMPRESSORS]
+
+
+def compress(body, encoding):
+    with timed("compress"):
+        return COMPRESSORS[encoding](body, current_app.config)
+
+
+def negotiate(size):
+    """Pick the encoding for a ``size`` bytes response to the current request, or ``None``."""
+    if size < current_app.config["COMPRESSION_MIN_SIZE"]:
+        return None
+    return request.accept_encodings.best_match(enabled_encodings())
+
+
+class PrecompressedBody:
+    """An encoded response body stored with its compressed variants.
+
+    Built once when a cache entry is filled, so serving a hit costs neither JSON encoding nor
+    compression, whatever encoding the client asks for.
+    """
+
+    __slots__ = ("identity", "variants")
+
+    def __init__(self, identity):
+        self.identity = identity
+        self.variants = {}
+        if len(identity) >= current_app.config["COMPRESSION_MIN_SIZE"]:
+            self.variants = {encoding: compress(identity, encoding) for encoding in enabled_encodings()}
+
+    def __getstate__(self):
+        return self.identity, self.variants
+
+    def __setstate__(self, state):
+        self.identity, self.variants = state
+
+    def encoded(self, encoding):
+        """Body compressed with ``encoding``, compressing now if it was not stored."""
+        body = self.variants.get(encoding)
+        return body if body is not None else compress(self.identity, encoding)
@@ -0,0 +1,310 @@
+"""Background jobs: asset imports and exports run outside the request/response cycle.
+
+The ``jobs`` table is the queue. ``flask cli worker`` processes claim queued jobs with a
+compare-and-swap UPDATE (behind ``FOR UPDATE SKIP LOCKED`` on Postgres), so any number of workers
+can run side by side. Jobs are processed in chunks through the bulk ``AssetService`` paths and
+progress is committed with every chunk; a job whose worker stops heartbeating is resumed by another
+worker from the last committed chunk.
+"""
+import logging
+import os
+import socket
+import threading
+from datetime import timedelta, timezone
+
+from flask import current_app
+from sqlalchemy import and_, func, insert, or_, select, update
+
+from api_service.exceptions import APIBadRequest, APIConflict, APINotFound
+from api_service.extensions import db
+from api_service.models import Asset, Job, JobChunk, utcnow
+from api_service.services.asset_service import AssetService
+from api_service.services.cache_service import CachedAssetService
+from api_service.services.schema_registry import schema_registry
+from api_service.services.serialization import dumps, loads
+
+JOB_IMPORT = "import"
+JOB_EXPORT = "export"
+JOB_TYPES = (JOB_IMPORT, JOB_EXPORT)
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_SUCCEEDED = "succeeded"
+STATUS_FAILED = "failed"
+
+STREAM_INPUT = "input"
+STREAM_OUTPUT = "output"
+
+logger = logging.getLogger(__name__)
+
+
+class LeaseLost(Exception):
+    """The job was handed to another worker after this one missed its heartbeat."""
+
+
+class Stopped(Exception):
+    """The worker was asked to stop in the middle of a job."""
+
+
+def isoformat(value):
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        # SQLite hands timestamps back without their UTC offset
+        value = value.replace(tzinfo=timezone.utc)
+    return value.isoformat()
+
+
+def job_to_dict(job):
+    return {
+        "id": job.id,
+        "type": job.job_type,
+        "status": job.status,
+        "params": job.params,
+        "total": job.total,
+        "processed": job.processed,
+        "succeeded": job.succeeded,
+        "failed": job.failed,
+        "errors": job.errors,
+        "error": job.error,
+        "attempts": job.attempts,
+        "created_at": isoformat(job.created_at),
+        "started_at": isoformat(job.started_at),
+        "finished_at": isoformat(job.finished_at),
+    }
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobService:
+
+    # === Submission and status ===
+
+    @staticmethod
+    def submit_import(items):
+        """Queue the creation of ``items`` (as for ``POST /assets:batch``); returns the ``Job``."""
+        if not isinstance(items, list) or not items:
+            raise APIBadRequest("Missing 'items' payload")
+        max_items = current_app.config["JOB_MAX_ITEMS"]
+        if len(items) > max_items:
+            raise APIBadRequest(f"Import too large: {len(items)} items, maximum is {max_items}")
+
+        chunk_size = current_app.config["JOB_CHUNK_SIZE"]
+        job = JobService._create(JOB_IMPORT, {"chunk_size": chunk_size}, total=len(items))
+        db.session.execute(insert(JobChunk), [
+            {"job_id": job.id, "stream": STREAM_INPUT, "seq": seq, "data": dumps(items[start:start + chunk_size])}
+            for seq, start in enumerate(range(0, len(items), chunk_size))
+        ])
+        db.session.commit()
+        return job
+
+    @staticmethod
+    def submit_export(asset_type_id=None):
+        """Queue an NDJSON export of every asset, or of the assets of one type."""
+        if asset_type_id is not None and not schema_registry.get_type(asset_type_id):
+            raise APIBadRequest(f"AssetType with ID {asset_type_id} not found")
+        job = JobService._create(JOB_EXPORT, {"asset_type_id": asset_type_id, "format": "ndjson"})
+        db.session.commit()
+        return job
+
+    @staticmethod
+    def _create(job_type, params, total=None):
+        job = Job(job_type=job_type, status=STATUS_QUEUED, params=params, total=total)
+        db.session.add(job)
+        db.session.flush()
+        return job
+
+    @staticmethod
+    def get_job(job_id):
+        job = db.session.get(Job, job_id)
+        if job is None:
+            raise APINotFound(f"Job with ID {job_id} not found")
+        return job
+
+    @staticmethod
+    def iter_output(job_id):
+        """Yield the NDJSON chunks of a finished export, one query per chunk."""
+        job = JobService.get_job(job_id)
+        if job.job_type != JOB_EXPORT:
+            raise APINotFound(f"Job {job_id} has no output")
+        if job.status != STATUS_SUCCEEDED:
+            raise APIConflict(f"Job {job_id} is {job.status}, its output is not ready")
+
+        def generate():
+            seq = 0
+            while True:
+                data = db.session.scalar(
+                    select(JobChunk.data)
+                    .where(JobChunk.job_id == job_id, JobChunk.stream == STREAM_OUTPUT, JobChunk.seq == seq)
+                )
+                if data is None:
+                    return
+                yield bytes(data)
+                seq += 1
+
+        return generate()
+
+    # === Workers ===
+
+    @staticmethod
+    def work(worker=None, once=False, poll_interval=None, stop=None):
+        """Claim and run jobs until ``stop`` (a ``threading.Event``) is set; returns how many ran.
+
+        With ``once`` it returns as soon as the queue is empty instead of polling it.
+        """
+        worker = worker or default_worker_id()
+        stop = stop or threading.Event()
+        if poll_interval is None:
+            poll_interval = current_app.config["JOB_POLL_INTERVAL"]
+
+        ran = 0
+        while not stop.is_set():
+            job = JobService.claim(worker)
+            if job is None:
+                if once:
+                    break
+                stop.wait(poll_interval)
+                continue
+            JobService.run(job, worker, stop)
+            db.session.remove()
+            ran += 1
+        return ran
+
+    @staticmethod
+    def claim(worker):
+        """Take the oldest queued job, or a running one whose worker stopped heartbeating."""
+        now = utcnow()
+        claimable = or_(
+            Job.status == STATUS_QUEUED,
+            and_(Job.status == STATUS_RUNNING,
+                 Job.heartbeat_at < now - timedelta(seconds=current_app.config["JOB_LEASE_TIMEOUT"])),
+        )
+        while True:
+            job_id = db.session.scalar(
+                select(Job.id).where(claimable).order_by(Job.id).limit(1).with_for_update(skip_locked=True)
+            )
+            if job_id is None:
+                db.session.commit()
+                return None
+            # Another worker may have taken it since the SELECT (there is no row lock on SQLite)
+            claimed = db.session.execute(
+                update(Job)
+                .where(Job.id == job_id, claimable)
+                .values(status=STATUS_RUNNING, worker=worker, heartbeat_at=now,
+                        started_at=func.coalesce(Job.started_at, now), attempts=Job.attempts + 1)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.session.commit()
+            if claimed:
+                return db.session.get(Job, job_id)
+
+    @staticmethod
+    def run(job, worker, stop=None):
+        """Run a claimed job to completion, recording its outcome."""
+        handlers = {JOB_IMPORT: JobService._run_import, JOB_EXPORT: JobService._run_export}
+        try:
+            if job.attempts > current_app.config["JOB_MAX_ATTEMPTS"]:
+                raise RuntimeError(f"Gave up after {job.attempts - 1} attempts")
+            handlers[job.job_type](job, worker, stop)
+        except Stopped:
+            db.session.rollback()
+            # Hand it back to the queue rather than waiting for the lease to expire
+            JobService._save(job.id, worker, status=STATUS_QUEUED, worker=None)
+            db.session.commit()
+        except LeaseLost:
+            db.session.rollback()
+            logger.warning("Job %s was taken over by another worker", job.id)
+        except Exception as e:
+            db.session.rollback()
+            logger.exception("Job %s failed", job.id)
+            try:
+                JobService._save(job.id, worker, status=STATUS_FAILED, error=str(e), finished_at=utcnow())
+                db.session.commit()
+            except LeaseLost:
+                db.session.rollback()
+
+    @staticmethod
+    def _save(job_id, owner, **values):
+        """Update a job the ``owner`` worker holds and renew its heartbeat; raises ``LeaseLost`` otherwise."""
+        saved = db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.worker == owner, Job.status == STATUS_RUNNING)
+            .values(heartbeat_at=utcnow(), **values)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not saved:
+            raise LeaseLost(job_id)
+
+    @staticmethod
+    def _check_stop(stop):
+        if stop is not None and stop.is_set():
+            raise Stopped()
+
+    @staticmethod
+    def _run_import(job, worker, stop):
+        max_errors = current_app.config["JOB_MAX_ERRORS"]
+        processed, succeeded, failed, errors = job.processed, job.succeeded, job.failed, list(job.errors)
+
+        seq = job.next_chunk
+        while True:
+            JobService._check_stop(stop)
+            data = db.session.scalar(
+                select(JobChunk.data)
+                .where(JobChunk.job_id == job.id, JobChunk.stream == STREAM_INPUT, JobChunk.seq == seq)
+            )
+            if data is None:
+                break
+            items = loads(data)
+
+            # Moving past the chunk is committed by create_assets_bulk together with its assets, so
+            # a worker taking over after a crash never imports a chunk twice
+            JobService._save(job.id, worker, next_chunk=seq + 1, processed=processed + len(items))
+            created, chunk_errors = CachedAssetService.create_assets_bulk(
+                items, atomic=False, chunk_size=len(items)
+            )
+
+            errors.extend({"index": processed + e["index"], "message": e["message"]}
+                          for e in chunk_errors[:max(0, max_errors - len(errors))])
+            processed += len(items)
+            succeeded += len(created)
+            failed += len(chunk_errors)
+            JobService._save(job.id, worker, next_chunk=seq + 1, processed=processed,
+                             succeeded=succeeded, failed=failed, errors=errors)
+            db.session.commit()
+            seq += 1
+
+        JobService._save(job.id, worker, status=STATUS_SUCCEEDED, finished_at=utcnow())
+        db.session.commit()
+
+    @staticmethod
+    def _run_export(job, worker, stop):
+        asset_type_id = job.params.get("asset_type_id")
+        chunk_size = current_app.config["JOB_CHUNK_SIZE"]
+
+        if job.total is None:
+            count = select(func.count(Asset.id))
+            if asset_type_id is not None:
+                count = count.where(Asset.asset_type_id == asset_type_id)
+            JobService._save(job.id, worker, total=db.session.scalar(count))
+            db.session.commit()
+
+        seq, after, processed = job.next_chunk, job.cursor, job.processed
+        while True:
+            JobService._check_stop(stop)
+            assets, after = AssetService.get_assets_page(chunk_size, after, asset_type_id=asset_type_id)
+            processed += len(assets)
+            # The last chunk also finishes the job: a restart must not export everything again
+            done = {"status": STATUS_SUCCEEDED, "finished_at": utcnow()} if after is None else {}
+            JobService._save(job.id, worker, next_chunk=seq + 1, cursor=after, processed=processed,
+                             succeeded=processed, **done)
+            if assets:
+                db.session.execute(insert(JobChunk).values(
+                    job_id=job.id, stream=STREAM_OUTPUT, seq=seq,
+                    data=b"".join(dumps(asset) + b"\n" for asset in assets),
+                ))
+            db.session.commit()
+            seq += 1
+            if after is None:
+                return
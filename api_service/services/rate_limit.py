@@ -0,0 +1,95 @@
+"""Token-bucket rate limiting per API key.
+
+A bucket holds up to ``burst`` tokens and refills at ``rate`` tokens per second; every request
+takes one. With a Redis cache backend the buckets live in Redis and are updated by a Lua script,
+so all workers share them; otherwise each process keeps its own in memory.
+"""
+import math
+import threading
+import time
+
+from api_service.exceptions import APITooManyRequests
+from api_service.extensions import cache
+
+# Refill, take and store in one round trip. The clock is Redis', so app servers need not agree.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+class RateLimiter:
+
+    def __init__(self, cache):
+        self.cache = cache
+        self._script = None
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _bucket_key(name):
+        return f"ratelimit:{name}"
+
+    def _redis(self):
+        # Flask-Caching's Redis backends expose their client, the others have none; a TieredCache
+        # keeps it on its remote tier
+        backend = getattr(self.cache.cache, "remote", self.cache.cache)
+        return getattr(backend, "_write_client", None)
+
+    def _take_redis(self, client, name, rate, burst, cost):
+        if self._script is None:
+            # EVALSHA after the first call, falling back to EVAL when Redis lost the script
+            self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+        allowed, tokens = self._script(keys=[self._bucket_key(name)], args=[rate, burst, cost])
+        return bool(allowed), float(tokens)
+
+    def _take_local(self, name, rate, burst, cost):
+        now = time.monotonic()
+        with self._lock:
+            tokens, ts = self._buckets.get(name, (burst, now))
+            tokens = min(burst, tokens + (now - ts) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[name] = (tokens, now)
+        return allowed, tokens
+
+    def take(self, name, rate, burst, cost=1):
+        """Take ``cost`` tokens from the bucket ``name``; returns ``(allowed, tokens_left)``."""
+        client = self._redis()
+        if client is not None:
+            return self._take_redis(client, name, rate, burst, cost)
+        return self._take_local(name, rate, burst, cost)
+
+    def check(self, name, rate, burst, cost=1):
+        """Take ``cost`` tokens or raise ``APITooManyRequests`` with the seconds until there are enough."""
+        allowed, tokens = self.take(name, rate, burst, cost)
+        if not allowed:
+            retry_after = max(1, math.ceil((cost - tokens) / rate))
+            raise APITooManyRequests(f"Rate limit of {rate:g} requests per second exceeded", retry_after)
+        return tokens
+
+    def reset(self):
+        """Forget the in-memory buckets (tests)."""
+        with self._lock:
+            self._buckets.clear()
+
+
+rate_limiter = RateLimiter(cache)
@@ -0,0 +1,129 @@
+import math
+import threading
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import selectinload
+
+from api_service.exceptions import APIBadRequest
+from api_service.extensions import db
+from api_service.models import AssetField, AssetType, SchemaVersion
+
+
+def _validate_number(field, value):
+    try:
+        # float() takes True, "nan", "inf" and "1e400" (inf), none of which round-trips through JSON
+        number = None if isinstance(value, bool) else float(value)
+    except (ValueError, TypeError):
+        number = None
+    if number is None or not math.isfinite(number):
+        raise APIBadRequest(f"Invalid value for field '{field.name}', expected a number.")
+    return str(value), number
+
+
+def _validate_text(field, value):
+    if not isinstance(value, str):
+        raise APIBadRequest(f"Invalid value for field '{field.name}', expected text.")
+    return value, None
+
+
+FIELD_VALIDATORS = {
+    "Number": _validate_number,
+    "Text": _validate_text,
+}
+
+
+class FieldSchema:
+    """Immutable snapshot of an ``AssetField`` with its value validator."""
+
+    __slots__ = ("id", "name", "field_type", "_validator")
+
+    def __init__(self, field):
+        self.id = field.id
+        self.name = field.name
+        self.field_type = field.field_type
+        self._validator = FIELD_VALIDATORS[field.field_type]
+
+    def validate(self, value):
+        """Check ``value`` and return the ``(value, value_number)`` pair stored in ``asset_data``."""
+        return self._validator(self, value)
+
+
+class TypeSchema:
+    """Immutable snapshot of an ``AssetType`` and the fields allowed on its assets."""
+
+    __slots__ = ("id", "name", "fields", "fields_by_id")
+
+    def __init__(self, asset_type, fields_by_id):
+        self.id = asset_type.id
+        self.name = asset_type.name
+        self.fields = [fields_by_id[f.id] for f in asset_type.fields]
+        self.fields_by_id = {f.id: f for f in self.fields}
+
+
+class Schemas:
+    """All asset types and fields as of one schema version."""
+
+    def __init__(self, version, types, fields):
+        self.version = version
+        self.types = types
+        self.fields = fields
+
+
+class SchemaRegistry:
+    """Process-local registry of compiled asset type schemas.
+
+    Asset types and fields are loaded once and reused by every write. A single-row
+    ``schema_version`` counter, bumped in the same transaction as any schema change, is read on
+    each access so that every worker reloads as soon as another one changed the schema.
+    """
+
+    def __init__(self):
+        self._schemas = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _current_version():
+        return db.session.execute(
+            select(SchemaVersion.version).where(SchemaVersion.id == SchemaVersion.SINGLETON_ID)
+        ).scalar() or 0
+
+    @staticmethod
+    def _load(version):
+        asset_types = AssetType.query.options(selectinload(AssetType.fields)).all()
+        fields = {f.id: FieldSchema(f) for f in AssetField.query.all()}
+        types = {t.id: TypeSchema(t, fields) for t in asset_types}
+        return Schemas(version, types, fields)
+
+    def current(self):
+        """Return the schemas for the current version, reloading them if it moved on."""
+        version = self._current_version()
+        schemas = self._schemas
+        if schemas is not None and schemas.version == version:
+            return schemas
+
+        with self._lock:
+            if self._schemas is None or self._schemas.version != version:
+                self._schemas = self._load(version)
+            return self._schemas
+
+    def reset(self):
+        """Forget the loaded schemas, e.g. after the database was recreated."""
+        with self._lock:
+            self._schemas = None
+
+    def get_type(self, type_id):
+        return self.current().types.get(type_id)
+
+    @staticmethod
+    def bump_version():
+        """Increment the schema version in the current transaction; call before committing a schema change."""
+        result = db.session.execute(
+            update(SchemaVersion)
+            .where(SchemaVersion.id == SchemaVersion.SINGLETON_ID)
+            .values(version=SchemaVersion.version + 1)
+        )
+        if result.rowcount == 0:
+            db.session.add(SchemaVersion(id=SchemaVersion.SINGLETON_ID, version=1))
+
+
+schema_registry = SchemaRegistry()
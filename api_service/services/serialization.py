@@ -0,0 +1,76 @@
+"""JSON encoding for API responses.
+
+Handlers that return the dicts built by ``asset_to_dict`` and friends skip flask-restx marshalling:
+those dicts already have the exact shape of the documented models (a test keeps them in sync), so
+they are encoded straight to bytes, with orjson when it is installed and the stdlib otherwise.
+"""
+import json
+
+from flask import Response, request
+
+from api_service.instrumentation import timed
+from api_service.services.compression import PrecompressedBody, compress, negotiate
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speed-up
+    orjson = None
+
+JSON_MIMETYPE = "application/json"
+
+
+def dumps(obj):
+    """Encode ``obj`` as compact UTF-8 JSON bytes."""
+    with timed("serialize"):
+        if orjson is not None:
+            try:
+                return orjson.dumps(obj)
+            except orjson.JSONEncodeError:
+                # orjson stops at 64-bit integers, Number values can be larger
+                pass
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def loads(data):
+    """Decode JSON ``bytes`` or ``str``."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def encode_cached(obj):
+    """Encode ``obj`` for a cache entry: JSON bytes plus their pre-compressed variants."""
+    return PrecompressedBody(dumps(obj))
+
+
+def json_response(body, status=200, headers=None, etag=None, last_modified=None):
+    """Wrap a ``PrecompressedBody``, encoded bytes or an object to encode in a JSON ``Response``.
+
+    The body is compressed with the encoding negotiated from Accept-Encoding; the ETag of a
+    compressed variant gets a ``+<encoding>`` suffix since its bytes differ.
+    With an ``etag`` (strong) and/or ``last_modified``, the response is made conditional on the
+    request's If-None-Match / If-Modified-Since headers and becomes a 304 when they match.
+    """
+    if isinstance(body, PrecompressedBody):
+        precompressed, body = body, body.identity
+    else:
+        precompressed = None
+        if not isinstance(body, bytes):
+            body = dumps(body)
+
+    encoding = negotiate(len(body))
+    if encoding is not None:
+        body = precompressed.encoded(encoding) if precompressed else compress(body, encoding)
+
+    response = Response(body, status=status, headers=headers, mimetype=JSON_MIMETYPE)
+    response.vary.add("Accept-Encoding")
+    if encoding is not None:
+        response.headers["Content-Encoding"] = encoding
+    if etag is None and last_modified is None:
+        return response
+
+    if etag is not None:
+        response.set_etag(f"{etag}+{encoding}" if encoding else etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    return response.make_conditional(request) if status == 200 else response
@@ -0,0 +1,387 @@
+"""Two-tier Flask-Caching backend: a per-process LRU in front of a shared backend (Redis).
+
+Set ``CACHE_TYPE=api_service.services.tiered_cache.TieredCache``. Keys starting with one of
+``CACHE_LOCAL_PREFIXES`` are also kept in process memory for up to ``CACHE_LOCAL_TTL`` seconds,
+within ``CACHE_LOCAL_MAX_BYTES``, so hits on small, rarely changing entries (asset types, their
+fields and the tag generations guarding them) skip the network round trip and the unpickling.
+
+Every write to such a key is broadcast on a Redis pub/sub channel and the other processes drop
+their copy. A process that loses its subscription drops its whole local tier; the TTL bounds how
+long a copy can outlive a missed message. Remote backends without pub/sub (SimpleCache, in tests)
+use :class:`LocalBroadcast`, which only reaches the caches of the same process.
+
+Local hits return the stored object itself, not a copy: values must not be mutated.
+"""
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+
+from flask_caching.backends.base import BaseCache
+from werkzeug.utils import import_string
+
+from api_service import instrumentation
+
+logger = logging.getLogger(__name__)
+
+# Rough per-object overhead added to the payload bytes when sizing entries
+_OBJECT_OVERHEAD = 64
+
+
+def approximate_size(value, _depth=0):
+    """Bytes held by ``value``, counting the payload of strings, containers and ``__getstate__``."""
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value) + _OBJECT_OVERHEAD
+    if _depth > 8:
+        return _OBJECT_OVERHEAD
+    if isinstance(value, dict):
+        return _OBJECT_OVERHEAD + sum(approximate_size(k, _depth + 1) + approximate_size(v, _depth + 1)
+                                      for k, v in value.items())
+    if isinstance(value, (tuple, list, set, frozenset)):
+        return _OBJECT_OVERHEAD + sum(approximate_size(v, _depth + 1) for v in value)
+    if isinstance(value, (int, float, bool)) or value is None:
+        return _OBJECT_OVERHEAD
+    state = value.__getstate__() if hasattr(value, "__getstate__") else None
+    return _OBJECT_OVERHEAD + (approximate_size(state, _depth + 1) if state is not None else 0)
+
+
+class LocalLRU:
+    """Thread-safe LRU with per-entry expiry, bounded by the approximate size of its values."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.evictions = 0
+        # Bumped by every discard, so a value read from the remote tier meanwhile is not stored
+        self.version = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return ``(True, value)`` on a hit, ``(False, None)`` otherwise."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            value, expires, size = entry
+            if time.monotonic() >= expires:
+                del self._entries[key]
+                self.size -= size
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def set(self, key, value, ttl, if_version=None):
+        size = approximate_size(value)
+        with self._lock:
+            if if_version is not None and if_version != self.version:
+                return
+            self._discard(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, time.monotonic() + ttl, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+                self.evictions += 1
+
+    def discard(self, *keys):
+        with self._lock:
+            self.version += 1
+            for key in keys:
+                self._discard(key)
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[2]
+
+    def clear(self):
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+            self.size = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class LocalBroadcast:
+    """In-process stand-in for :class:`RedisBroadcast`: delivers to every subscriber synchronously."""
+
+    def __init__(self):
+        self._subscribers = []
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+
+    def publish(self, message):
+        for callback in list(self._subscribers):
+            callback(message)
+
+
+class RedisBroadcast:
+    """Pub/sub channel, listened to from a daemon thread started in each (forked) process."""
+
+    def __init__(self, client, channel):
+        self.client = client
+        self.channel = channel
+        self._callbacks = []
+        self._pid = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback):
+        self._callbacks.append(callback)
+
+    def publish(self, message):
+        self.client.publish(self.channel, message)
+
+    def ensure_listening(self):
+        """Start the listener thread unless this process already has one (threads don't survive fork)."""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{self.channel: self._on_message})
+            self._thread = pubsub.run_in_thread(sleep_time=1, daemon=True, exception_handler=self._on_error)
+            self._pid = os.getpid()
+
+    def _on_message(self, message):
+        data = message["data"]
+        for callback in self._callbacks:
+            callback(data.decode() if isinstance(data, bytes) else data)
+
+    def _on_error(self, error, pubsub, thread):
+        # Messages may have been missed while disconnected; redis-py resubscribes on the next read
+        logger.warning("Cache invalidation channel error, dropping the local tier: %s", error)
+        for callback in self._callbacks:
+            callback(None)
+        time.sleep(1)
+
+
+class TieredCache(BaseCache):
+    """Flask-Caching backend keeping selected keys of ``remote`` in a per-process :class:`LocalLRU`."""
+
+    def __init__(self, remote, broadcast, local_ttl=5, local_max_bytes=32 * 1024 * 1024,
+                 local_prefixes=("",), default_timeout=300):
+        super().__init__(default_timeout=default_timeout)
+        self.remote = remote
+        self.broadcast = broadcast
+        self.local = LocalLRU(local_max_bytes)
+        self.local_ttl = local_ttl
+        self.local_prefixes = tuple(local_prefixes)
+        self.counters = Counter()
+        self._sender = uuid.uuid4().hex
+        self._pid = os.getpid()
+        broadcast.subscribe(self._on_invalidate)
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        remote_type = config.get("CACHE_REMOTE_TYPE", "RedisCache")
+        if "." not in remote_type:
+            remote_type = "flask_caching.backends." + remote_type
+        remote = import_string(remote_type).factory(app, config, args, dict(kwargs))
+
+        client = getattr(remote, "_write_client", None)
+        if client is not None:
+            channel = f"{config.get('CACHE_KEY_PREFIX') or ''}cache:invalidate"
+            broadcast = RedisBroadcast(client, channel)
+        else:
+            broadcast = LocalBroadcast()
+
+        prefixes = [prefix.strip() for prefix in config.get("CACHE_LOCAL_PREFIXES", "").split(",")]
+        return cls(
+            remote, broadcast,
+            local_ttl=config.get("CACHE_LOCAL_TTL", 5),
+            local_max_bytes=config.get("CACHE_LOCAL_MAX_BYTES", 32 * 1024 * 1024),
+            local_prefixes=[prefix for prefix in prefixes if prefix],
+            default_timeout=kwargs.get("default_timeout", 300),
+        )
+
+    # === Local tier ===
+
+    def _is_local(self, key):
+        return key.startswith(self.local_prefixes)
+
+    def _check_process(self):
+        if self._pid != os.getpid():
+            # Forked: the parent's copies are not covered by this process' subscription
+            self.local.clear()
+            self._pid = os.getpid()
+        if isinstance(self.broadcast, RedisBroadcast):
+            self.broadcast.ensure_listening()
+
+    def _local_ttl(self, timeout):
+        timeout = self._normalize_timeout(timeout)
+        return min(self.local_ttl, timeout) if timeout else self.local_ttl
+
+    def _publish(self, keys):
+        # One line per key after the sender id; no key means "drop everything"
+        self.broadcast.publish("\n".join([self._sender, *keys]))
+        self.counters["invalidations_sent"] += 1
+
+    def _on_invalidate(self, message):
+        if message is None:
+            self.local.clear()
+            return
+        sender, *keys = message.split("\n")
+        if sender == self._sender:
+            return
+        self.counters["invalidations_received"] += 1
+        if keys:
+            self.local.discard(*keys)
+        else:
+            self.local.clear()
+
+    def _count(self, local_hits=0, local_misses=0, remote_hits=0, remote_misses=0):
+        counters = self.counters
+        counters["local_hit"] += local_hits
+        counters["local_miss"] += local_misses
+        counters["remote_hit"] += remote_hits
+        counters["remote_miss"] += remote_misses
+        instrumentation.record_tier_results(local_hits, local_misses, remote_hits, remote_misses)
+
+    # === Reads ===
+
+    def get(self, key):
+        if not self._is_local(key):
+            return self.remote.get(key)
+
+        self._check_process()
+        hit, value = self.local.get(key)
+        if hit:
+            self._count(local_hits=1)
+            return value
+
+        version = self.local.version
+        value = self.remote.get(key)
+        if value is None:
+            self._count(local_misses=1, remote_misses=1)
+        else:
+            self._count(local_misses=1, remote_hits=1)
+            self.local.set(key, value, self.local_ttl, if_version=version)
+        return value
+
+    def get_many(self, *keys):
+        self._check_process()
+        values, local_keys = {}, [key for key in keys if self._is_local(key)]
+        for key in local_keys:
+            hit, value = self.local.get(key)
+            if hit:
+                values[key] = value
+        local_hits = len(values)
+
+        remote_hits = remote_misses = 0
+        missing = [key for key in keys if key not in values]
+        if missing:
+            version = self.local.version
+            for key, value in zip(missing, self.remote.get_many(*missing)):
+                values[key] = value
+                if not self._is_local(key):
+                    continue
+                if value is None:
+                    remote_misses += 1
+                else:
+                    remote_hits += 1
+                    self.local.set(key, value, self.local_ttl, if_version=version)
+
+        if local_keys:
+            self._count(local_hits, len(local_keys) - local_hits, remote_hits, remote_misses)
+        return [values[key] for key in keys]
+
+    def has(self, key):
+        if self._is_local(key) and self.local.get(key)[0]:
+            return True
+        return self.remote.has(key)
+
+    # === Writes ===
+
+    def set(self, key, value, timeout=None):
+        result = self.remote.set(key, value, timeout=timeout)
+        if self._is_local(key):
+            self._check_process()
+            self.local.set(key, value, self._local_ttl(timeout))
+            self._publish([key])
+        return result
+
+    def set_many(self, mapping, timeout=None):
+        result = self.remote.set_many(mapping, timeout=timeout)
+        local_keys = [key for key in mapping if self._is_local(key)]
+        if local_keys:
+            self._check_process()
+            for key in local_keys:
+                self.local.set(key, mapping[key], self._local_ttl(timeout))
+            self._publish(local_keys)
+        return result
+
+    def add(self, key, value, timeout=None):
+        added = self.remote.add(key, value, timeout=timeout)
+        if added and self._is_local(key):
+            self._check_process()
+            self.local.set(key, value, self._local_ttl(timeout))
+            # Another process may still hold a copy from before the key expired
+            self._publish([key])
+        return added
+
+    def delete(self, key):
+        result = self.remote.delete(key)
+        if self._is_local(key):
+            self.local.discard(key)
+            self._publish([key])
+        return result
+
+    def delete_many(self, *keys):
+        result = self.remote.delete_many(*keys)
+        local_keys = [key for key in keys if self._is_local(key)]
+        if local_keys:
+            self.local.discard(*local_keys)
+            self._publish(local_keys)
+        return result
+
+    def inc(self, key, delta=1):
+        value = self.remote.inc(key, delta=delta)
+        if self._is_local(key):
+            self._check_process()
+            self.local.set(key, value, self.local_ttl)
+            self._publish([key])
+        return value
+
+    def dec(self, key, delta=1):
+        return self.inc(key, delta=-delta)
+
+    def clear(self):
+        result = self.remote.clear()
+        self.local.clear()
+        self._publish([])
+        return result
+
+    # === Stats ===
+
+    def stats(self):
+        def hit_rate(tier):
+            hits, misses = self.counters[f"{tier}_hit"], self.counters[f"{tier}_miss"]
+            return round(hits / (hits + misses), 4) if hits + misses else None
+
+        return {
+            "local": {
+                "hits": self.counters["local_hit"],
+                "misses": self.counters["local_miss"],
+                "hit_rate": hit_rate("local"),
+                "entries": len(self.local),
+                "bytes": self.local.size,
+                "evictions": self.local.evictions,
+            },
+            "remote": {
+                "hits": self.counters["remote_hit"],
+                "misses": self.counters["remote_miss"],
+                "hit_rate": hit_rate("remote"),
+            },
+            "invalidations_sent": self.counters["invalidations_sent"],
+            "invalidations_received": self.counters["invalidations_received"],
+        }
@@ -1,48 +1,63 @@
 # encoding: utf-8
+import os
 
 import pytest
 from dotenv import load_dotenv
 
-from api_service.models import User
-from api_service.app import create_app
-from api_service.extensions import db as _db
-from pytest_factoryboy import register
-from .factories import UserFactory
+# config.py and auth_service read the environment on import
+load_dotenv(".testenv")
+os.environ.setdefault("SECRET_KEY", "testing")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("CACHE_TYPE", "SimpleCache")
 
+from api_service.app import create_app  # noqa: E402
+from api_service.extensions import cache, db as _db  # noqa: E402
+from api_service.services.auth_service import verified_keys  # noqa: E402
+from api_service.services.rate_limit import rate_limiter  # noqa: E402
+from api_service.services.schema_registry import schema_registry  # noqa: E402
+from pytest_factoryboy import register  # noqa: E402
+from .factories import AssetFieldFactory, AssetTypeFactory  # noqa: E402
 
-register(UserFactory)
+
+register(AssetTypeFactory)
+register(AssetFieldFactory)
 
 
 @pytest.fixture(scope="session")
 def app():
-    load_dotenv(".testenv")
     app = create_app(testing=True)
     return app
 
 
 @pytest.fixture
 def db(app):
-    _db.app = app
-
     with app.app_context():
         _db.create_all()
+        schema_registry.reset()
+        cache.clear()
+        verified_keys.clear()
+        rate_limiter.reset()
+
+        yield _db
 
-    yield _db
+        _db.session.remove()
+        _db.drop_all()
 
-    _db.session.close()
-    _db.drop_all()
+
+@pytest.fixture
+def headers():
+    return {"X-API-KEY": os.environ["SECRET_KEY"]}
 
 
 @pytest.fixture
-def admin_user(db):
-    user = User(
-        username='admin',
-        email='admin@admin.com',
-        password='admin',
-        role='ADMIN'
-    )
-
-    db.session.add(user)
+def laptop_type(db, asset_type_factory, asset_field_factory):
+    asset_type = asset_type_factory(name="Laptop")
+    asset_type.fields = [
+        asset_field_factory(name="serial", field_type="Text"),
+        asset_field_factory(name="ram_gb", field_type="Number"),
+    ]
+    db.session.add(asset_type)
+    schema_registry.bump_version()
     db.session.commit()
 
-    return user
+    return asset_type
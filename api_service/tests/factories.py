@@ -1,14 +1,21 @@
 # encoding: utf-8
 
 import factory
-from api_service.models import User
+from api_service.models import AssetField, AssetType
 
 
-class UserFactory(factory.Factory):
+class AssetTypeFactory(factory.Factory):
 
-    username = factory.Sequence(lambda n: "user%d" % n)
-    email = factory.Sequence(lambda n: "user%d@mail.com" % n)
-    password = "mypwd"
+    name = factory.Sequence(lambda n: "type%d" % n)
 
     class Meta:
-        model = User
+        model = AssetType
+
+
+class AssetFieldFactory(factory.Factory):
+
+    name = factory.Sequence(lambda n: "field%d" % n)
+    field_type = "Text"
+
+    class Meta:
+        model = AssetField
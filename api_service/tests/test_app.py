@@ -0,0 +1,37 @@
+import click
+import pytest
+from flask import Flask
+from flask.cli import run_command
+
+from api_service.app import check_database_backend, running_dev_server
+
+
+@pytest.mark.parametrize("url", ["sqlite://", "postgresql://u:p@db/app", "postgresql+psycopg2://db/app"])
+def test_supported_databases(url):
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = url
+    check_database_backend(app)
+
+
+def test_unsupported_database_fails_at_startup():
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "mysql+pymysql://u:p@db/app"
+    with pytest.raises(RuntimeError, match="Unsupported database 'mysql'"):
+        check_database_backend(app)
+
+
+@pytest.mark.parametrize("command, reload, reloader_child, expected", [
+    (run_command, False, False, True),
+    (run_command, True, False, False),
+    (run_command, True, True, True),
+    (click.Command("cache-warm"), False, False, False),
+])
+def test_flask_run_sets_up_its_serving_process(monkeypatch, command, reload, reloader_child, expected):
+    if reloader_child:
+        monkeypatch.setenv("WERKZEUG_RUN_MAIN", "true")
+    else:
+        monkeypatch.delenv("WERKZEUG_RUN_MAIN", raising=False)
+    with click.Context(command, info_name=command.name) as ctx:
+        ctx.params = {"reload": reload}
+        assert running_dev_server() is expected
+    assert running_dev_server() is False
@@ -0,0 +1,84 @@
+import pytest
+
+
+def asset_items(laptop_type, *serials):
+    serial, ram = laptop_type.fields
+    return [{"asset_type_id": laptop_type.id,
+             "data": [{"field_id": serial.id, "value": value}, {"field_id": ram.id, "value": 8}]}
+            for value in serials]
+
+
+def asset_count(client, headers):
+    return len(client.get("/api/v1/assets?limit=100", headers=headers).json)
+
+
+def test_batch_create_atomic_writes_nothing_on_error(client, headers, laptop_type):
+    items = asset_items(laptop_type, "SN-1", "SN-2") + [{"asset_type_id": laptop_type.id, "data": "abc"}]
+
+    response = client.post("/api/v1/assets:batch", headers=headers, json={"items": items})
+    assert response.status_code == 400
+    assert response.json["items"] == []
+    assert [e["index"] for e in response.json["errors"]] == [2]
+    assert asset_count(client, headers) == 0
+
+
+def test_batch_create_partial_returns_207(client, headers, laptop_type):
+    invalid = dict(asset_items(laptop_type, "SN-X")[0], asset_type_id=[laptop_type.id])
+    items = asset_items(laptop_type, "SN-1") + [invalid] + asset_items(laptop_type, "SN-2")
+
+    response = client.post("/api/v1/assets:batch", headers=headers, json={"items": items, "mode": "partial"})
+    assert response.status_code == 207
+    assert [item["index"] for item in response.json["items"]] == [0, 2]
+    assert response.json["errors"] == [{"index": 1, "message": "'asset_type_id' must be an integer"}]
+    assert asset_count(client, headers) == 2
+
+
+def test_batch_update_partial_and_atomic(client, headers, laptop_type):
+    serial, _ = laptop_type.fields
+    created = client.post("/api/v1/assets:batch", headers=headers,
+                          json={"items": asset_items(laptop_type, "SN-1", "SN-2")}).json["items"]
+    first, second = (asset["id"] for asset in created)
+    items = [
+        {"id": first, "data": [{"field_id": serial.id, "value": "SN-1b"}]},
+        {"id": [second], "data": [{"field_id": serial.id, "value": "SN-2b"}]},
+        {"id": second, "data": [{"field_id": True, "value": "SN-2b"}]},
+    ]
+
+    response = client.patch("/api/v1/assets:batch", headers=headers, json={"items": items})
+    assert response.status_code == 400
+    assert response.json["errors"] == [
+        {"index": 1, "message": "'id' must be an integer"},
+        {"index": 2, "message": "Field ID 'True' must be an integer"},
+    ]
+    assert client.get(f"/api/v1/assets/{first}", headers=headers).json["data"][0]["value"] == "SN-1"
+
+    response = client.patch("/api/v1/assets:batch", headers=headers, json={"items": items, "mode": "partial"})
+    assert response.status_code == 207
+    assert [item["id"] for item in response.json["items"]] == [first]
+    assert client.get(f"/api/v1/assets/{first}", headers=headers).json["data"][0]["value"] == "SN-1b"
+
+    response = client.put("/api/v1/assets:batch", headers=headers,
+                          json={"items": [{"id": second, "data": "abc"}], "mode": "partial"})
+    assert response.status_code == 400
+    assert response.json["errors"][0]["message"] == "'data' must be a list of objects with 'field_id' and 'value'"
+
+
+@pytest.mark.parametrize("payload, message", [
+    ({"items": []}, "Missing 'items' payload"),
+    ({"items": [{}], "mode": "best-effort"}, "Invalid mode 'best-effort'"),
+    ([{}], "Batch payload must be an object"),
+])
+def test_batch_rejects_invalid_payloads(client, headers, laptop_type, payload, message):
+    response = client.post("/api/v1/assets:batch", headers=headers, json=payload)
+    assert response.status_code == 400
+    assert message in response.json["message"]
+
+
+def test_batch_rejects_too_many_items(app, client, headers, laptop_type, monkeypatch):
+    monkeypatch.setitem(app.config, "ASSET_BATCH_MAX_ITEMS", 2)
+
+    response = client.post("/api/v1/assets:batch", headers=headers,
+                           json={"items": asset_items(laptop_type, "SN-1", "SN-2", "SN-3")})
+    assert response.status_code == 400
+    assert response.json["message"] == "Batch too large: 3 items, maximum is 2"
+    assert asset_count(client, headers) == 0
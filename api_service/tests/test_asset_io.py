@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+
+@pytest.fixture
+def laptops(client, headers, laptop_type):
+    serial, ram = laptop_type.fields
+    client.post("/api/v1/assets:batch", headers=headers, json={"items": [
+        {"asset_type_id": laptop_type.id, "data": [{"field_id": serial.id, "value": "SN-1"}, {"field_id": ram.id, "value": 8}]},
+        {"asset_type_id": laptop_type.id, "data": [{"field_id": serial.id, "value": "SN,2"}]},
+    ]})
+    return laptop_type
+
+
+def test_export_csv_and_ndjson(client, headers, laptops):
+    response = client.get(f"/api/v1/asset-types/{laptops.id}/export", headers=headers)
+    assert response.mimetype == "text/csv"
+    assert response.get_data(as_text=True).splitlines() == ["id,serial,ram_gb", "1,SN-1,8", '2,"SN,2",']
+
+    response = client.get(f"/api/v1/asset-types/{laptops.id}/export?format=ndjson", headers=headers)
+    assert [json.loads(line) for line in response.get_data(as_text=True).splitlines()] == [
+        {"id": 1, "serial": "SN-1", "ram_gb": 8},
+        {"id": 2, "serial": "SN,2"},
+    ]
+
+    assert client.get("/api/v1/asset-types/99/export", headers=headers).status_code == 404
+
+
+def test_exported_csv_imports_back(client, headers, laptops):
+    exported = client.get(f"/api/v1/asset-types/{laptops.id}/export", headers=headers).data
+    body = exported + b"3,SN-3,lots\n4,SN-4\n"
+
+    response = client.post(f"/api/v1/asset-types/{laptops.id}/import", headers={**headers, "Content-Type": "text/csv"},
+                           data=body)
+    assert response.status_code == 207
+    assert response.json["created"] == 2
+    assert [e["line"] for e in response.json["errors"]] == [4, 5]
+
+    rows = client.get(f"/api/v1/asset-types/{laptops.id}/export", headers=headers).get_data(as_text=True).splitlines()
+    assert rows[3:] == ["3,SN-1,8", '4,"SN,2",']
+
+
+def test_import_ndjson_and_rejects_unknown_columns(client, headers, laptops):
+    url = f"/api/v1/asset-types/{laptops.id}/import"
+    body = b'{"serial": "SN-5", "ram_gb": 16}\nnot json\n{"colour": "red"}\n'
+    response = client.post(url + "?format=ndjson", headers=headers, data=body)
+    assert (response.status_code, response.json["created"], response.json["failed"]) == (207, 1, 2)
+
+    response = client.post(url, headers={**headers, "Content-Type": "text/csv"}, data=b"id,colour\n1,red\n")
+    assert response.status_code == 400
+    assert client.post(url, headers=headers, data=b"x").status_code == 400
+
+
+def test_cli_round_trip(app, laptops, tmp_path):
+    runner = app.test_cli_runner()
+    path = tmp_path / "laptops.ndjson"
+
+    result = runner.invoke(args=["cli", "export-assets", str(laptops.id), "--format", "ndjson", "-o", str(path)])
+    assert result.exit_code == 0, result.output
+    assert len(path.read_text().splitlines()) == 2
+
+    result = runner.invoke(args=["cli", "import-assets", str(laptops.id), str(path)])
+    assert result.exit_code == 0, result.output
+    assert "2 asset(s) created, 0 row(s) failed." in result.output
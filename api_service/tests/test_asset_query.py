@@ -0,0 +1,117 @@
+import base64
+import json
+
+import pytest
+
+
+@pytest.fixture
+def laptops(client, headers, laptop_type):
+    """Four laptops; the last one has no ram_gb value."""
+    serial, ram = laptop_type.fields
+    ids = {}
+    for value, ram_gb in (("SN-1", 8), ("SN-2", 16), ("SN-10", 4), ("XX-3", None)):
+        data = [{"field_id": serial.id, "value": value}]
+        if ram_gb is not None:
+            data.append({"field_id": ram.id, "value": ram_gb})
+        response = client.post("/api/v1/assets", headers=headers, json={"asset_type_id": laptop_type.id, "data": data})
+        ids[value] = response.json["id"]
+    return ids
+
+
+def serials_of(response):
+    return [data["value"] for asset in response.json for data in asset["data"] if isinstance(data["value"], str)]
+
+
+def list_all(client, headers, query, limit):
+    """Follow X-Next-Cursor page by page; returns the serials and the number of pages."""
+    serials, pages, after = [], 0, None
+    while True:
+        url = f"/api/v1/assets?{query}&limit={limit}" + (f"&after={after}" if after else "")
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200
+        serials += serials_of(response)
+        pages += 1
+        after = response.headers.get("X-Next-Cursor")
+        if after is None:
+            return serials, pages
+
+
+@pytest.mark.parametrize("op, value, expected", [
+    ("eq", "8", ["SN-1"]),
+    ("gt", "8", ["SN-2"]),
+    ("gte", "8", ["SN-1", "SN-2"]),
+    ("lt", "8", ["SN-10"]),
+    ("lte", "8", ["SN-1", "SN-10"]),
+])
+def test_number_filters(client, headers, laptop_type, laptops, op, value, expected):
+    _, ram = laptop_type.fields
+    response = client.get(f"/api/v1/assets?filter={ram.id}:{op}:{value}", headers=headers)
+    assert response.status_code == 200
+    assert serials_of(response) == expected
+
+
+@pytest.mark.parametrize("op, value, expected", [
+    ("eq", "SN-1", ["SN-1"]),
+    ("prefix", "SN-1", ["SN-1", "SN-10"]),
+    ("prefix", "SN-", ["SN-1", "SN-2", "SN-10"]),
+    ("gt", "SN-2", ["XX-3"]),
+])
+def test_text_filters(client, headers, laptop_type, laptops, op, value, expected):
+    serial, _ = laptop_type.fields
+    response = client.get(f"/api/v1/assets?filter={serial.id}:{op}:{value}", headers=headers)
+    assert serials_of(response) == expected
+
+
+def test_filters_are_combined(client, headers, laptop_type, laptops):
+    serial, ram = laptop_type.fields
+    response = client.get(f"/api/v1/assets?filter={serial.id}:prefix:SN-1&filter={ram.id}:lt:8", headers=headers)
+    assert serials_of(response) == ["SN-10"]
+
+
+@pytest.mark.parametrize("descending, expected", [
+    (False, ["SN-10", "SN-1", "SN-2", "XX-3"]),
+    (True, ["SN-2", "SN-1", "SN-10", "XX-3"]),
+])
+def test_sort_puts_missing_values_last_across_pages(client, headers, laptop_type, laptops, descending, expected):
+    _, ram = laptop_type.fields
+    sort = f"-{ram.id}" if descending else str(ram.id)
+
+    assert list_all(client, headers, f"sort={sort}", limit=10) == (expected, 1)
+    # The same order when the cursor carries the sort value between pages, NULLs included
+    assert list_all(client, headers, f"sort={sort}", limit=1) == (expected, 4)
+
+
+def test_cursor_round_trip(client, headers, laptop_type, laptops):
+    assert list_all(client, headers, f"asset_type_id={laptop_type.id}", limit=3) == (
+        ["SN-1", "SN-2", "SN-10", "XX-3"], 2)
+
+
+def crafted(sort_value, asset_id):
+    return base64.urlsafe_b64encode(json.dumps([sort_value, asset_id]).encode()).decode()
+
+
+@pytest.mark.parametrize("query", [
+    "filter=1:eq",
+    "filter=x:eq:1",
+    "filter=1:like:1",
+    "filter=99:eq:1",
+    "filter=2:eq:many",
+    "filter=2:prefix:1",
+    "filter=2:gt:nan",
+    "filter=2:lt:inf",
+    "filter=2:gte:-Infinity",
+    "sort=ram",
+    "after=abc",
+    "after=²",
+    "sort=2&after=not-base64!",
+    f"sort=2&after={crafted([1], 'x')}",
+    f"sort=2&after={crafted(1.5, True)}",
+    f"sort=2&after={crafted('high', 1)}",
+    f"sort=1&after={crafted(3, 1)}",
+])
+def test_invalid_queries_are_rejected(client, headers, laptop_type, laptops, query):
+    serial, ram = laptop_type.fields
+    assert (serial.id, ram.id) == (1, 2)
+
+    response = client.get(f"/api/v1/assets?{query}", headers=headers)
+    assert response.status_code == 400, response.json
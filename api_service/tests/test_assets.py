@@ -0,0 +1,187 @@
+import pytest
+
+
+def test_create_and_get_asset(client, headers, laptop_type):
+    serial, ram = laptop_type.fields
+
+    response = client.post("/api/v1/assets", headers=headers, json={
+        "asset_type_id": laptop_type.id,
+        "data": [{"field_id": serial.id, "value": "SN-1"}, {"field_id": ram.id, "value": 16}],
+    })
+    assert response.status_code == 201
+    asset_id = response.json["id"]
+
+    response = client.get(f"/api/v1/assets/{asset_id}", headers=headers)
+    assert response.status_code == 200
+    assert sorted(response.json["data"], key=lambda d: d["field_id"]) == [
+        {"field_id": serial.id, "value": "SN-1"},
+        {"field_id": ram.id, "value": 16},
+    ]
+
+
+def test_requires_api_key(client, db):
+    assert client.get("/api/v1/assets").status_code == 401
+
+
+def test_projected_reads_match_orm(db, laptop_type):
+    from api_service.models import Asset, AssetData
+    from api_service.services.asset_service import AssetService, asset_to_dict
+
+    serial, ram = laptop_type.fields
+    db.session.add_all([
+        Asset(asset_type_id=laptop_type.id, data=[
+            AssetData(field_id=serial.id, value="SN-1"),
+            AssetData(field_id=ram.id, value="16", value_number=16.0),
+        ]),
+        Asset(asset_type_id=laptop_type.id, data=[]),
+    ])
+    db.session.commit()
+
+    expected = [asset_to_dict(asset) for asset in AssetService.get_all_assets()]
+    db.session.expunge_all()
+
+    assert list(AssetService.iter_asset_dicts(batch_size=1)) == expected
+    assert AssetService.get_assets_page(10)[0] == expected
+    assert AssetService.get_asset_dict(expected[1]["id"]) == expected[1]
+    assert AssetService.get_asset_dict(999) is None
+    assert len(db.session.identity_map) == 0
+
+
+def test_conditional_get_and_if_match(client, headers, laptop_type):
+    serial, ram = laptop_type.fields
+    created = client.post("/api/v1/assets", headers=headers, json={
+        "asset_type_id": laptop_type.id,
+        "data": [{"field_id": serial.id, "value": "SN-1"}, {"field_id": ram.id, "value": 8}],
+    }).json
+    url = f"/api/v1/assets/{created['id']}"
+
+    response = client.get(url, headers=headers)
+    etag = response.headers["ETag"]
+    assert response.headers["Last-Modified"]
+    not_modified = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.data == b""
+
+    update = {"data": [{"field_id": ram.id, "value": 16}]}
+    response = client.patch(url, headers={**headers, "If-Match": etag}, json=update)
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+    # A second writer still holding the old ETag must not overwrite the first one
+    response = client.patch(url, headers={**headers, "If-Match": etag}, json={"data": [{"field_id": ram.id, "value": 4}]})
+    assert response.status_code == 412
+    assert client.get(url, headers=headers).json["data"][1]["value"] == 16
+    assert client.get(url, headers={**headers, "If-None-Match": etag}).status_code == 200
+
+    assert client.patch("/api/v1/assets/999", headers={**headers, "If-Match": etag}, json=update).status_code == 404
+
+
+def test_field_list_etag_changes_when_a_field_is_added(client, headers, laptop_type):
+    url = f"/api/v1/asset-types/{laptop_type.id}/fields"
+    etag = client.get(url, headers=headers).headers["ETag"]
+    assert client.get(url, headers={**headers, "If-None-Match": etag}).status_code == 304
+
+    client.post(url, headers=headers, json={"name": "owner", "field_type": "Text"})
+    response = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json) == 3
+
+
+def test_put_merges_unless_asked_to_replace(client, headers, laptop_type):
+    serial, ram = laptop_type.fields
+    created = client.post("/api/v1/assets", headers=headers, json={
+        "asset_type_id": laptop_type.id, "data": [{"field_id": serial.id, "value": "SN-1"}],
+    }).json
+    url = f"/api/v1/assets/{created['id']}"
+
+    # PUT and PATCH insert a field the asset had no value for and keep the others
+    response = client.put(url, headers=headers, json={"data": [{"field_id": ram.id, "value": 8}]})
+    assert response.json["data"] == [{"field_id": serial.id, "value": "SN-1"}, {"field_id": ram.id, "value": 8}]
+    response = client.patch(url, headers=headers, json={"data": [{"field_id": ram.id, "value": 16}]})
+    assert response.json["data"] == [{"field_id": serial.id, "value": "SN-1"}, {"field_id": ram.id, "value": 16}]
+
+    # PATCH removes a value sent as null, PUT rejects it
+    assert client.put(url, headers=headers, json={"data": [{"field_id": serial.id, "value": None}]}).status_code == 400
+    response = client.patch(url, headers=headers, json={"data": [{"field_id": serial.id, "value": None}]})
+    assert response.json["data"] == [{"field_id": ram.id, "value": 16}]
+
+    # With ?replace=true PUT sets the complete list of values
+    response = client.put(f"{url}?replace=true", headers=headers,
+                          json={"data": [{"field_id": serial.id, "value": "SN-2"}]})
+    assert response.json["data"] == [{"field_id": serial.id, "value": "SN-2"}]
+    assert client.get(url, headers=headers).json == response.json
+
+
+def test_batch_put_replaces_only_on_request(client, headers, laptop_type):
+    serial, ram = laptop_type.fields
+    data = [{"field_id": serial.id, "value": "SN-1"}, {"field_id": ram.id, "value": 8}]
+    asset_id = client.post("/api/v1/assets", headers=headers,
+                           json={"asset_type_id": laptop_type.id, "data": data}).json["id"]
+    items = [{"id": asset_id, "data": [{"field_id": serial.id, "value": "SN-2"}]}]
+
+    response = client.put("/api/v1/assets:batch", headers=headers, json={"items": items})
+    assert response.json["items"][0]["data"] == [{"field_id": serial.id, "value": "SN-2"}, data[1]]
+    response = client.put("/api/v1/assets:batch?replace=true", headers=headers, json={"items": items})
+    assert response.json["items"][0]["data"] == [{"field_id": serial.id, "value": "SN-2"}]
+
+
+def test_update_statements_do_not_grow_with_payload(db, client, headers, asset_type_factory, asset_field_factory):
+    from sqlalchemy import event
+
+    from api_service.services.schema_registry import schema_registry
+
+    asset_type = asset_type_factory(name="Wide")
+    asset_type.fields = [asset_field_factory(name=f"f{i}", field_type="Number") for i in range(20)]
+    db.session.add(asset_type)
+    schema_registry.bump_version()
+    db.session.commit()
+    field_ids = [field.id for field in asset_type.fields]
+
+    asset_id = client.post("/api/v1/assets", headers=headers, json={
+        "asset_type_id": asset_type.id, "data": [{"field_id": field_ids[0], "value": 0}],
+    }).json["id"]
+
+    def patch(size):
+        statements = []
+
+        def count(*args):
+            statements.append(args[2])
+
+        event.listen(db.engine, "before_cursor_execute", count)
+        try:
+            response = client.patch(f"/api/v1/assets/{asset_id}", headers=headers, json={
+                "data": [{"field_id": field_id, "value": size} for field_id in field_ids[:size]],
+            })
+        finally:
+            event.remove(db.engine, "before_cursor_execute", count)
+        assert response.status_code == 200
+        return response, len(statements)
+
+    _, small = patch(1)
+    response, large = patch(20)
+    assert large == small
+    assert [d["value"] for d in response.json["data"]] == [20] * 20
+
+
+@pytest.mark.parametrize("value", ["nan", "inf", "-Infinity", "1e400", True, [1]])
+def test_number_fields_reject_non_finite_values(client, headers, laptop_type, value):
+    serial, ram = laptop_type.fields
+    response = client.post("/api/v1/assets", headers=headers, json={
+        "asset_type_id": laptop_type.id,
+        "data": [{"field_id": serial.id, "value": "SN-1"}, {"field_id": ram.id, "value": value}],
+    })
+    assert response.status_code == 400
+    assert response.json["message"] == "Invalid value for field 'ram_gb', expected a number."
+
+
+@pytest.mark.parametrize("value", [12345678901234567891, 10 ** 30, -(2 ** 53) - 1, 2.5, 16.0])
+def test_number_values_round_trip(client, headers, laptop_type, value):
+    serial, ram = laptop_type.fields
+    created = client.post("/api/v1/assets", headers=headers, json={
+        "asset_type_id": laptop_type.id,
+        "data": [{"field_id": serial.id, "value": "SN-1"}, {"field_id": ram.id, "value": value}],
+    }).json
+
+    for response in (created, client.get(f"/api/v1/assets/{created['id']}", headers=headers).json,
+                     client.get("/api/v1/assets", headers=headers).json[0]):
+        assert response["data"][1]["value"] == value
@@ -0,0 +1,73 @@
+from api_service.extensions import pwd_context
+from api_service.services.auth_service import ApiKeyService, verified_keys
+
+
+def test_api_keys_are_hashed_and_verified_once(client, db, monkeypatch):
+    api_key, key = ApiKeyService.create_api_key("billing")
+    assert key.startswith(f"ak_{api_key.prefix}_") and key not in api_key.key_hash
+
+    verifications = []
+    verify = pwd_context().verify
+    monkeypatch.setattr(pwd_context(), "verify", lambda *args: verifications.append(1) or verify(*args))
+
+    for _ in range(3):
+        assert client.get("/api/v1/asset-types", headers={"X-API-KEY": key}).status_code == 200
+    assert len(verifications) == 1
+
+    # Rejections are not remembered, so wrong secrets can't evict valid keys
+    for n in range(3):
+        wrong = key[:-4] + f"xxx{n}"
+        assert client.get("/api/v1/asset-types", headers={"X-API-KEY": wrong}).status_code == 401
+    assert len(verifications) == 4
+    assert len(verified_keys._entries) == 1
+    assert client.get("/api/v1/asset-types", headers={"X-API-KEY": "ak_nope_x"}).status_code == 401
+    assert client.get("/api/v1/asset-types").status_code == 401
+
+    ApiKeyService.revoke_api_key("billing")
+    assert client.get("/api/v1/asset-types", headers={"X-API-KEY": key}).status_code == 401
+
+
+def test_secret_key_can_be_turned_off(client, db, app, headers, monkeypatch):
+    assert client.get("/api/v1/asset-types", headers=headers).status_code == 200
+    monkeypatch.setitem(app.config, "API_KEY_ACCEPT_SECRET_KEY", False)
+    assert client.get("/api/v1/asset-types", headers=headers).status_code == 401
+
+
+def test_rate_limit_per_key(client, db):
+    _, slow = ApiKeyService.create_api_key("slow", rate_limit=0.01, burst=2)
+    _, other = ApiKeyService.create_api_key("other")
+
+    statuses = [client.get("/api/v1/asset-types", headers={"X-API-KEY": slow}).status_code for _ in range(3)]
+    assert statuses == [200, 200, 429]
+
+    response = client.get("/api/v1/asset-types", headers={"X-API-KEY": slow})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 1
+    assert client.get("/api/v1/asset-types", headers={"X-API-KEY": other}).status_code == 200
+
+
+def test_api_key_cli(app, db):
+    runner = app.test_cli_runner()
+
+    key = runner.invoke(args=["cli", "create-api-key", "reports", "--burst", "5"]).output.strip()
+    assert key.startswith("ak_")
+    assert runner.invoke(args=["cli", "create-api-key", "reports"]).exit_code == 1
+
+    listing = runner.invoke(args=["cli", "list-api-keys"]).output
+    assert "reports" in listing and "burst 5" in listing and key not in listing
+
+    assert runner.invoke(args=["cli", "revoke-api-key", "reports"]).exit_code == 0
+    assert runner.invoke(args=["cli", "revoke-api-key", "reports"]).exit_code == 1
+    assert ApiKeyService.authenticate(key) is None
+
+
+def test_secret_key_is_only_limited_on_request(client, db, app, headers, monkeypatch):
+    monkeypatch.setitem(app.config, "RATE_LIMIT_BURST", 1)
+    monkeypatch.setitem(app.config, "RATE_LIMIT_PER_SECOND", 0.01)
+
+    statuses = [client.get("/api/v1/asset-types", headers=headers).status_code for _ in range(3)]
+    assert statuses == [200, 200, 200]
+
+    monkeypatch.setitem(app.config, "RATE_LIMIT_SECRET_KEY", True)
+    statuses = [client.get("/api/v1/asset-types", headers=headers).status_code for _ in range(2)]
+    assert statuses == [200, 429]
@@ -0,0 +1,37 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def test_api_bench_writes_report(tmp_path):
+    output = tmp_path / "report.json"
+    subprocess.run(
+        [sys.executable, "-m", "benchmarks.api_bench", "--assets", "30", "--iterations", "10",
+         "--batch-size", "5", "--output", str(output)],
+        cwd=ROOT, check=True, timeout=300,
+    )
+
+    report = json.loads(output.read_text())
+    assert {"list", "get", "create", "update", "bulk_create", "bulk_update"} <= report["scenarios"].keys()
+    for scenario in report["scenarios"].values():
+        assert scenario["latency_ms"]["p50"] <= scenario["latency_ms"]["p99"]
+        assert scenario["queries_per_call"]["max"] >= scenario["queries_per_call"]["mean"]
+    assert report["scenarios"]["get"]["queries_per_call"]["mean"] >= 1
+
+
+def test_startup_bench_writes_report(tmp_path):
+    output = tmp_path / "startup.json"
+    subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--runs", "1", "--workers", "2", "--output", str(output)],
+        cwd=ROOT, check=True, timeout=300,
+    )
+
+    report = json.loads(output.read_text())
+    modes = report["modes"]
+    assert modes.keys() == {"cli", "serving", "serving_no_docs"}
+    # The serving mode leaves the CLI-only imports out
+    assert modes["serving"]["modules"] < modes["cli"]["modules"]
+    assert report["workers"].keys() == {"independent", "preloaded"}
@@ -0,0 +1,132 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from flask_caching import Cache
+
+from api_service.extensions import cache
+from api_service.services.asset_service import AssetService
+from api_service.services.cache_service import CachedAssetService, TaggedCache, _page_key
+
+
+def test_page_keys_of_different_filters_do_not_collide(client, headers, laptop_type):
+    serial, ram = laptop_type.fields
+    for n in (1, 10, 11):
+        client.post("/api/v1/assets", headers=headers, json={
+            "asset_type_id": laptop_type.id,
+            "data": [{"field_id": serial.id, "value": f"SN-{n}"}, {"field_id": ram.id, "value": n}],
+        })
+
+    two_filters = [(serial.id, "prefix", "SN-1"), (ram.id, "gte", "0")]
+    one_filter = [(serial.id, "prefix", f"SN-1,{ram.id}:gte:0")]
+    assert _page_key(50, None, None, two_filters, None) != _page_key(50, None, None, one_filter, None)
+    # Filters are ANDed, so their order does not matter
+    assert _page_key(50, None, None, two_filters, None) == _page_key(50, None, None, two_filters[::-1], None)
+
+    response = client.get(f"/api/v1/assets?filter={serial.id}:prefix:SN-1&filter={ram.id}:gte:0", headers=headers)
+    assert len(response.json) == 3
+    response = client.get(f"/api/v1/assets?filter={serial.id}:prefix:SN-1,{ram.id}:gte:0", headers=headers)
+    assert response.json == []
+
+
+@pytest.mark.parametrize("url, count_of", [
+    ("/api/v1/assets?asset_type_id=1", len),
+    ("/api/v1/assets", len),
+    ("/api/v1/asset-types/stats", lambda counts: counts[0]["asset_count"]),
+])
+def test_write_during_a_build_is_not_masked(client, headers, laptop_type, monkeypatch, url, count_of):
+    serial, _ = laptop_type.fields
+    data = [{"field_id": serial.id, "value": "SN-1"}]
+    CachedAssetService.create_asset(laptop_type.id, data)
+
+    for name in ("get_assets_page", "get_asset_counts_by_type"):
+        def racing(*args, _original=getattr(AssetService, name), **kwargs):
+            result = _original(*args, **kwargs)
+            # Another worker commits and invalidates after the build read the database
+            monkeypatch.undo()
+            CachedAssetService.create_asset(laptop_type.id, data)
+            return result
+
+        monkeypatch.setattr(AssetService, name, staticmethod(racing))
+
+    assert count_of(client.get(url, headers=headers).json) == 1
+    assert count_of(client.get(url, headers=headers).json) == 2
+
+
+@pytest.fixture
+def tagged(db):
+    return TaggedCache(cache)
+
+
+def counting(value):
+    calls = []
+
+    def build():
+        calls.append(1)
+        return value
+
+    return build, calls
+
+
+def test_invalidating_a_tag_rebuilds_its_entries(tagged):
+    build, calls = counting("v")
+    for _ in range(2):
+        assert tagged.cached("entry", build, ["a", "b"]) == "v"
+    assert tagged.cached("other", build, ["b"]) == "v"
+    assert len(calls) == 2
+
+    tagged.invalidate("a")
+    assert tagged.cached("entry", build, ["a", "b"]) == "v"
+    assert tagged.cached("other", build, ["b"]) == "v"
+    assert len(calls) == 3
+    assert (tagged.counters["hits"], tagged.counters["invalidated"]) == (2, 1)
+
+
+def test_concurrent_misses_build_once(app, tagged):
+    calls = []
+
+    def build():
+        calls.append(1)
+        time.sleep(0.2)
+        return "v"
+
+    def lookup():
+        with app.app_context():
+            return tagged.cached("entry", build, ["a"])
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: lookup(), range(8)))
+    assert results == ["v"] * 8
+    assert len(calls) == 1
+    assert tagged.counters["waits"] == 7
+
+
+def test_stale_entry_is_served_while_another_worker_refreshes_it(app, tagged, monkeypatch):
+    monkeypatch.setitem(app.config, "CACHE_TTL_JITTER", 0)
+    tagged.cached("entry", lambda: "v1", ["a"], timeout=0)
+
+    token = tagged._acquire("entry")
+    assert tagged.cached("entry", lambda: "v2", ["a"], timeout=0) == "v1"
+    assert tagged.counters["stale"] == 1
+    tagged._release("entry", token)
+
+    assert tagged.cached("entry", lambda: "v2", ["a"]) == "v2"
+    assert tagged.cached("entry", lambda: "v3", ["a"]) == "v2"
+
+
+def test_lock_is_only_released_by_its_owner(app, db, tmp_path):
+    shared = Cache(config={"CACHE_TYPE": "FileSystemCache", "CACHE_DIR": str(tmp_path)})
+    shared.init_app(app)
+    tagged = TaggedCache(shared)
+    lock_key = tagged._lock_key("entry")
+
+    first = tagged._acquire("entry")
+    # The first holder outlives the lock's TTL and another worker takes it
+    shared.delete(lock_key)
+    second = tagged._acquire("entry")
+    assert second is not None and second != first
+
+    tagged._release("entry", first)
+    assert shared.get(lock_key) == second
+    tagged._release("entry", second)
+    assert shared.get(lock_key) is None
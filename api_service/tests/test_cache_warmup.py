@@ -0,0 +1,35 @@
+import re
+
+from api_service.services.cache_service import tagged_cache
+from api_service.services.cache_warmup import CacheWarmupService, warm_in_background
+
+
+def test_cache_warm_precomputes_hot_entries(app, client, headers, laptop_type):
+    serial, _ = laptop_type.fields
+    client.post("/api/v1/assets", headers=headers,
+                json={"asset_type_id": laptop_type.id, "data": [{"field_id": serial.id, "value": "SN-1"}]})
+
+    report = CacheWarmupService.warm(concurrency=2)
+    assert report["errors"] == 0
+    assert [k["key"] for k in report["keys"]] == [
+        "stats:asset_types", "asset_types:all", "assets:pages",
+        f"asset_types:{laptop_type.id}", f"asset_types:{laptop_type.id}:fields",
+        f"assets:pages:type:{laptop_type.id}",
+    ]
+    assert all(k["bytes"] > 0 for k in report["keys"])
+
+    misses = tagged_cache.counters["misses"]
+    for url in ["/api/v1/asset-types", f"/api/v1/asset-types/{laptop_type.id}/fields",
+                "/api/v1/assets", f"/api/v1/assets?asset_type_id={laptop_type.id}"]:
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200
+        assert re.search(r"\bdb;", response.headers["Server-Timing"]) is None, url
+    assert tagged_cache.counters["misses"] == misses
+
+
+def test_cache_warm_cli_and_background_hook(app, db, laptop_type):
+    result = app.test_cli_runner().invoke(args=["cli", "cache-warm", "--types", "0"])
+    assert result.exit_code == 0, result.output
+    assert "asset_types:all" in result.output and "Warmed 3 entries" in result.output
+
+    warm_in_background(app).join(timeout=10)
@@ -0,0 +1,95 @@
+import time
+
+from sqlalchemy import event
+
+from api_service.services.asset_service import AssetService
+
+
+def feed(client, headers, **params):
+    response = client.get("/api/v1/changes", headers=headers, query_string=params)
+    assert response.status_code == 200
+    return response
+
+
+def test_writes_are_recorded_in_commit_order(client, headers, laptop_type):
+    serial, ram = laptop_type.fields
+    asset_id = client.post("/api/v1/assets", headers=headers, json={
+        "asset_type_id": laptop_type.id, "data": [{"field_id": ram.id, "value": 8}],
+    }).json["id"]
+    client.put(f"/api/v1/assets/{asset_id}", headers=headers, json={"data": [{"field_id": ram.id, "value": 16}]})
+    client.post("/api/v1/assets:batch", headers=headers, json={"items": [
+        {"asset_type_id": laptop_type.id, "data": [{"field_id": serial.id, "value": f"SN-{i}"}]} for i in range(3)
+    ]})
+    client.post(f"/api/v1/asset-types/{laptop_type.id}/fields", headers=headers,
+                json={"name": "owner", "field_type": "Text"})
+
+    changes = feed(client, headers).json
+    assert [c["seq"] for c in changes] == list(range(1, len(changes) + 1))
+    assert [(c["entity"], c["action"]) for c in changes] == [
+        ("asset", "created"), ("asset", "updated"),
+        ("asset", "created"), ("asset", "created"), ("asset", "created"),
+        ("asset_field", "created"), ("asset_type", "updated"),
+    ]
+    assert changes[1]["entity_id"] == asset_id
+    assert changes[1]["asset_type_id"] == laptop_type.id
+
+
+def test_keyset_pagination_and_long_poll(client, headers, laptop_type):
+    ram = laptop_type.fields[1]
+    for value in range(5):
+        client.post("/api/v1/assets", headers=headers, json={
+            "asset_type_id": laptop_type.id, "data": [{"field_id": ram.id, "value": value}],
+        })
+
+    first = feed(client, headers, limit=3)
+    assert [c["seq"] for c in first.json] == [1, 2, 3]
+    assert 'rel="next"' in first.headers["Link"]
+
+    rest = feed(client, headers, limit=3, since=first.headers["X-Next-Cursor"])
+    assert [c["seq"] for c in rest.json] == [4, 5]
+    assert "Link" not in rest.headers
+
+    started = time.monotonic()
+    caught_up = feed(client, headers, since=5, wait=0.3)
+    assert caught_up.json == []
+    assert caught_up.headers["X-Next-Cursor"] == "5"
+    assert time.monotonic() - started >= 0.3
+
+
+
+def statement_kinds(engine, call):
+    """Run ``call`` and return the ``(verb, table)`` of each statement it issued."""
+    kinds = []
+
+    def capture(conn, cursor, statement, *args):
+        verb, rest = statement.split(None, 1)
+        table = rest.split()[1] if verb in ("INSERT", "DELETE") else rest.split()[0]
+        kinds.append((verb, table))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        return call(), kinds
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+
+def test_atomic_batches_lock_the_sequence_once_at_the_end(db, client, headers, laptop_type):
+    serial, _ = laptop_type.fields
+    lock = ("UPDATE", "change_log_sequence")
+
+    (created, _), kinds = statement_kinds(db.engine, lambda: AssetService.create_assets_bulk(
+        [{"asset_type_id": laptop_type.id, "data": [{"field_id": serial.id, "value": f"SN-{n}"}]} for n in range(5)],
+        chunk_size=2,
+    ))
+    assert kinds.count(lock) == 1
+    assert kinds.index(lock) > max(i for i, kind in enumerate(kinds) if kind == ("INSERT", "asset_data"))
+
+    _, kinds = statement_kinds(db.engine, lambda: AssetService.update_assets_bulk(
+        [{"id": asset["id"], "data": [{"field_id": serial.id, "value": "new"}]} for asset in created],
+        chunk_size=2, partial=True,
+    ))
+    assert kinds.count(lock) == 1
+    assert kinds.index(lock) > max(i for i, kind in enumerate(kinds) if kind == ("UPDATE", "assets"))
+
+    changes = feed(client, headers, limit=100).json
+    assert [c["action"] for c in changes] == ["created"] * 5 + ["updated"] * 5
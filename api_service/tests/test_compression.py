@@ -0,0 +1,71 @@
+import gzip
+import pickle
+
+import pytest
+
+from api_service.services import compression
+
+
+@pytest.fixture
+def assets_url(client, headers, laptop_type):
+    serial, ram = laptop_type.fields
+    client.post("/api/v1/assets:batch", headers=headers, json={"items": [
+        {"asset_type_id": laptop_type.id,
+         "data": [{"field_id": serial.id, "value": f"SN-{i:05d}"}, {"field_id": ram.id, "value": i}]}
+        for i in range(100)
+    ]})
+    return "/api/v1/assets?limit=100"
+
+
+def test_gzip_negotiated_and_cached(client, headers, assets_url, monkeypatch):
+    plain = client.get(assets_url, headers=headers)
+    assert "Content-Encoding" not in plain.headers
+    assert "Accept-Encoding" in plain.headers["Vary"]
+
+    response = client.get(assets_url, headers={**headers, "Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response.data) == plain.data
+
+    # Cache hits serve the stored variant without compressing again
+    monkeypatch.setitem(compression.COMPRESSORS, "gzip", lambda body, config: pytest.fail("compressed on a hit"))
+    assert client.get(assets_url, headers={**headers, "Accept-Encoding": "gzip"}).data == response.data
+
+
+def test_preferred_encoding_and_min_size(app, client, headers, assets_url, laptop_type):
+    response = client.get(assets_url, headers={**headers, "Accept-Encoding": "gzip, br, zstd"})
+    assert response.headers["Content-Encoding"] == compression.enabled_encodings()[0]
+
+    identity_only = client.get(assets_url, headers={**headers, "Accept-Encoding": "gzip;q=0, identity"})
+    assert "Content-Encoding" not in identity_only.headers
+
+    small = client.get(f"/api/v1/asset-types/{laptop_type.id}", headers={**headers, "Accept-Encoding": "gzip"})
+    assert len(small.data) < app.config["COMPRESSION_MIN_SIZE"]
+    assert "Content-Encoding" not in small.headers
+
+
+def test_compressed_variant_etag(app, client, headers, laptop_type, monkeypatch):
+    monkeypatch.setitem(app.config, "COMPRESSION_MIN_SIZE", 0)
+    ram = laptop_type.fields[1]
+    asset_id = client.post("/api/v1/assets", headers=headers, json={
+        "asset_type_id": laptop_type.id, "data": [{"field_id": ram.id, "value": 8}],
+    }).json["id"]
+    url = f"/api/v1/assets/{asset_id}"
+    gzip_headers = {**headers, "Accept-Encoding": "gzip"}
+
+    response = client.get(url, headers=gzip_headers)
+    etag = response.headers["ETag"]
+    assert etag.endswith('+gzip"')
+    assert client.get(url, headers={**gzip_headers, "If-None-Match": etag}).status_code == 304
+    assert client.get(url, headers={**headers, "If-None-Match": etag}).status_code == 200
+
+    response = client.put(url, headers={**headers, "If-Match": etag}, json={"data": [{"field_id": ram.id, "value": 16}]})
+    assert response.status_code == 200
+
+
+def test_precompressed_body_pickles(app):
+    with app.app_context():
+        body = compression.PrecompressedBody(b"[" + b'{"id":1},' * 200 + b"{}]")
+    restored = pickle.loads(pickle.dumps(body))
+    assert restored.identity == body.identity
+    assert restored.variants == body.variants
+    assert gzip.decompress(restored.variants["gzip"]) == body.identity
@@ -0,0 +1,47 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import func, select
+
+from api_service import config
+from api_service.app import create_app
+from api_service.extensions import db
+from api_service.models import AssetField, AssetType, asset_type_fields
+
+THREADS = 16
+
+
+def test_concurrent_type_and_field_creation(monkeypatch, tmp_path, headers):
+    # A file database: every thread gets its own connection, unlike the shared in-memory one
+    monkeypatch.setattr(config, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'concurrency.db'}")
+    app = create_app(testing=True)
+    with app.app_context():
+        db.create_all()
+
+    def post(url, payload):
+        response = app.test_client().post(url, headers=headers, json=payload)
+        return response.status_code, response.json
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        types = list(pool.map(lambda i: post("/api/v1/asset-types", {"name": f"Type {i % 2}"}), range(32)))
+        assert sorted(status for status, _ in types) == [201, 201] + [409] * 30
+        type_ids = [body["id"] for status, body in types if status == 201]
+
+        fields = list(pool.map(lambda i: post(
+            f"/api/v1/asset-types/{type_ids[i % 2]}/fields",
+            {"name": f"field {i % 3}", "field_type": "Number"},
+        ), range(96)))
+
+    assert {status for status, _ in fields} == {201}
+    # Every request for the same field got the same row, whichever type it was attached to
+    ids_by_name = {}
+    for _, body in fields:
+        ids_by_name.setdefault(body["name"], set()).add(body["id"])
+    assert all(len(ids) == 1 for ids in ids_by_name.values())
+
+    with app.app_context():
+        assert db.session.scalar(select(func.count()).select_from(AssetType)) == 2
+        assert db.session.scalar(select(func.count()).select_from(AssetField)) == 3
+        assert db.session.scalar(select(func.count()).select_from(asset_type_fields)) == 6
+        # One version bump per field attached, not per request
+        assert [version for (version,) in db.session.execute(select(AssetType.version))] == [4, 4]
+        db.session.remove()
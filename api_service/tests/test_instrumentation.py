@@ -0,0 +1,50 @@
+import re
+
+from api_service import config
+from api_service.app import create_app
+
+
+def server_timing(response):
+    return dict(re.findall(r"(\w+);dur=([\d.]+)", response.headers["Server-Timing"]))
+
+
+def test_server_timing_header(client, headers, laptop_type):
+    serial, ram = laptop_type.fields
+    created = client.post("/api/v1/assets", headers=headers, json={
+        "asset_type_id": laptop_type.id,
+        "data": [{"field_id": serial.id, "value": "SN-1"}, {"field_id": ram.id, "value": 16}],
+    })
+    asset_url = f"/api/v1/assets/{created.json['id']}"
+
+    miss = client.get(asset_url, headers=headers)
+    timings = server_timing(miss)
+    assert {"db", "cache", "serialize", "app"} <= set(timings)
+    assert re.search(r'db;dur=[\d.]+;desc="\d+ queries"', miss.headers["Server-Timing"])
+    assert "1 miss" in miss.headers["Server-Timing"]
+
+    # A cache hit runs no SQL and encodes nothing
+    hit = client.get(asset_url, headers=headers)
+    assert "db" not in server_timing(hit)
+    assert "serialize" not in server_timing(hit)
+    assert "1 hit" in hit.headers["Server-Timing"]
+
+
+def test_metrics_endpoint(client, headers, laptop_type):
+    client.get(f"/api/v1/asset-types/{laptop_type.id}", headers=headers)
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain")
+    body = response.get_data(as_text=True)
+    assert re.search(r'http_request_duration_seconds_count\{.*endpoint="/api/v1/asset-types/<int:type_id>"'
+                     r'.*status="200"', body)
+    assert 'http_request_db_queries_bucket{endpoint="/api/v1/asset-types/<int:type_id>"' in body
+    assert 'cache_lookups_total{result="miss"}' in body
+
+
+def test_disabled(monkeypatch):
+    monkeypatch.setattr(config, "INSTRUMENTATION_ENABLED", False)
+    client = create_app(testing=True).test_client()
+
+    assert "Server-Timing" not in client.get("/health").headers
+    assert client.get("/metrics").status_code == 404
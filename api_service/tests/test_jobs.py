@@ -0,0 +1,89 @@
+import json
+import threading
+from datetime import timedelta
+
+import pytest
+
+from api_service.models import Job, utcnow
+from api_service.services.job_service import JobService, LeaseLost
+
+
+@pytest.fixture
+def small_chunks(app, monkeypatch):
+    monkeypatch.setitem(app.config, "JOB_CHUNK_SIZE", 3)
+
+
+def laptop_items(laptop_type, count):
+    serial, ram = laptop_type.fields
+    return [{"asset_type_id": laptop_type.id,
+             "data": [{"field_id": serial.id, "value": f"SN-{i}"}, {"field_id": ram.id, "value": i}]}
+            for i in range(count)]
+
+
+def test_import_then_export(client, headers, laptop_type, small_chunks):
+    type_id = laptop_type.id
+    items = laptop_items(laptop_type, 10)
+    items[4]["data"][1]["value"] = "not a number"
+
+    response = client.post("/api/v1/jobs", headers=headers, json={"type": "import", "items": items})
+    assert response.status_code == 202
+    assert response.json["status"] == "queued"
+    status_url = response.headers["Location"]
+
+    assert JobService.work("test-worker", once=True) == 1
+
+    job = client.get(status_url, headers=headers).json
+    assert job["status"] == "succeeded"
+    assert (job["total"], job["processed"], job["succeeded"], job["failed"]) == (10, 10, 9, 1)
+    assert [e["index"] for e in job["errors"]] == [4]
+
+    export = client.post("/api/v1/jobs", headers=headers, json={"type": "export", "asset_type_id": type_id})
+    output_url = export.headers["Location"] + "/output"
+    assert client.get(output_url, headers=headers).status_code == 409
+
+    JobService.work("test-worker", once=True)
+    lines = client.get(output_url, headers=headers).get_data(as_text=True).splitlines()
+    assert [json.loads(line) for line in lines] == client.get("/api/v1/assets?limit=100", headers=headers).json
+    assert client.get(export.headers["Location"], headers=headers).json["total"] == 9
+
+
+def test_invalid_jobs(client, headers, db):
+    assert client.post("/api/v1/jobs", headers=headers, json={"type": "reindex"}).status_code == 400
+    assert client.post("/api/v1/jobs", headers=headers, json={"type": "import", "items": []}).status_code == 400
+    assert client.post("/api/v1/jobs", headers=headers, json={"type": "export", "asset_type_id": 99}).status_code == 400
+    assert client.get("/api/v1/jobs/99", headers=headers).status_code == 404
+
+
+def test_abandoned_job_is_resumed_by_another_worker(app, db, laptop_type, small_chunks):
+    job = JobService.submit_import(laptop_items(laptop_type, 7))
+    job_id = job.id
+
+    # A worker claims the job, imports its first chunk and dies
+    JobService.claim("crashed")
+    JobService._save(job_id, "crashed", next_chunk=1, processed=3, succeeded=3)
+    db.session.commit()
+    assert JobService.claim("other") is None
+
+    db.session.get(Job, job_id).heartbeat_at = utcnow() - timedelta(seconds=app.config["JOB_LEASE_TIMEOUT"] + 1)
+    db.session.commit()
+    assert JobService.work("other", once=True) == 1
+
+    job = db.session.get(Job, job_id)
+    assert (job.status, job.worker, job.attempts) == ("succeeded", "other", 2)
+    assert (job.processed, job.succeeded) == (7, 7)
+
+    # The first worker can no longer write to it
+    with pytest.raises(LeaseLost):
+        JobService._save(job_id, "crashed", processed=0)
+    db.session.rollback()
+
+
+def test_stopped_worker_puts_the_job_back(db, laptop_type, small_chunks):
+    job_id = JobService.submit_import(laptop_items(laptop_type, 7)).id
+    stop = threading.Event()
+    stop.set()
+
+    JobService.run(JobService.claim("stopping"), "stopping", stop)
+
+    job = db.session.get(Job, job_id)
+    assert (job.status, job.worker, job.processed) == ("queued", None, 0)
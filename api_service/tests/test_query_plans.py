@@ -0,0 +1,172 @@
+"""Query plan regression tests.
+
+Every ``AssetService`` query is captured while it runs against a seeded database, then run again
+under ``EXPLAIN`` (``EXPLAIN QUERY PLAN`` on SQLite, ``EXPLAIN (FORMAT JSON)`` on Postgres, see
+``.testenv``). A query fails when its plan reads a whole table of more than ``SEQ_SCAN_MAX_ROWS``
+rows that its case does not expect to read in full, e.g. after a dropped index or a rewrite that
+no longer matches one.
+"""
+import json
+import re
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event, func, select, text
+
+from api_service.models import Asset, AssetData
+from api_service.services.asset_query import encode_cursor
+from api_service.services.asset_service import AssetService
+
+# Tables up to this size may be scanned by any query; the seed data makes the asset tables larger
+SEQ_SCAN_MAX_ROWS = 500
+
+ASSET_TYPES = 4
+ASSETS_PER_TYPE = 300
+
+
+@contextmanager
+def captured_statements(engine):
+    """Collect the ``(statement, parameters)`` of the queries run in the block; INSERTs are left out."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        verb = statement.lstrip().split(None, 1)[0].upper()
+        if not executemany and verb in ("SELECT", "UPDATE", "DELETE", "WITH"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+
+def full_scans(connection, statement, parameters):
+    """Names of the tables the plan of ``statement`` reads in full."""
+    if connection.dialect.name == "postgresql":
+        plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return set(_postgres_seq_scans(plan[0]["Plan"]))
+
+    scans = set()
+    for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters):
+        # "SCAN assets", "SCAN asset_data_1 USING COVERING INDEX ..." (a full index scan), but not
+        # "SEARCH ... USING INDEX" lookups, subqueries or temporary b-trees
+        match = re.match(r"SCAN (\w+)", row[-1])
+        if match:
+            scans.add(match.group(1))
+    return scans
+
+
+def _postgres_seq_scans(node):
+    if node["Node Type"] == "Seq Scan":
+        yield node["Relation Name"]
+    for child in node.get("Plans", ()):
+        yield from _postgres_seq_scans(child)
+
+
+def table_of(name, tables):
+    """Resolve an alias such as ``asset_data_1`` to its table name."""
+    if name in tables:
+        return name
+    stripped = re.sub(r"_\d+$", "", name)
+    return stripped if stripped in tables else name
+
+
+@pytest.fixture
+def seeded(db, asset_type_factory, asset_field_factory):
+    """Asset types with a Text and a Number field, ``ASSETS_PER_TYPE`` assets each."""
+    serial = asset_field_factory(name="serial", field_type="Text")
+    ram = asset_field_factory(name="ram_gb", field_type="Number")
+    types = []
+    for n in range(ASSET_TYPES):
+        asset_type = asset_type_factory(name=f"type-{n}")
+        asset_type.fields = [serial, ram]
+        types.append(asset_type)
+    db.session.add_all(types)
+    db.session.commit()
+
+    AssetService.create_assets_bulk([
+        {"asset_type_id": asset_type.id,
+         "data": [{"field_id": serial.id, "value": f"SN-{n}"}, {"field_id": ram.id, "value": n % 64}]}
+        for asset_type in types
+        for n in range(ASSETS_PER_TYPE)
+    ])
+    # Fresh statistics, so the planner knows the asset tables are no longer tiny
+    db.session.execute(text("ANALYZE"))
+    db.session.commit()
+    return {"type_id": types[0].id, "serial": serial.id, "ram": ram.id,
+            "asset_id": db.session.scalar(select(func.max(Asset.id)).where(Asset.asset_type_id == types[0].id))}
+
+
+def _cases(seeded):
+    """``(name, call, tables it may read in full)`` for every ``AssetService`` query."""
+    type_id, serial, ram, asset_id = (seeded[k] for k in ("type_id", "serial", "ram", "asset_id"))
+    return [
+        ("get_all_asset_types", AssetService.get_all_asset_types, set()),
+        ("get_asset_type_by_id", lambda: AssetService.get_asset_type_by_id(type_id), set()),
+        ("get_fields_for_type", lambda: AssetService.get_fields_for_type(type_id), set()),
+        # Reading every asset reads every row
+        ("get_all_assets", AssetService.get_all_assets, {"assets", "asset_data"}),
+        ("iter_asset_dicts", lambda: list(AssetService.iter_asset_dicts()), {"assets", "asset_data"}),
+        ("iter_asset_dicts_by_type", lambda: list(AssetService.iter_asset_dicts(asset_type_id=type_id)), set()),
+        # The first page walks the primary key and stops after the limit
+        ("get_assets_page", lambda: AssetService.get_assets_page(50), {"assets"}),
+        ("get_assets_page_after", lambda: AssetService.get_assets_page(50, encode_cursor(100)), set()),
+        ("get_assets_page_by_type", lambda: AssetService.get_assets_page(50, asset_type_id=type_id), set()),
+        ("get_assets_page_by_type_after",
+         lambda: AssetService.get_assets_page(50, encode_cursor(100), asset_type_id=type_id), set()),
+        # Without a type the page walks assets in id order, checking the filter per asset through
+        # uq_asset_data_asset_id_field_id, until it is full
+        ("get_assets_page_filtered",
+         lambda: AssetService.get_assets_page(50, filters=[(serial, "eq", "SN-7")]), {"assets"}),
+        ("get_assets_page_filtered_by_type",
+         lambda: AssetService.get_assets_page(50, asset_type_id=type_id, filters=[(ram, "gte", 60)]), set()),
+        ("get_assets_page_sorted",
+         lambda: AssetService.get_assets_page(50, sort=(ram, True)), {"assets"}),
+        ("get_asset_by_id", lambda: AssetService.get_asset_by_id(asset_id), set()),
+        ("get_asset_dict", lambda: AssetService.get_asset_dict(asset_id), set()),
+        ("get_asset_version", lambda: AssetService.get_asset_version(asset_id), set()),
+        ("update_asset",
+         lambda: AssetService.update_asset(asset_id, [{"field_id": serial, "value": "SN-X"}], partial=True), set()),
+        ("update_assets_bulk",
+         lambda: AssetService.update_assets_bulk([{"id": asset_id, "data": [{"field_id": serial, "value": "SN-Y"}]}]),
+         set()),
+        ("get_asset_counts_by_type", AssetService.get_asset_counts_by_type, {"assets"}),
+        ("get_type_stats", lambda: AssetService.get_type_stats(type_id), set()),
+        ("get_type_group_by", lambda: AssetService.get_type_group_by(type_id, serial, metric_field_id=ram), set()),
+    ]
+
+
+def test_asset_service_queries_use_indexes(db, seeded):
+    tables = set(db.metadata.tables)
+    sizes = {table: db.session.scalar(select(func.count()).select_from(db.metadata.tables[table]))
+             for table in tables}
+
+    failures = []
+    for name, call, allowed in _cases(seeded):
+        with captured_statements(db.engine) as statements:
+            call()
+        assert statements, f"{name} ran no query"
+        connection = db.session.connection()
+        for statement, parameters in statements:
+            scans = {table_of(scan, tables) for scan in full_scans(connection, statement, parameters)}
+            for table in scans - allowed:
+                if sizes.get(table, 0) > SEQ_SCAN_MAX_ROWS:
+                    sql = " ".join(statement.split())
+                    failures.append(f"{name}: full scan of {table} ({sizes[table]} rows) in {sql}")
+        db.session.rollback()
+
+    assert not failures, "\n".join(failures)
+
+
+def test_full_scans_flags_unindexed_filter(db, seeded):
+    # The harness itself: a filter on a column without an index reads the whole table
+    with captured_statements(db.engine) as statements:
+        db.session.execute(select(Asset.id).where(Asset.updated_at.is_(None))).all()
+        db.session.execute(select(AssetData.id).where(AssetData.field_id == seeded["serial"])).all()
+
+    connection = db.session.connection()
+    assert full_scans(connection, *statements[0]) == {"assets"}
+    assert full_scans(connection, *statements[1]) == set()
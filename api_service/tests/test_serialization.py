@@ -0,0 +1,33 @@
+import json
+
+from flask_restx import marshal
+
+from api_service.api.asset_types import asset_type_model, field_model
+from api_service.api.assets import asset_batch_response_model, asset_response_model
+from api_service.services import serialization
+from api_service.services.asset_service import asset_field_to_dict, asset_to_dict, asset_type_to_dict
+
+
+def test_fast_path_matches_documented_models(db, laptop_type):
+    serial, ram = laptop_type.fields
+    asset = {"id": 1, "asset_type_id": laptop_type.id,
+             "data": [{"field_id": serial.id, "value": "SN-1"}, {"field_id": ram.id, "value": 16}]}
+
+    assert json.loads(serialization.dumps(asset_type_to_dict(laptop_type))) == marshal(laptop_type, asset_type_model)
+    assert json.loads(serialization.dumps(asset_field_to_dict(ram))) == marshal(ram, field_model)
+    assert json.loads(serialization.dumps(asset)) == marshal(asset, asset_response_model)
+
+    batch = {"items": [dict(asset, index=0)], "errors": [{"index": 1, "message": "Missing 'data' payload"}]}
+    assert json.loads(serialization.dumps(batch)) == marshal(batch, asset_batch_response_model)
+
+
+def test_asset_to_dict_keys_match_model():
+    class Row:
+        id, asset_type_id, data = 1, 2, []
+
+    assert asset_to_dict(Row()).keys() == asset_response_model.keys()
+
+
+def test_stdlib_fallback(monkeypatch):
+    monkeypatch.setattr(serialization, "orjson", None)
+    assert serialization.dumps({"value": "çà", "n": [1, 2.5, None]}) == '{"value":"çà","n":[1,2.5,null]}'.encode()
@@ -0,0 +1,85 @@
+import pytest
+from sqlalchemy import event
+
+
+@pytest.fixture
+def laptops(client, headers, laptop_type):
+    """Four laptops; ``owner`` is a second Text field, missing like ram_gb on the last one."""
+    serial, ram = laptop_type.fields
+    owner = client.post(f"/api/v1/asset-types/{laptop_type.id}/fields", headers=headers,
+                        json={"name": "owner", "field_type": "Text"}).json
+    for value, ram_gb, who in (("SN-1", 8, "ana"), ("SN-2", 16, "ana"), ("SN-3", 16, "bo"), ("SN-4", None, None)):
+        data = [{"field_id": serial.id, "value": value}]
+        data += [{"field_id": ram.id, "value": ram_gb}] if ram_gb is not None else []
+        data += [{"field_id": owner["id"], "value": who}] if who is not None else []
+        client.post("/api/v1/assets", headers=headers, json={"asset_type_id": laptop_type.id, "data": data})
+    return serial, ram, owner["id"]
+
+
+def stats_of(client, headers, type_id, **params):
+    response = client.get(f"/api/v1/asset-types/{type_id}/stats", headers=headers, query_string=params)
+    assert response.status_code == 200
+    return response.json
+
+
+def test_type_stats(client, headers, laptop_type, laptops):
+    serial, ram, owner = laptops
+
+    stats = stats_of(client, headers, laptop_type.id, top=1)
+    assert stats["asset_count"] == 4
+    fields = {f["field_id"]: f for f in stats["fields"]}
+    assert fields[ram.id] == {"field_id": ram.id, "name": "ram_gb", "field_type": "Number",
+                              "count": 3, "min": 8, "max": 16, "avg": pytest.approx(40 / 3), "sum": 40}
+    assert fields[owner] == {"field_id": owner, "name": "owner", "field_type": "Text",
+                             "count": 3, "distinct": 2, "top": [{"value": "ana", "count": 2}]}
+    # Ties are broken by value
+    assert fields[serial.id]["top"] == [{"value": "SN-1", "count": 1}]
+    assert stats_of(client, headers, laptop_type.id, top=3)["fields"][0]["top"] == [
+        {"value": "SN-1", "count": 1}, {"value": "SN-2", "count": 1}, {"value": "SN-3", "count": 1}]
+
+
+def test_type_stats_of_an_empty_type(client, headers, laptop_type):
+    stats = stats_of(client, headers, laptop_type.id)
+    assert stats["asset_count"] == 0
+    assert [(f["name"], f["count"], f.get("sum"), f.get("top")) for f in stats["fields"]] == [
+        ("serial", 0, None, []), ("ram_gb", 0, None, None)]
+
+    assert client.get("/api/v1/asset-types/999/stats", headers=headers).status_code == 404
+
+
+def test_type_stats_query_count_does_not_grow_with_text_fields(db, client, headers, laptop_type, laptops):
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(db.engine, "before_cursor_execute", listener)
+    try:
+        stats_of(client, headers, laptop_type.id)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", listener)
+    assert len([s for s in statements if "asset_data" in s]) == 3
+
+
+def test_asset_counts_by_type(client, headers, laptop_type, laptops, asset_type_factory, db):
+    db.session.add(asset_type_factory(name="Monitor"))
+    db.session.commit()
+
+    response = client.get("/api/v1/asset-types/stats", headers=headers)
+    assert [(c["name"], c["asset_count"]) for c in response.json] == [("Laptop", 4), ("Monitor", 0)]
+
+
+def test_group_by(client, headers, laptop_type, laptops):
+    serial, ram, owner = laptops
+    url = f"/api/v1/asset-types/{laptop_type.id}/stats/group-by"
+
+    response = client.get(url, headers=headers, query_string={"field_id": owner, "metric_field_id": ram.id})
+    assert response.json == [
+        {"value": "ana", "count": 2, "min": 8, "max": 16, "avg": 12.0, "sum": 24},
+        {"value": "bo", "count": 1, "min": 16, "max": 16, "avg": 16.0, "sum": 16},
+    ]
+    response = client.get(url, headers=headers, query_string={"field_id": ram.id, "limit": 1})
+    assert response.json == [{"value": 16, "count": 2}]
+
+    assert client.get(url, headers=headers, query_string={"field_id": 999}).status_code == 400
+    assert client.get(url, headers=headers,
+                      query_string={"field_id": owner, "metric_field_id": serial.id}).status_code == 400
+    assert client.get("/api/v1/asset-types/999/stats/group-by", headers=headers,
+                      query_string={"field_id": owner}).status_code == 404
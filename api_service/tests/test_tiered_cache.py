@@ -0,0 +1,80 @@
+import pytest
+from flask import Flask
+from flask_caching import Cache
+from flask_caching.backends import SimpleCache
+
+from api_service.services.cache_service import TaggedCache
+from api_service.services.tiered_cache import LocalBroadcast, TieredCache
+
+
+@pytest.fixture
+def workers():
+    """Two processes' caches sharing one remote backend and invalidation channel."""
+    remote, broadcast = SimpleCache(), LocalBroadcast()
+    return [TieredCache(remote, broadcast, local_prefixes=["asset_types:", "cache:gen:"]) for _ in range(2)]
+
+
+def test_local_tier_serves_repeated_reads(workers):
+    a, b = workers
+    a.set("asset_types:all.json", b"v1")
+
+    assert b.get("asset_types:all.json") == b"v1"
+    assert b.get("asset_types:all.json") == b"v1"
+    assert b.get_many("asset_types:all.json", "cache:gen:asset_types") == [b"v1", None]
+
+    stats = b.stats()
+    assert (stats["local"]["hits"], stats["local"]["misses"]) == (2, 2)
+    assert (stats["remote"]["hits"], stats["remote"]["misses"]) == (1, 1)
+
+    # Keys outside the prefixes always go to the remote tier
+    a.set("assets:page:1.json", b"page")
+    assert b.get("assets:page:1.json") == b"page"
+    assert len(b.local) == 1
+
+
+def test_writes_invalidate_other_workers(workers):
+    a, b = workers
+    a.set("asset_types:all.json", b"v1")
+    a.add("cache:gen:asset_types", 1)
+    assert b.get_many("asset_types:all.json", "cache:gen:asset_types") == [b"v1", 1]
+
+    a.set("asset_types:all.json", b"v2")
+    assert a.inc("cache:gen:asset_types") == 2
+    assert b.get_many("asset_types:all.json", "cache:gen:asset_types") == [b"v2", 2]
+
+    a.delete("asset_types:all.json")
+    assert b.get("asset_types:all.json") is None
+    assert b.stats()["invalidations_received"] == 5
+    assert a.stats()["invalidations_received"] == 0
+
+
+def test_local_tier_is_bounded_by_size():
+    cache = TieredCache(SimpleCache(), LocalBroadcast(), local_max_bytes=2000)
+    for i in range(10):
+        cache.set(f"key:{i}", b"x" * 500)
+
+    assert cache.local.size <= 2000
+    assert cache.stats()["local"]["evictions"] == 7
+    assert cache.get("key:0") == b"x" * 500
+    assert cache.stats()["remote"]["hits"] == 1
+
+
+def test_tagged_cache_over_tiered_backend(app):
+    tiered_app = Flask("tiered")
+    tiered_app.config.update(app.config)
+    tiered_app.config.update(CACHE_TYPE="api_service.services.tiered_cache.TieredCache",
+                             CACHE_REMOTE_TYPE="SimpleCache")
+    cache = Cache(tiered_app)
+
+    with tiered_app.app_context():
+        tagged = TaggedCache(cache)
+        assert isinstance(cache.cache, TieredCache) and tagged._uses_local_lock()
+
+        builds = []
+        for _ in range(3):
+            tagged.cached("asset_types:all.json", lambda: builds.append(1) or b"[]", tags=["asset_types"])
+        tagged.invalidate("asset_types")
+        tagged.cached("asset_types:all.json", lambda: builds.append(1) or b"[]", tags=["asset_types"])
+
+        assert len(builds) == 2
+        assert tagged.stats()["tiers"]["local"]["hits"] >= 4
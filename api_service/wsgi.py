@@ -1,3 +1,4 @@
 from api_service.app import create_app
 
-app = create_app()
+# Lean serving mode; `flask` commands build the full app, possibly before the tables exist
+app = create_app(serving=True)
@@ -0,0 +1,300 @@
+"""Benchmarks for the asset API hot paths.
+
+Seeds a throwaway database with synthetic asset types, fields and assets, drives the API in-process
+through Flask's test client and records latency percentiles, throughput and SQL statements per
+request for each scenario. Results are written as JSON so two runs can be compared::
+
+    python -m benchmarks.api_bench --assets 5000 --output baseline.json
+    python -m benchmarks.api_bench --assets 5000 --compare baseline.json
+
+``--database`` accepts any SQLAlchemy URL (e.g. a local Postgres); by default a temporary SQLite
+file is used. The target database is recreated, never point it at real data.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+
+API_KEY = "benchmark"
+FIELD_TYPES = ("Text", "Number")
+
+SeedField = namedtuple("SeedField", "id name field_type")
+
+
+class QueryCounter:
+    """Counts SQL statements sent through an engine."""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def percentile(samples, fraction):
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def summarize(latencies, queries, items_per_call=1):
+    ordered = sorted(latencies)
+    total = sum(latencies)
+    return {
+        "iterations": len(latencies),
+        "latency_ms": {
+            "p50": round(percentile(ordered, 0.50) * 1000, 3),
+            "p90": round(percentile(ordered, 0.90) * 1000, 3),
+            "p99": round(percentile(ordered, 0.99) * 1000, 3),
+            "max": round(ordered[-1] * 1000, 3),
+            "mean": round(statistics.fmean(ordered) * 1000, 3),
+        },
+        "throughput_per_s": round(len(latencies) * items_per_call / total, 1) if total else None,
+        "queries_per_call": {
+            "mean": round(statistics.fmean(queries), 2),
+            "max": max(queries),
+        },
+    }
+
+
+def measure(counter, call, iterations, items_per_call=1):
+    """Time ``call(i)`` ``iterations`` times; ``call`` returns a response or ``None``."""
+    latencies, queries = [], []
+    for i in range(iterations):
+        counter.count = 0
+        started = time.perf_counter()
+        response = call(i)
+        latencies.append(time.perf_counter() - started)
+        queries.append(counter.count)
+        if response is not None and response.status_code >= 400:
+            raise RuntimeError(f"HTTP {response.status_code}: {response.get_data(as_text=True)[:500]}")
+    return summarize(latencies, queries, items_per_call)
+
+
+def configure_environment(database_url, cache_type):
+    # Must run before api_service is imported: config.py and auth_service read the environment
+    os.environ["SECRET_KEY"] = API_KEY
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["CACHE_TYPE"] = cache_type
+
+
+def asset_payload(asset_type_id, fields, rng):
+    return {
+        "asset_type_id": asset_type_id,
+        "data": [
+            {
+                "field_id": field.id,
+                "value": rng.randint(0, 10_000) if field.field_type == "Number"
+                else f"{field.name}-{rng.randint(0, 10_000):05d}",
+            }
+            for field in fields
+        ],
+    }
+
+
+def seed(asset_types, fields_per_type, assets, rng):
+    """Create the synthetic schema and assets; returns ``{asset_type_id: [SeedField, ...]}``."""
+    from api_service.services.asset_service import AssetService
+
+    schema = {}
+    for t in range(asset_types):
+        asset_type = AssetService.create_asset_type(f"Benchmark Type {t}")
+        for f in range(fields_per_type):
+            AssetService.create_asset_field_for_type(
+                asset_type.id, f"field_{f}", FIELD_TYPES[f % len(FIELD_TYPES)]
+            )
+        schema[asset_type.id] = [SeedField(f.id, f.name, f.field_type)
+                                 for f in AssetService.get_fields_for_type(asset_type.id)]
+
+    type_ids = list(schema)
+    items = [asset_payload(type_ids[i % len(type_ids)], schema[type_ids[i % len(type_ids)]], rng)
+             for i in range(assets)]
+    _, errors = AssetService.create_assets_bulk(items)
+    if errors:
+        raise RuntimeError(f"Seeding failed: {errors[:3]}")
+    return schema
+
+
+def run(args):
+    configure_environment(args.database, args.cache_type)
+
+    from flask_restx import marshal
+
+    from api_service.api.assets import asset_response_model
+    from api_service.app import create_app
+    from api_service.extensions import db
+    from api_service.models import Asset
+    from api_service.services.asset_service import AssetService
+    from api_service.services.serialization import dumps
+
+    rng = random.Random(args.seed)
+    app = create_app()
+    headers = {"X-API-KEY": API_KEY}
+    results = {}
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        started = time.perf_counter()
+        schema = seed(args.asset_types, args.fields, args.assets, rng)
+        seed_seconds = time.perf_counter() - started
+
+        counter = QueryCounter(db.engine)
+        client = app.test_client()
+        asset_ids = [asset_id for (asset_id,) in db.session.query(Asset.id)]
+        type_id = next(iter(schema))
+        fields = schema[type_id]
+        number_field = next((f for f in fields if f.field_type == "Number"), None)
+        type_asset_ids = [asset_id for (asset_id,) in
+                          db.session.query(Asset.id).filter(Asset.asset_type_id == type_id)]
+        db.session.remove()
+
+        def cursor(i):
+            return f"&after={asset_ids[(i * 37) % len(asset_ids)]}"
+
+        results["list"] = measure(counter, lambda i: client.get(
+            f"/api/v1/assets?limit={args.page_size}{cursor(i)}", headers=headers), args.iterations)
+
+        if number_field is not None:
+            results["list_filtered_sorted"] = measure(counter, lambda i: client.get(
+                f"/api/v1/assets?limit={args.page_size}&asset_type_id={type_id}"
+                f"&filter={number_field.id}:gte:{rng.randint(0, 5_000)}&sort=-{number_field.id}",
+                headers=headers), args.iterations)
+
+        results["get"] = measure(counter, lambda i: client.get(
+            f"/api/v1/assets/{rng.choice(asset_ids)}", headers=headers), args.iterations)
+
+        results["create"] = measure(counter, lambda i: client.post(
+            "/api/v1/assets", json=asset_payload(type_id, fields, rng), headers=headers), args.iterations)
+
+        results["update"] = measure(counter, lambda i: client.put(
+            f"/api/v1/assets/{rng.choice(type_asset_ids)}",
+            json={"data": asset_payload(type_id, fields, rng)["data"]}, headers=headers), args.iterations)
+
+        bulk_iterations = max(1, args.iterations // 10)
+        results["bulk_create"] = measure(counter, lambda i: client.post(
+            "/api/v1/assets:batch",
+            json={"items": [asset_payload(type_id, fields, rng) for _ in range(args.batch_size)]},
+            headers=headers), bulk_iterations, items_per_call=args.batch_size)
+
+        results["bulk_update"] = measure(counter, lambda i: client.put(
+            "/api/v1/assets:batch",
+            json={"items": [dict(asset_payload(type_id, fields, rng), id=asset_id)
+                            for asset_id in rng.sample(type_asset_ids, min(args.batch_size, len(type_asset_ids)))]},
+            headers=headers), bulk_iterations, items_per_call=args.batch_size)
+
+        # In-process micro-benchmarks, without routing and request parsing
+        def service_get_all(i):
+            AssetService.get_all_assets()
+            db.session.remove()
+
+        def service_iter_all(i):
+            for _ in AssetService.iter_asset_dicts():
+                pass
+            db.session.remove()
+
+        results["service_get_all_assets"] = measure(counter, service_get_all, bulk_iterations)
+        results["service_iter_asset_dicts"] = measure(counter, service_iter_all, bulk_iterations)
+
+        page = AssetService.get_assets_page(args.page_size)[0]
+        db.session.remove()
+        results["marshal_page"] = measure(counter, lambda i: json.dumps(marshal(page, asset_response_model))
+                                          and None, args.iterations)
+        results["encode_page"] = measure(counter, lambda i: dumps(page) and None, args.iterations)
+
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": args.database.split("://", 1)[0],
+            "cache_type": args.cache_type,
+        },
+        "parameters": {
+            "asset_types": args.asset_types,
+            "fields": args.fields,
+            "assets": args.assets,
+            "iterations": args.iterations,
+            "page_size": args.page_size,
+            "batch_size": args.batch_size,
+            "seed": args.seed,
+        },
+        "seed_seconds": round(seed_seconds, 3),
+        "scenarios": results,
+    }
+
+
+def compare(report, baseline, threshold):
+    """Print p50 and throughput changes against ``baseline``; returns the regressed scenario names."""
+    regressions = []
+    print(f"{'scenario':<24}{'p50 ms':>12}{'change':>10}{'queries':>10}{'baseline':>10}")
+    for name, current in report["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+        p50, old_p50 = current["latency_ms"]["p50"], previous["latency_ms"]["p50"]
+        change = (p50 - old_p50) / old_p50 if old_p50 else 0.0
+        queries = current["queries_per_call"]["mean"]
+        old_queries = previous["queries_per_call"]["mean"]
+        flag = ""
+        if change > threshold or queries > old_queries:
+            regressions.append(name)
+            flag = "  <- regression"
+        print(f"{name:<24}{p50:>12.3f}{change:>+10.1%}{queries:>10}{old_queries:>10}{flag}")
+    return regressions
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark the asset API hot paths.")
+    parser.add_argument("--database", default=None,
+                        help="SQLAlchemy URL of a scratch database (default: temporary SQLite file)")
+    parser.add_argument("--cache-type", default="NullCache",
+                        help="Flask-Caching backend; NullCache measures the database paths")
+    parser.add_argument("--asset-types", type=int, default=3)
+    parser.add_argument("--fields", type=int, default=4, help="Fields per asset type")
+    parser.add_argument("--assets", type=int, default=2000)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--compare", help="Baseline JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative p50 slowdown reported as a regression (default 0.10)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        if args.database is None:
+            args.database = f"sqlite:///{os.path.join(scratch, 'benchmark.db')}"
+        report = run(args)
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare) as baseline:
+            regressions = compare(report, json.load(baseline), args.threshold)
+        if regressions:
+            print(f"Regressions: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
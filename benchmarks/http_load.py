@@ -0,0 +1,80 @@
+"""Closed-loop HTTP load generator used to compare serving modes.
+
+Usage::
+
+    python benchmarks/http_load.py http://localhost:5000/api/v1/assets?limit=50 \\
+        --api-key <key> --concurrency 16 --duration 20
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+
+import requests
+
+
+def run_client(url, headers, deadline, latencies, errors):
+    session = requests.Session()
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            response = session.get(url, headers=headers, timeout=30)
+            ok = response.status_code < 400
+        except requests.RequestException:
+            ok = False
+        elapsed = time.perf_counter() - started
+        if ok:
+            latencies.append(elapsed)
+        else:
+            errors.append(elapsed)
+
+
+def percentile(samples, fraction):
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("url")
+    parser.add_argument("--api-key", default=None)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20.0)
+    args = parser.parse_args()
+
+    headers = {"X-API-KEY": args.api_key} if args.api_key else {}
+    latencies, errors = [], []
+    deadline = time.perf_counter() + args.duration
+    clients = [
+        threading.Thread(target=run_client, args=(args.url, headers, deadline, latencies, errors))
+        for _ in range(args.concurrency)
+    ]
+    started = time.perf_counter()
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    report = {
+        "url": args.url,
+        "concurrency": args.concurrency,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "throughput_rps": round(len(latencies) / wall, 1),
+    }
+    if latencies:
+        report.update({
+            "latency_ms": {
+                "p50": round(percentile(latencies, 0.50) * 1000, 2),
+                "p95": round(percentile(latencies, 0.95) * 1000, 2),
+                "p99": round(percentile(latencies, 0.99) * 1000, 2),
+                "mean": round(statistics.fmean(latencies) * 1000, 2),
+            }
+        })
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Compare the ORM and column-projected read paths for listing every asset.
+
+``orm`` is ``AssetService.get_all_assets()`` followed by ``asset_to_dict``; ``core`` is
+``AssetService.iter_asset_dicts()``. Both produce the same dicts; the report gives latency,
+peak traced memory and the number of objects left in the session's identity map::
+
+    python -m benchmarks.read_paths --assets 20000 --output read_paths.json
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.api_bench import configure_environment, seed
+
+
+def run_once(read):
+    """Return ``(seconds, peak_bytes, identity_map_size, assets)`` for one traced read."""
+    from api_service.extensions import db
+
+    db.session.remove()
+    tracemalloc.start()
+    started = time.perf_counter()
+    assets, identity_map_size = read()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    db.session.remove()
+    return elapsed, peak, identity_map_size, assets
+
+
+def run(args):
+    configure_environment(args.database, "NullCache")
+
+    from api_service.app import create_app
+    from api_service.extensions import db
+    from api_service.services.asset_service import AssetService, asset_to_dict
+
+    # Each path returns the asset dicts and the identity map size while its results are alive
+    def orm():
+        assets = AssetService.get_all_assets()
+        return [asset_to_dict(asset) for asset in assets], len(db.session.identity_map)
+
+    def core():
+        assets = list(AssetService.iter_asset_dicts())
+        return assets, len(db.session.identity_map)
+
+    paths = {"orm": orm, "core": core}
+
+    app = create_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        seed(args.asset_types, args.fields, args.assets, random.Random(args.seed))
+
+        outputs, report = {}, {}
+        for name, read in paths.items():
+            # Latency without tracemalloc overhead, then one traced run for allocations
+            timings = []
+            for _ in range(args.iterations):
+                db.session.remove()
+                started = time.perf_counter()
+                read()
+                timings.append(time.perf_counter() - started)
+            _, peak, identity_map_size, outputs[name] = run_once(read)
+            report[name] = {
+                "latency_ms": {
+                    "min": round(min(timings) * 1000, 2),
+                    "median": round(statistics.median(timings) * 1000, 2),
+                },
+                "peak_traced_mb": round(peak / 2 ** 20, 2),
+                "identity_map_objects": identity_map_size,
+            }
+
+        if outputs["orm"] != outputs["core"]:
+            raise RuntimeError("ORM and Core read paths returned different assets")
+
+    report["speedup"] = round(report["orm"]["latency_ms"]["median"] / report["core"]["latency_ms"]["median"], 2)
+    report["parameters"] = {"assets": args.assets, "fields": args.fields, "iterations": args.iterations}
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the ORM and Core read paths.")
+    parser.add_argument("--database", default=None,
+                        help="SQLAlchemy URL of a scratch database (default: temporary SQLite file)")
+    parser.add_argument("--asset-types", type=int, default=3)
+    parser.add_argument("--fields", type=int, default=4, help="Fields per asset type")
+    parser.add_argument("--assets", type=int, default=10000)
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        if args.database is None:
+            args.database = f"sqlite:///{os.path.join(scratch, 'benchmark.db')}"
+        report = run(args)
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
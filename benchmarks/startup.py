@@ -0,0 +1,199 @@
+"""Cold start time and memory per worker for the app's startup modes.
+
+Each run is a fresh interpreter (``sys.executable``), as a Gunicorn worker or a ``flask`` command
+would be:
+
+* ``cli``: ``create_app()``, the full app built by ``flask`` commands (Flask-Migrate, commands),
+* ``serving``: ``create_app(serving=True)``, the lean mode of ``api_service.wsgi``,
+* ``serving_no_docs``: the same with ``API_DOCS_ENABLED=false``.
+
+The report gives the time to import and build the app, the process wall time (interpreter start
+included), the RSS after one request and the number of loaded modules. ``--workers`` then compares
+that many independently started workers with workers forked from a preloaded parent (Gunicorn's
+``preload_app``), by their unique (USS) and proportional (PSS) memory, read from
+``/proc/<pid>/smaps_rollup`` (Linux only)::
+
+    python -m benchmarks.startup --runs 5 --workers 4 --output startup.json
+"""
+import argparse
+import gc
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.api_bench import configure_environment
+
+# Mode -> extra environment of its interpreters
+MODES = {
+    "cli": {},
+    "serving": {},
+    "serving_no_docs": {"API_DOCS_ENABLED": "false"},
+}
+
+
+def memory():
+    """``{rss, uss, pss}`` of this process in bytes; ``uss``/``pss`` are None without smaps_rollup."""
+    values = {}
+    try:
+        with open("/proc/self/smaps_rollup") as smaps:
+            for line in smaps:
+                name, _, rest = line.partition(":")
+                if rest.strip().endswith("kB"):
+                    values[name] = int(rest.split()[0]) * 1024
+    except OSError:
+        import resource
+
+        # ru_maxrss is the peak, in kB on Linux and bytes on macOS
+        scale = 1 if sys.platform == "darwin" else 1024
+        return {"rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale, "uss": None, "pss": None}
+    return {
+        "rss": values.get("Rss"),
+        "uss": values.get("Private_Clean", 0) + values.get("Private_Dirty", 0),
+        "pss": values.get("Pss"),
+    }
+
+
+def serve_one_request(app):
+    response = app.test_client().get("/health")
+    assert response.status_code == 200, response.status_code
+
+
+def child_startup(mode):
+    """Run in a fresh interpreter: build the app in ``mode`` and report timings and memory."""
+    started = time.perf_counter()
+    from api_service.app import create_app
+
+    app = create_app(serving=(mode != "cli"))
+    ready = time.perf_counter() - started
+    serve_one_request(app)
+    return {"startup_ms": round(ready * 1000, 1), "modules": len(sys.modules), **memory()}
+
+
+def child_preload(workers):
+    """Run in a fresh interpreter: build the app once, then fork ``workers`` children like Gunicorn."""
+    from api_service.app import create_app, init_worker
+
+    app = create_app(serving=True)
+    gc.freeze()
+
+    reports = []
+    for _ in range(workers):
+        read_end, write_end = os.pipe()
+        forked_at = time.perf_counter()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_end)
+            init_worker(app)
+            serve_one_request(app)
+            report = {"startup_ms": round((time.perf_counter() - forked_at) * 1000, 1), **memory()}
+            # Stay alive until the others are measured, so PSS splits the shared pages between all
+            with os.fdopen(write_end, "w") as out:
+                out.write(json.dumps(report))
+            time.sleep(0.5 * workers)
+            os._exit(0)
+        os.close(write_end)
+        reports.append((pid, read_end))
+
+    results = []
+    for pid, read_end in reports:
+        with os.fdopen(read_end) as report:
+            results.append(json.loads(report.read()))
+    for pid, _ in reports:
+        os.waitpid(pid, 0)
+    return results
+
+
+def run_child(args, extra_env=None):
+    env = dict(os.environ, **(extra_env or {}))
+    started = time.perf_counter()
+    output = subprocess.run([sys.executable, "-m", "benchmarks.startup", *args], env=env, check=True,
+                            capture_output=True, text=True).stdout
+    wall = time.perf_counter() - started
+    return json.loads(output.strip().splitlines()[-1]), wall
+
+
+def summarize(samples, key):
+    values = [s[key] for s in samples if s.get(key) is not None]
+    return round(statistics.median(values), 1) if values else None
+
+
+def run(args):
+    configure_environment(args.database, "SimpleCache")
+    report = {"runs": args.runs, "modes": {}}
+
+    for mode, env in MODES.items():
+        samples, walls = [], []
+        for _ in range(args.runs):
+            sample, wall = run_child(["--child", mode], env)
+            samples.append(sample)
+            walls.append(wall * 1000)
+        report["modes"][mode] = {
+            "startup_ms": summarize(samples, "startup_ms"),
+            "process_ms": round(statistics.median(walls), 1),
+            "rss_mb": round(summarize(samples, "rss") / 2 ** 20, 1),
+            "modules": summarize(samples, "modules"),
+        }
+
+    if args.workers:
+        independent = [run_child(["--child", "serving"])[0] for _ in range(args.workers)]
+        preloaded, _ = run_child(["--child-preload", str(args.workers)])
+        report["workers"] = {
+            name: {
+                "count": args.workers,
+                "startup_ms": summarize(samples, "startup_ms"),
+                "uss_mb": round(summarize(samples, "uss") / 2 ** 20, 1) if summarize(samples, "uss") else None,
+                "pss_mb": round(summarize(samples, "pss") / 2 ** 20, 1) if summarize(samples, "pss") else None,
+            }
+            for name, samples in (("independent", independent), ("preloaded", preloaded))
+        }
+    return report
+
+
+def print_report(report):
+    print(f"{'mode':<18}{'startup ms':>12}{'process ms':>12}{'RSS MB':>9}{'modules':>9}")
+    for mode, values in report["modes"].items():
+        print(f"{mode:<18}{values['startup_ms']:>12}{values['process_ms']:>12}"
+              f"{values['rss_mb']:>9}{values['modules']:>9}")
+    if "workers" in report:
+        print(f"\n{'workers':<18}{'startup ms':>12}{'USS MB':>9}{'PSS MB':>9}")
+        for name, values in report["workers"].items():
+            print(f"{name:<18}{values['startup_ms']:>12}{values['uss_mb']!s:>9}{values['pss_mb']!s:>9}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure startup time and memory per worker.")
+    parser.add_argument("--database", default=None,
+                        help="SQLAlchemy URL (default: temporary SQLite file; startup opens no connection)")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per mode")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Workers to compare with and without preloading (0 to skip)")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--child-preload", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(child_startup(args.child)))
+        return 0
+    if args.child_preload:
+        print(json.dumps(child_preload(args.child_preload)))
+        return 0
+
+    with tempfile.TemporaryDirectory() as scratch:
+        if args.database is None:
+            args.database = f"sqlite:///{os.path.join(scratch, 'benchmark.db')}"
+        report = run(args)
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,5 +6,12 @@ flask db upgrade
 # Seed default asset types
 flask init
 
-# Start Flask application
-exec flask run --host=0.0.0.0
\ No newline at end of file
+# Fill the shared cache before taking traffic; a failure only means starting cold
+flask cli cache-warm || echo "Cache warm-up failed, starting with a cold cache"
+
+# Start the application: Flask's development server in development, Gunicorn otherwise
+if [ "$FLASK_ENV" = "development" ]; then
+    exec flask run --host=0.0.0.0
+else
+    exec gunicorn --config gunicorn.conf.py "api_service.wsgi:app"
+fi
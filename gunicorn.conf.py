@@ -0,0 +1,51 @@
+"""Gunicorn settings for the production serving mode (see entrypoint.sh).
+
+Every worker process gets its own SQLAlchemy pool, so keep
+WEB_CONCURRENCY * (DB_POOL_SIZE + DB_MAX_OVERFLOW) below Postgres' max_connections
+and DB_POOL_SIZE >= GUNICORN_THREADS.
+"""
+import gc
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", 4))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 60))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+
+# Recycle workers now and then to bound memory growth
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 100))
+
+# An empty GUNICORN_ACCESS_LOG turns the access log off
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-") or None
+
+# Import and build the app once in the master: workers then fork ready to serve and share the
+# master's memory pages. config.py reads the same variable (PRELOAD_APP) to defer per-worker setup
+# to post_fork.
+preload_app = os.getenv("GUNICORN_PRELOAD", "false").lower() == "true"
+
+
+def pre_fork(server, worker):
+    if preload_app:
+        # Move the master's objects out of the collector's reach, so collections in the workers
+        # don't write to (and copy) the pages they share with it
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    if preload_app:
+        from api_service.app import init_worker
+        from api_service.wsgi import app
+
+        init_worker(app)
+
+
+def child_exit(server, worker):
+    # With PROMETHEUS_MULTIPROC_DIR set, drop the live gauges of workers that exit
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)